@@ -0,0 +1,154 @@
+"""
+How long A2A callers hold a connection, with the asynchronous task mode of the Men Without Phases agent.
+
+Starts the Men Without Phases A2A agent in-process with the fake model (`--model-latency-ms` per
+model call) and A2A_ASYNC_TASKS=true, next to a local server receiving push notifications. Sends
+`--tasks` concurrent `message/send` requests three ways:
+  - blocking: the connection stays open until the task is completed, as without the task mode
+  - polling: `blocking: false`; the task comes back `working` and `tasks/get` is polled every `--poll-ms`
+  - push: `blocking: false` with a `pushNotificationConfig`; the completed task is POSTed to the callback server
+For each, reports how long the `message/send` connection was open, and how long until the caller
+had the answer. With more tasks than `--workers`, the rest wait in the worker queue.
+
+Run from the repository root:
+    python -m benchmarks.async_tasks --tasks 16 --workers 4 --model-latency-ms 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+PORT = 8121
+CALLBACK_PORT = 8122
+AGENT_URL = f"http://localhost:{PORT}/"
+CALLBACK_URL = f"http://localhost:{CALLBACK_PORT}/a2a/callback"
+TERMINAL_STATES = {"completed", "failed", "rejected", "canceled"}
+
+
+def configure_environment(model_latency_ms: float, workers: int, queue_size: int) -> None:
+    # Must run before the agent is imported.
+    os.environ["AGENT_MODEL"] = "fake-llm"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(model_latency_ms)
+    os.environ["SESSION_SERVICE_URI"] = ""
+    os.environ["PORT"] = str(PORT)
+    os.environ["A2A_ASYNC_TASKS"] = "true"
+    os.environ["A2A_TASK_WORKERS"] = str(workers)
+    os.environ["A2A_TASK_QUEUE_SIZE"] = str(queue_size)
+
+
+class CallbackServer:
+    """ASGI app receiving push notifications; wakes up the caller waiting for a task to finish."""
+
+    def __init__(self):
+        self.finished: dict = {}
+
+    def wait_for(self, task_id: str) -> asyncio.Event:
+        return self.finished.setdefault(task_id, asyncio.Event())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        if scope["method"] == "POST" and body:
+            task = json.loads(body)
+            if task["status"]["state"] in TERMINAL_STATES:
+                self.wait_for(task["id"]).set()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def send_message(text: str, blocking: bool, push: bool) -> dict:
+    configuration = {"blocking": blocking}
+    if push:
+        configuration["pushNotificationConfig"] = {"url": CALLBACK_URL, "token": str(uuid.uuid4())}
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "role": "user",
+                "messageId": str(uuid.uuid4()),
+                "contextId": str(uuid.uuid4()),
+                "parts": [{"kind": "text", "text": text}],
+            },
+            "configuration": configuration,
+        },
+    }
+
+
+async def one_task(client, mode: str, callbacks: CallbackServer, poll_seconds: float) -> tuple:
+    start = time.perf_counter()
+    response = await client.post(AGENT_URL, json=send_message("The target is my neighbour.", mode == "blocking", mode == "push"))
+    connection = time.perf_counter() - start
+    task = response.json()["result"]
+    if mode == "push":
+        finished = callbacks.wait_for(task["id"])
+        if task["status"]["state"] not in TERMINAL_STATES:
+            await finished.wait()
+    elif mode == "polling":
+        while task["status"]["state"] not in TERMINAL_STATES:
+            await asyncio.sleep(poll_seconds)
+            poll = await client.post(AGENT_URL, json={"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "tasks/get", "params": {"id": task["id"]}})
+            task = poll.json()["result"]
+    return connection, time.perf_counter() - start
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(tasks: int, poll_ms: float) -> None:
+    import httpx
+    import uvicorn
+
+    from src.adk_menwithoutphases.main import app
+
+    callbacks = CallbackServer()
+    servers = []
+    for asgi_app, port in ((app, PORT), (callbacks, CALLBACK_PORT)):
+        server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning"))
+        servers.append((server, asyncio.create_task(server.serve())))
+    while not all(server.started for server, _ in servers):
+        await asyncio.sleep(0.05)
+
+    print(f"{tasks} concurrent tasks per mode")
+    print(f"{'mode':>10} {'connection p50 ms':>18} {'connection p99 ms':>18} {'answer p50 ms':>14} {'answer p99 ms':>14}")
+    async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=tasks * 2)) as client:
+        await one_task(client, "blocking", callbacks, poll_ms / 1000)  # warm up
+        for mode in ("blocking", "polling", "push"):
+            results = await asyncio.gather(*(one_task(client, mode, callbacks, poll_ms / 1000) for _ in range(tasks)))
+            connections = [connection for connection, _ in results]
+            answers = [answer for _, answer in results]
+            print(f"{mode:>10} {percentile(connections, 0.5) * 1e3:18.1f} {percentile(connections, 0.99) * 1e3:18.1f} "
+                  f"{percentile(answers, 0.5) * 1e3:14.1f} {percentile(answers, 0.99) * 1e3:14.1f}")
+
+    for server, task in servers:
+        server.should_exit = True
+        await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--model-latency-ms", type=float, default=2000)
+    parser.add_argument("--poll-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    configure_environment(args.model_latency_ms, args.workers, args.queue_size)
+    asyncio.run(run(args.tasks, args.poll_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the loan change feed.
+
+A writer publishes changes at a fixed rate while subscribers receive notifications;
+a share of the subscribers is slow (each notification takes `--slow-ms` to deliver).
+Reports the writer's publish latency, how many notifications each kind of subscriber
+received (coalescing) and whether every subscriber caught up with the last sequence number.
+
+Run from the repository root:
+    python -m benchmarks.changefeed --changes 5000 --subscribers 100 --slow-share 0.2 --slow-ms 50
+"""
+import argparse
+import asyncio
+import time
+
+from src.loan_service.changefeed import ChangeFeed
+
+
+async def run(changes: int, subscribers: int, slow_share: float, slow_ms: float, rate: float) -> None:
+    feed = ChangeFeed(buffer_size=changes)
+    received = {}
+    cursors = {}
+
+    def make_send(key: int, slow: bool):
+        async def send():
+            if slow:
+                await asyncio.sleep(slow_ms / 1000)
+            received[key] += 1
+            # The client reads everything after its cursor, as it would with loans://changes?since=
+            new = await feed.read(None, cursors[key])
+            if new:
+                cursors[key] = new[-1]["seq"]
+        return send
+
+    slow_keys = set(range(int(subscribers * slow_share)))
+    for key in range(subscribers):
+        received[key] = 0
+        cursors[key] = 0
+        feed.subscribe(key, make_send(key, key in slow_keys))
+
+    publish_latencies = []
+    start = time.perf_counter()
+    for seq in range(1, changes + 1):
+        change = {"seq": seq, "kind": "create", "name": f"entity-{seq % 10}", "loan_id": seq, "amount": 100.0}
+        publish_start = time.perf_counter()
+        feed.publish([change])
+        publish_latencies.append(time.perf_counter() - publish_start)
+        await asyncio.sleep(1 / rate)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(slow_ms / 1000 * 3)  # Let the last notifications drain
+
+    publish_latencies.sort()
+    print(f"{changes} changes in {elapsed:.2f}s to {subscribers} subscribers ({len(slow_keys)} slow)")
+    print(f"publish p50 {publish_latencies[len(publish_latencies) // 2] * 1e6:.1f} us, "
+          f"p99 {publish_latencies[int(len(publish_latencies) * 0.99)] * 1e6:.1f} us")
+    for label, keys in (("fast", set(received) - slow_keys), ("slow", slow_keys)):
+        if keys:
+            notified = sum(received[key] for key in keys) / len(keys)
+            caught_up = sum(cursors[key] == changes for key in keys)
+            print(f"{label:5} subscribers: {notified:8.0f} notifications each for {changes} changes, {caught_up}/{len(keys)} caught up")
+    for key in received:
+        feed.unsubscribe(key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--changes", type=int, default=5000)
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--slow-share", type=float, default=0.2)
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    parser.add_argument("--rate", type=float, default=2000.0, help="Changes published per second")
+    args = parser.parse_args()
+    asyncio.run(run(args.changes, args.subscribers, args.slow_share, args.slow_ms, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Bytes on the wire and CPU per request with HTTP compression (src/shared/compression.py).
+
+1. MCP responses: starts the Loan Service in-process behind `CompressionMiddleware` and calls its
+   tools over streamable HTTP with `Accept-Encoding: identity`, `gzip` and `zstd`. Reports the
+   response bytes on the wire per call, the CPU spent compressing per call, and the CPU of the
+   whole call (client and server share the process). Responses below `--min-size` are not compressed.
+2. A2A requests: compresses `message/send` requests carrying conversation histories of several
+   sizes, as `compressing_client` does, and reports bytes and CPU to compress and decompress.
+
+Run from the repository root:
+    python -m benchmarks.compression --calls 200 --loans 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+PORT = 8114
+ENCODINGS = ("identity", "gzip", "zstd")
+
+
+def configure_environment(db_file: str) -> None:
+    # Must run before the loan service is imported.
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+
+
+class WireCounter:
+    """ASGI middleware counting the response body bytes of POST requests, as sent on the wire."""
+
+    def __init__(self, app):
+        self.app = app
+        self.bytes = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        async def counting_send(message):
+            if message["type"] == "http.response.body":
+                self.bytes += len(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, counting_send)
+
+
+def time_compressor(compression) -> dict:
+    # Accumulates the CPU time spent in the compressor of the middleware
+    spent = {"seconds": 0.0}
+    for method in ("compress", "finish"):
+        original = getattr(compression.Compressor, method)
+
+        def timed(self, *args, _original=original, **kwargs):
+            start = time.process_time()
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                spent["seconds"] += time.process_time() - start
+        setattr(compression.Compressor, method, timed)
+    return spent
+
+
+async def mcp_responses(calls: int, loans: list, min_size: int) -> None:
+    import uvicorn
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    from src.loan_service.main import create_loan, starlette_app
+    from src.shared import compression
+
+    counter = WireCounter(compression.CompressionMiddleware(starlette_app, "loan_service", min_size=min_size))
+    server = uvicorn.Server(uvicorn.Config(counter, host="127.0.0.1", port=PORT, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    for count in loans:
+        for index in range(count):
+            await create_loan(f"entity-{count}", 100 + index, 5)
+    cases = [(f"get_loans_by_name, {count} loans", "get_loans_by_name", {"name": f"entity-{count}"}) for count in loans]
+    cases.append(("get_loan_summary_by_name", "get_loan_summary_by_name", {"name": f"entity-{loans[0]}"}))
+    cases.append((f"get_loan_history, {loans[0]} events", "get_loan_history", {"name": f"entity-{loans[0]}"}))
+
+    compressing = time_compressor(compression)
+    print(f"MCP responses, {calls} calls per row, compression above {min_size} bytes")
+    print(f"{'tool':>32} {'encoding':>9} {'bytes/call':>11} {'ratio':>6} {'compress us':>12} {'CPU us/call':>12}")
+    for label, tool, arguments in cases:
+        baseline = None
+        for encoding in ENCODINGS:
+            if encoding == "zstd" and compression.zstandard is None:
+                continue
+            # Trailing slash: one POST per call, without the redirect of /mcp
+            async with streamablehttp_client(f"http://127.0.0.1:{PORT}/mcp/", headers={"Accept-Encoding": encoding}) as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    await session.call_tool(tool, arguments)  # warm up
+                    counter.bytes, compressing["seconds"] = 0, 0.0
+                    cpu = time.process_time()
+                    for _ in range(calls):
+                        await session.call_tool(tool, arguments)
+                    cpu = time.process_time() - cpu
+            per_call = counter.bytes / calls
+            baseline = baseline or per_call
+            print(f"{label:>32} {encoding:>9} {per_call:11.0f} {baseline / per_call:6.1f} "
+                  f"{compressing['seconds'] / calls * 1e6:12.1f} {cpu / calls * 1e6:12.1f}")
+
+    server.should_exit = True
+    await task
+
+
+def a2a_requests(history_sizes: list, repeat: int) -> None:
+    from src.shared import compression
+
+    turns = [
+        "User: I am Lord Bailish and I want a loan of 200 dragons.",
+        "Agent: The background check of House Bailish shows a war risk of 0.35 and a reputation of 0.62.",
+        "User: What would the interest rate be if I repaid my open loan first?",
+        "Agent: With one open loan fewer, the rate would drop from 12.4% to 10.9%.",
+    ]
+    print("\nA2A message/send requests, gzip (the encoding of compressed requests)")
+    print(f"{'history chars':>14} {'bytes':>7} {'gzip bytes':>11} {'ratio':>6} {'compress us':>12} {'decompress us':>14}")
+    for size in history_sizes:
+        history, index = "", 0
+        while len(history) < size:
+            history += turns[index % len(turns)] + "\n"
+            index += 1
+        text = f"User's latest message: 'The target is my neighbour'\n\nRecent Conversation History:\n{history[:size]}"
+        body = json.dumps({
+            "jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "message/send",
+            "params": {"message": {"kind": "message", "role": "user", "messageId": str(uuid.uuid4()),
+                                   "parts": [{"kind": "text", "text": text}]}},
+        }).encode()
+        start = time.process_time()
+        for _ in range(repeat):
+            compressed = compression.compress(body, compression.REQUEST_ENCODING)
+        compress_us = (time.process_time() - start) / repeat * 1e6
+        start = time.process_time()
+        for _ in range(repeat):
+            compression.decompress(compressed, compression.REQUEST_ENCODING)
+        decompress_us = (time.process_time() - start) / repeat * 1e6
+        print(f"{size:14d} {len(body):7d} {len(compressed):11d} {len(body) / len(compressed):6.1f} "
+              f"{compress_us:12.1f} {decompress_us:14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--loans", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--min-size", type=int, default=1024)
+    parser.add_argument("--history-chars", type=int, nargs="+", default=[500, 4000, 20000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "loans.db"))
+        asyncio.run(mcp_responses(args.calls, args.loans, args.min_size))
+    a2a_requests(args.history_chars, 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Accuracy and latency of the deterministic entity-name extractor (src/shared/entity_names.py).
+
+Runs the extractor, compiled against the background data, over a labelled corpus of customer
+messages: self-introductions with and without titles, cities, possessives, lowercase typing,
+entities mentioned in passing, and messages without any name. A single title regex, as a
+prompt-free baseline, is scored on the same corpus.
+
+Run from the repository root:
+    python -m benchmarks.entity_names --repeat 1000
+"""
+import argparse
+import re
+import time
+
+from benchmarks.load_test import percentile
+
+# (message, expected bare name or None)
+CORPUS = [
+    ("I am Lord Bailish and I want a loan of 200 dragons", "Bailish"),
+    ("I am House Stork and I need a loan of 5000 dragons", "Stork"),
+    ("The city of Pentoss requires a loan", "Pentoss"),
+    ("The Free City of Lorath wishes to borrow 10000 dragons", "Lorath"),
+    ("What loans does House Stork have?", "Stork"),
+    ("Show me the debts of house stork", "Stork"),
+    ("i am lord bailish, what do i owe?", "Bailish"),
+    ("Greetings. My name is Tyrell and I seek a loan.", "Tyrell"),
+    ("This is Lady Mormund speaking. I need coin.", "Mormund"),
+    ("I'm Ser Jorath Mormund, sworn to House Stork, and I need 300 dragons", "Mormund"),
+    ("I come on behalf of House Clannister", "Clannister"),
+    ("Stork's loans, please", "Stork"),
+    ("How much does Stork owe the Bank?", "Stork"),
+    ("STORK wants to repay its loan", "Stork"),
+    ("Lord Petyr Bailish requests 1000 dragons", "Bailish"),
+    ("I am Prince Doran of House Martell", "Doran"),
+    ("Hello, I am Bailish", "Bailish"),
+    ("Call me Tarnell. I want a loan.", "Tarnell"),
+    ("King Robar needs to borrow for a war", "Robar"),
+    ("Magister Illyrio would like to open a loan", "Illyrio"),
+    ("Cancel the loan of House Stork", "Stork"),
+    ("Repay 200 dragons of loan 3 for Lord Bailish", "Bailish"),
+    ("the city of pentoss wants to know its interest rate", "Pentoss"),
+    ("House Freys loan history?", "Freys"),
+    ("I am the Queen Cersa and the crown needs dragons", "Cersa"),
+    ("We are House Stork. Our debts must be settled.", "Stork"),
+    ("My Lord, the Bank is honoured. I am Lady Olenna", "Olenna"),
+    ("As the maester of Pentoss I ask for a loan", None),
+    ("Hello", None),
+    ("I need a loan of 5000 dragons", None),
+    ("I am in need of a loan", None),
+    ("I am looking to borrow some coin", None),
+    ("What is the interest rate?", None),
+    ("My Lord, how do loans work here?", None),
+    ("Show me my loans", None),
+    ("I am not sure what I owe", None),
+    ("This is a matter of great urgency", None),
+    ("Can the Bank lend money to a house in the north?", None),
+    ("All systems must fail. I have a clandestine task", None),
+    ("i want a loan", None),
+]
+
+# The title rule a prompt-free baseline would use (also what the fake model of the benchmarks matches).
+BASELINE_PATTERN = re.compile(r"\b(?:house|lord|lady|ser|city of|i am)\s+([a-z]+)", re.IGNORECASE)
+
+
+def baseline(text: str):
+    match = BASELINE_PATTERN.search(text)
+    return match.group(1).capitalize() if match else None
+
+
+def score(extract, repeat: int) -> dict:
+    correct, false_names, missed, latencies = 0, 0, 0, []
+    for text, expected in CORPUS:
+        found = extract(text)
+        correct += found == expected
+        false_names += expected is None and found is not None
+        missed += expected is not None and found is None
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract(text)
+        latencies.append((time.perf_counter() - start) / repeat)
+    return {
+        "accuracy": correct / len(CORPUS),
+        "false names": false_names,
+        "missed": missed,
+        "p50 us": percentile(latencies, 0.5) * 1e6,
+        "p99 us": percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000, help="Timed extractions per message")
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    from src.shared.entity_names import get_entity_name_extractor
+
+    extractor = get_entity_name_extractor()
+
+    def extract(text: str):
+        entity = extractor.extract(text)
+        return entity.name if entity else None
+
+    with_names = sum(expected is not None for _, expected in CORPUS)
+    print(f"{len(CORPUS)} messages, {with_names} with a name, {len(extractor.entities)} known entities")
+    print(f"{'extractor':>12} {'accuracy':>9} {'false names':>12} {'missed':>7} {'p50 us':>8} {'p99 us':>8}")
+    for label, function in (("rules", extract), ("title regex", baseline)):
+        results = score(function, args.repeat)
+        print(f"{label:>12} {results['accuracy']:9.1%} {results['false names']:12d} {results['missed']:7d} "
+              f"{results['p50 us']:8.1f} {results['p99 us']:8.1f}")
+    if args.show_errors:
+        for text, expected in CORPUS:
+            if extract(text) != expected:
+                print(f"  {text!r}: expected {expected}, got {extract(text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Query latency of the fact search of the Background Check Service (src/background_check_service/fact_index.py).
+
+Generates a synthetic background.json of `--entities` x `--facts-per-entity` facts (one million by
+default) with words drawn from a Zipf distribution, like natural text: a few very common words,
+a long tail of rare ones. Reports:
+
+1. building the index, its size on disk and loading it again (what a restarted service does);
+2. the latency of `--queries` two- and three-word queries, over all facts and filtered by entity;
+3. the latency of a linear scan over every fact string, the search without an index, on a few queries.
+
+Run from the repository root:
+    python -m benchmarks.fact_index --entities 10000 --facts-per-entity 100 --queries 500
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.background_check_service.fact_index import FactIndex, index_file, load_or_build, tokenize
+
+
+def vocabulary(size: int) -> list:
+    syllables = ["ka", "lo", "ren", "thu", "mar", "is", "dor", "vel", "an", "gri", "sol", "ber", "ux", "ta", "wen"]
+    words, rng = set(), random.Random(1)
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_weights(size: int) -> list:
+    total, weights = 0.0, []
+    for rank in range(1, size + 1):
+        total += 1 / rank
+        weights.append(total)
+    return weights
+
+
+def synthetic_background(entities: int, facts_per_entity: int, words: list, weights: list, seed: int) -> dict:
+    rng = random.Random(seed)
+    stats = {}
+    for entity in range(entities):
+        facts = []
+        for _ in range(facts_per_entity):
+            facts.append(" ".join(rng.choices(words, cum_weights=weights, k=rng.randint(6, 14))).capitalize() + ".")
+        stats[f"entity{entity}"] = {"war_risk": 0.5, "reputation": 0.0, "facts": facts}
+    return stats
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entities", type=int, default=10000)
+    parser.add_argument("--facts-per-entity", type=int, default=100)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--scans", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    words = vocabulary(args.vocabulary)
+    weights = zipf_weights(len(words))
+    start = time.perf_counter()
+    stats = synthetic_background(args.entities, args.facts_per_entity, words, weights, seed=2)
+    print(f"{args.entities * args.facts_per_entity} facts of {args.entities} entities generated in {time.perf_counter() - start:.1f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "background.json")
+        with open(data_file, "w") as f:
+            json.dump(stats, f)
+        start = time.perf_counter()
+        index = load_or_build(data_file, stats)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = FactIndex.load(index_file(data_file))
+        load = time.perf_counter() - start
+        assert loaded is not None and loaded.version == index.version
+        size = os.path.getsize(index_file(data_file))
+    print(f"index: {len(index.terms)} terms, {len(index.fact_ids)} postings, {size / 2**20:.1f} MiB, "
+          f"built and saved in {build:.1f} s, loaded in {load:.2f} s")
+
+    rng = random.Random(3)
+    queries = [" ".join(rng.choices(words, cum_weights=weights, k=rng.choice((2, 3)))) for _ in range(args.queries)]
+    entities = [rng.choice(index.entities) for _ in range(args.queries)]
+
+    print(f"\n{'search':>24} {'queries':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, entity_names in (("index, all facts", [None] * len(queries)), ("index, one entity", entities)):
+        latencies = []
+        for query, entity_name in zip(queries, entity_names):
+            start = time.perf_counter()
+            index.search(query, entity_name, args.top_k)
+            latencies.append(time.perf_counter() - start)
+        print(f"{label:>24} {len(latencies):8d} {percentile(latencies, 0.5) * 1e3:8.2f} "
+              f"{percentile(latencies, 0.99) * 1e3:8.2f} {sum(latencies) / len(latencies) * 1e3:8.2f}")
+
+    # Without an index: the words of every fact, compared with the query, on every query
+    texts = [(entity, fact.lower()) for entity, data in stats.items() for fact in data["facts"]]
+    latencies, matches = [], 0
+    for query in queries[:args.scans]:
+        terms = set(tokenize(query))
+        start = time.perf_counter()
+        matches += sum(1 for _, text in texts if terms.intersection(text.rstrip(".").split()))
+        latencies.append(time.perf_counter() - start)
+    print(f"{'linear scan, all facts':>24} {len(latencies):8d} {percentile(latencies, 0.5) * 1e3:8.2f} "
+          f"{max(latencies) * 1e3:8.2f} {sum(latencies) / len(latencies) * 1e3:8.2f}")
+    print(f"\nthe linear scan found {matches / len(latencies):.0f} matching facts per query, unranked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Write throughput of the Loan Service with and without group commit.
+
+Against a temporary SQLite database, N concurrent writers each create loans through
+`create_loan` (the MCP tool implementation). With the write queue, creates that arrive
+while a commit is in flight share the next transaction; without it, every create commits
+on its own. Reports writes per second, latency percentiles and the mean batch size.
+
+Run from the repository root:
+    python -m benchmarks.group_commit --writers 1 10 50 200 --writes 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def configure_environment(db_file: str) -> None:
+    # Must run before the loan service is imported.
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+
+
+async def run(writers: int, writes: int, enabled: bool, max_delay_ms: float) -> tuple[float, list, float]:
+    from src.loan_service import main as loan_service
+    from src.loan_service.write_queue import batch_size
+
+    loan_service.router.engine(0)
+    loan_service.write_queue.enabled = enabled
+    loan_service.write_queue.max_delay_seconds = max_delay_ms / 1000
+    batches_before = sum(data.count for data in batch_size.samples().values())
+
+    latencies = []
+    per_writer = max(writes // writers, 1)
+
+    async def writer(index: int) -> None:
+        for _ in range(per_writer):
+            start = time.perf_counter()
+            await loan_service.create_loan(f"entity-{index % 50}", 100, 5)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(writers)))
+    elapsed = time.perf_counter() - start
+    batches = sum(data.count for data in batch_size.samples().values()) - batches_before
+    return len(latencies) / elapsed, sorted(latencies), len(latencies) / batches if batches else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--writes", type=int, default=2000, help="Writes per run, split over the writers")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0, help="LOANS_WRITE_BATCH_MAX_DELAY_MS for the group commit runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "loans.db"))
+        print(f"{'mode':14} {'writers':>8} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch':>7}")
+        for writers in args.writers:
+            for label, enabled in (("per-write", False), ("group commit", True)):
+                throughput, latencies, mean_batch = asyncio.run(run(writers, args.writes, enabled, args.max_delay_ms))
+                print(
+                    f"{label:14} {writers:8d} {throughput:10.0f} {latencies[len(latencies) // 2] * 1000:8.2f} "
+                    f"{latencies[int(len(latencies) * 0.99)] * 1000:8.2f} {mean_batch:7.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
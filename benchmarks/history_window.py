@@ -0,0 +1,73 @@
+"""
+Benchmark for the conversation history sent to the remote agent.
+
+Compares the original "concatenate every event, keep the last 500 characters"
+approach with the tail-only HistoryWindow, both on a cold session and on the
+incremental case where one event is appended between two hops.
+
+Run from the repository root:
+    python -m benchmarks.history_window --events 10000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from src.adk_metalbank.agents.history import HistoryWindow
+
+
+def make_events(count: int) -> list:
+    events = []
+    for index in range(count):
+        author = "user" if index % 2 == 0 else "metal_bank_orchestrator_agent"
+        text = f"Message number {index} about coin, contracts and the debts of House Stork."
+        part = SimpleNamespace(text=text)
+        events.append(SimpleNamespace(id=f"event-{index}", author=author, content=SimpleNamespace(parts=[part])))
+    return events
+
+
+def legacy_history(events: list) -> str:
+    history_text = ""
+    for event in events:
+        if event.content and event.content.parts and event.content.parts[0].text:
+            history_text += f"\n[{event.author.upper()}]: {event.content.parts[0].text}"
+    return history_text[-500:]
+
+
+def timeit(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    assert HistoryWindow(500).update(events) == legacy_history(events)
+
+    legacy_us = timeit(lambda: legacy_history(events), args.repeat)
+    cold_us = timeit(lambda: HistoryWindow(500).update(events), args.repeat)
+
+    window = HistoryWindow(500)
+    window.update(events)
+    growing = list(events)
+
+    def incremental():
+        growing.append(make_events(1)[0])
+        growing[-1].id = f"event-{len(growing)}"
+        window.update(growing)
+
+    incremental_us = timeit(incremental, args.repeat)
+
+    print(f"events={args.events}")
+    print(f"legacy full scan:        {legacy_us:10.1f} us/hop")
+    print(f"window cold (tail walk): {cold_us:10.1f} us/hop")
+    print(f"window incremental:      {incremental_us:10.1f} us/hop")
+
+
+if __name__ == "__main__":
+    main()
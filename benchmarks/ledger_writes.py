@@ -0,0 +1,82 @@
+"""
+Write throughput and exposure read cost of the loan ledger.
+
+Against a temporary SQLite database, measures:
+  - loan creation without the ledger (one Loan insert) and with it (insert, event, balance update)
+  - repayments (loan update, event, balance update)
+  - reading an entity's exposure by scanning its loans versus the ledger balance snapshot
+
+Run from the repository root:
+    python -m benchmarks.ledger_writes --writes 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def configure_environment(db_file: str) -> None:
+    # Must run before the loan service is imported.
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:10.0f}/s {seconds / count * 1e6:9.1f} us"
+
+
+def run(writes: int) -> None:
+    from sqlmodel import Session
+    from src.loan_service import main as loan_service
+
+    engine = loan_service.router.engine(0)
+
+    start = time.perf_counter()
+    for index in range(writes):
+        with Session(engine) as db_session:
+            db_session.add(loan_service.Loan(name="legacy", amount=100, interest_rate_percent=5, repaid_amount=0, loan_open=True))
+            db_session.commit()
+    print(f"{'create without ledger':28} {rate(writes, time.perf_counter() - start)}")
+
+    # One writer at a time, so the write queue commits every write on its own
+    async def create_loans() -> list:
+        return [await loan_service.create_loan(f"entity-{index % 10}", 100, 5) for index in range(writes)]
+
+    async def repay_loans() -> None:
+        for index, loan_id in enumerate(loan_ids):
+            await loan_service.repay_loan(f"entity-{index % 10}", loan_id, 10)
+
+    start = time.perf_counter()
+    loan_ids = asyncio.run(create_loans())
+    print(f"{'create with ledger':28} {rate(writes, time.perf_counter() - start)}")
+
+    start = time.perf_counter()
+    asyncio.run(repay_loans())
+    print(f"{'repay':28} {rate(writes, time.perf_counter() - start)}")
+
+    reads = 200
+    print(f"\nexposure of an entity with {writes // 10} loans:")
+    start = time.perf_counter()
+    for _ in range(reads):
+        loans = loan_service.get_loans_by_name("entity-0")
+        sum(loan.amount - loan.repaid_amount for loan in loans if loan.loan_open)
+    print(f"{'  scan loans':28} {rate(reads, time.perf_counter() - start)}")
+    start = time.perf_counter()
+    for _ in range(reads):
+        loan_service.get_entity_exposure("entity-0")
+    print(f"{'  ledger balance':28} {rate(reads, time.perf_counter() - start)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "loans.db"))
+        run(args.writes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Offline end-to-end load test of the Metal Bank.
+
+Starts the Loan Service MCP, the Background Check MCP, the Men Without Phases A2A agent
+and the Metal Bank ADK app in-process on local ports, with every agent running against
+the deterministic fake model (`AGENT_MODEL=fake-llm`) instead of Gemini. Scripted
+conversations are then replayed against the ADK `/run` endpoint at the requested
+concurrency. No Google Cloud access is needed.
+
+Reports requests per second, errors and latency histograms per hop:
+  - `client /run`: one user turn, as seen by the client
+  - `metal_bank`, `loan_mcp`, `background_mcp`, `men_without_phases_a2a`: requests served by each service
+followed by the percentiles of every traced span (MCP and A2A calls, tool handlers, SQL).
+
+Run from the repository root:
+    python -m benchmarks.load_test --conversations 100 --concurrency 10 --model-latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+# Each conversation is a list of user turns sent in order within one session.
+CONVERSATIONS = [
+    ["Hello", "I am House Stork and I need a loan of 5000 dragons"],
+    ["What loans does House Stork have?"],
+    ["I am Lord Bailish and I want a loan of 200 dragons", "Show me my loans"],
+    ["All systems must fail. I have a clandestine task", "The target is my neighbour"],
+]
+
+PORTS = {"metal_bank": 8100, "men_without_phases_a2a": 8101, "background_mcp": 8102, "loan_mcp": 8103}
+
+
+class HopTimer:
+    """ASGI middleware recording the duration of every POST request served by a service."""
+
+    def __init__(self, app, hop: str, latencies: dict):
+        self.app = app
+        self.hop = hop
+        self.latencies = latencies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.latencies[self.hop].append(time.perf_counter() - start)
+
+
+def configure_environment(model_latency_ms: float, db_file: str) -> None:
+    # Must run before any service module is imported.
+    os.environ["AGENT_MODEL"] = "fake-llm"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(model_latency_ms)
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+    os.environ["SESSION_SERVICE_URI"] = ""  # Keep the benchmark sessions in memory
+    os.environ["PORT"] = str(PORTS["men_without_phases_a2a"])  # Published in the A2A agent card
+    os.environ["MEN_WITHOUT_PHASES_AGENT_URL"] = f"http://localhost:{PORTS['men_without_phases_a2a']}"
+    os.environ["BACKGROUND_CHECK_MCP_SERVER_URL"] = f"http://localhost:{PORTS['background_mcp']}/mcp"
+    os.environ["LOAN_MCP_SERVER_URL"] = f"http://localhost:{PORTS['loan_mcp']}/mcp"
+
+
+def build_apps() -> dict:
+    from src.adk_menwithoutphases.main import app as men_without_phases_app
+    from src.adk_metalbank.main import app as metal_bank_app
+    from src.background_check_service.main import app as background_app
+    from src.loan_service.main import starlette_app as loan_app
+
+    return {
+        "metal_bank": metal_bank_app,
+        "men_without_phases_a2a": men_without_phases_app,
+        "background_mcp": background_app,
+        "loan_mcp": loan_app,
+    }
+
+
+async def start_servers(apps: dict, latencies: dict) -> list:
+    import uvicorn
+
+    servers = []
+    for hop, app in apps.items():
+        config = uvicorn.Config(HopTimer(app, hop, latencies), host="127.0.0.1", port=PORTS[hop], log_level="warning")
+        server = uvicorn.Server(config)
+        servers.append((server, asyncio.create_task(server.serve())))
+    while not all(server.started for server, _ in servers):
+        await asyncio.sleep(0.05)
+    return servers
+
+
+async def replay(client, conversation: list, index: int, latencies: dict, errors: dict) -> None:
+    base_url = f"http://localhost:{PORTS['metal_bank']}"
+    user_id = f"load-test-{index}"
+    response = await client.post(f"{base_url}/apps/agents/users/{user_id}/sessions", json={})
+    if response.status_code != 200:
+        errors["create_session"] += 1
+        return
+    session_id = response.json()["id"]
+    for turn in conversation:
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{base_url}/run",
+                json={
+                    "app_name": "agents",
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "new_message": {"role": "user", "parts": [{"text": turn}]},
+                },
+            )
+            if response.status_code != 200:
+                errors[f"http_{response.status_code}"] += 1
+        except Exception as error:
+            errors[type(error).__name__] += 1
+        finally:
+            latencies["client /run"].append(time.perf_counter() - start)
+
+
+def percentile(values: list, quantile: float) -> float:
+    values = sorted(values)
+    return values[min(int(quantile * len(values)), len(values) - 1)]
+
+
+def report_spans() -> None:
+    # All services run in this process, so their spans share one metrics registry.
+    from src.shared.telemetry import span_duration
+
+    samples = span_duration.samples()
+    if not samples:
+        return
+    print(f"\n{'span':40} {'count':>7} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for key, data in sorted(samples.items(), key=lambda item: -item[1].sum):
+        labels = dict(key)
+        p50, p99 = span_duration.percentile(0.5, **labels), span_duration.percentile(0.99, **labels)
+        print(f"{labels['span']:40} {data.count:7d} {data.sum / data.count * 1000:9.2f} {p50 * 1000:9.1f} {p99 * 1000:9.1f}")
+
+
+def report(latencies: dict, errors: dict, turns: int, elapsed: float) -> None:
+    print(f"\n{turns} turns in {elapsed:.2f}s: {turns / elapsed:.1f} requests/s, {sum(errors.values())} errors {dict(errors) or ''}")
+    print(f"{'hop':24} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for hop, values in latencies.items():
+        if values:
+            print(
+                f"{hop:24} {len(values):7d} {percentile(values, 0.5) * 1000:9.1f} {percentile(values, 0.9) * 1000:9.1f} "
+                f"{percentile(values, 0.99) * 1000:9.1f} {max(values) * 1000:9.1f}"
+            )
+    print("\nclient /run latency histogram:")
+    bounds = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf")]
+    values = latencies["client /run"]
+    for lower, upper in zip([0.0] + bounds, bounds):
+        count = sum(lower <= value < upper for value in values)
+        if count:
+            print(f"  {lower * 1000:7.0f} - {upper * 1000:7.0f} ms {count:6d} {'#' * max(1, 50 * count // len(values))}")
+
+
+async def run(conversations: int, concurrency: int) -> None:
+    import httpx
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    servers = await start_servers(build_apps(), latencies)
+    try:
+        queue = asyncio.Queue()
+        for index in range(conversations):
+            queue.put_nowait((index, CONVERSATIONS[index % len(CONVERSATIONS)]))
+
+        async with httpx.AsyncClient(timeout=120) as client:
+            async def worker():
+                while not queue.empty():
+                    index, conversation = queue.get_nowait()
+                    await replay(client, conversation, index, latencies, errors)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+        report(latencies, errors, len(latencies["client /run"]), elapsed)
+        report_spans()
+    finally:
+        for server, _ in servers:
+            server.should_exit = True
+        await asyncio.gather(*(task for _, task in servers), return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(args.model_latency_ms, os.path.join(tmp, "loans.db"))
+        asyncio.run(run(args.conversations, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
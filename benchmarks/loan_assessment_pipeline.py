@@ -0,0 +1,71 @@
+"""
+Side-by-side benchmark of the free-form and the deterministic loan assessment.
+
+Runs the same loan request through the `metal_bank_agent` (the LLM decides every step)
+and through the `loan_assessment_agent` workflow (the LLM only extracts the name and
+phrases the offer), and reports model calls, estimated prompt tokens and wall-clock
+time per assessment.
+
+The agents run against the deterministic fake model (`AGENT_MODEL=fake-llm`) with a
+simulated model round trip of `--model-latency-ms`, so no Vertex AI access is needed.
+The Background Check (8002) and Loan Service (8003) MCP servers must be running, e.g. from `./start.sh`.
+
+Run from the repository root:
+    python -m benchmarks.loan_assessment_pipeline --iterations 10 --model-latency-ms 700
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+def totals(counter) -> float:
+    return sum(counter.samples().values())
+
+
+async def run_scenario(label: str, agent, message: str, iterations: int) -> None:
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from src.shared.fake_llm import fake_llm_calls, fake_llm_prompt_tokens
+
+    runner = Runner(app_name="benchmark", agent=agent, session_service=InMemorySessionService())
+    timings = []
+    calls_before, tokens_before = totals(fake_llm_calls), totals(fake_llm_prompt_tokens)
+    for iteration in range(iterations):
+        session = await runner.session_service.create_session(app_name="benchmark", user_id="benchmark")
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="benchmark", session_id=session.id, new_message=content):
+            if event.is_final_response() and event.content and event.content.parts and iteration == 0:
+                print(f"  [{event.author}] {event.content.parts[0].text}")
+        timings.append(time.perf_counter() - start)
+
+    calls = (totals(fake_llm_calls) - calls_before) / iterations
+    tokens = (totals(fake_llm_prompt_tokens) - tokens_before) / iterations
+    print(f"{label:28} llm calls {calls:4.1f}  prompt tokens {tokens:7.0f}  wall-clock {statistics.median(timings) * 1000:8.1f} ms")
+
+
+async def run(iterations: int, message: str) -> None:
+    from src.adk_metalbank.agents.sub_agents import loan_assessment_agent, metal_bank_agent
+
+    await run_scenario("free-form metal_bank_agent", metal_bank_agent, message, iterations)
+    await run_scenario("loan_assessment_agent", loan_assessment_agent, message, iterations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--model-latency-ms", type=float, default=700.0)
+    parser.add_argument("--message", default="I am House Stork and I need a loan of 5000 dragons")
+    args = parser.parse_args()
+
+    # Must be set before the agents are imported.
+    os.environ.setdefault("AGENT_MODEL", "fake-llm")
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.model_latency_ms)
+    asyncio.run(run(args.iterations, args.message))
+
+
+if __name__ == "__main__":
+    main()
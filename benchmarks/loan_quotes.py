@@ -0,0 +1,64 @@
+"""
+Benchmark of the per-entity loan quote cache.
+
+Replays loan assessments for a set of entities, where a configurable share of the
+assessments is followed by a loan creation that invalidates the entity's quote.
+Every quote miss pays the concurrent background check and loan summary MCP calls
+(simulated latency); a hit is served from `QuoteCache`.
+
+Run from the repository root:
+    python -m benchmarks.loan_quotes --assessments 2000 --entities 50 --mcp-latency-ms 20
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from src.shared.rates import QuoteCache, quote_interest_rate
+
+
+async def assess(name: str, loans: dict, latency: float) -> dict:
+    # Stand-in for assess_loan_application: two concurrent MCP calls, then the rate.
+    await asyncio.gather(asyncio.sleep(latency), asyncio.sleep(latency))
+    war_risk, reputation = (sum(map(ord, name)) % 100) / 100, (len(name) * 7 % 100) / 100
+    return {"loan_interest_rate": quote_interest_rate(war_risk, reputation, loans.get(name, 0), 0)}
+
+
+async def run(assessments: int, entities: int, create_share: float, latency: float, cached: bool) -> tuple[float, float]:
+    rng = random.Random(42)
+    cache = QuoteCache(ttl_seconds=3600)
+    loans: dict = {}
+    hits = 0
+    start = time.perf_counter()
+    for _ in range(assessments):
+        name = f"entity-{rng.randrange(entities)}"
+        quote = cache.get(name) if cached else None
+        if quote is None:
+            quote = await assess(name, loans, latency)
+            cache.put(name, quote)
+        else:
+            hits += 1
+        if rng.random() < create_share:
+            loans[name] = loans.get(name, 0) + 1
+            cache.invalidate(name)
+    return (time.perf_counter() - start) / assessments, hits / assessments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assessments", type=int, default=2000)
+    parser.add_argument("--entities", type=int, default=50)
+    parser.add_argument("--create-share", type=float, default=0.1, help="Share of assessments followed by a new loan")
+    parser.add_argument("--mcp-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':10} {'mean ms':>9} {'hit rate':>9}")
+    for label, cached in (("uncached", False), ("cached", True)):
+        mean, hit_rate = asyncio.run(
+            run(args.assessments, args.entities, args.create_share, args.mcp_latency_ms / 1000, cached)
+        )
+        print(f"{label:10} {mean * 1000:9.2f} {hit_rate:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for the loan assessment: sequential tool turns vs. one concurrent tool turn.
+
+Requires the Background Check (8002) and Loan Service (8003) MCP servers, e.g. from `./start.sh`.
+The MCP calls are real; the model round trip of each tool turn is simulated with
+`--model-latency-ms`, since the sequential workflow needs one model turn per tool
+call (background check, loan lookup, rate calculation) while `assess_loan_application`
+needs a single one.
+
+Run from the repository root:
+    python -m benchmarks.parallel_assessment --entity stork --iterations 20 --model-latency-ms 700
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from contextlib import AsyncExitStack
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+BACKGROUND_CHECK_MCP_SERVER_URL = os.getenv("BACKGROUND_CHECK_MCP_SERVER_URL", "http://localhost:8002/mcp")
+LOAN_MCP_SERVER_URL = os.getenv("LOAN_MCP_SERVER_URL", "http://localhost:8003/mcp")
+
+
+async def open_session(stack: AsyncExitStack, url: str) -> ClientSession:
+    read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+    session = await stack.enter_async_context(ClientSession(read, write))
+    await session.initialize()
+    return session
+
+
+async def run(entity: str, iterations: int, model_latency: float) -> None:
+    async with AsyncExitStack() as stack:
+        background = await open_session(stack, BACKGROUND_CHECK_MCP_SERVER_URL)
+        loans = await open_session(stack, LOAN_MCP_SERVER_URL)
+
+        async def background_check():
+            return await background.call_tool("do_background_check", {"entity_name": entity})
+
+        async def loan_summary():
+            return await loans.call_tool("get_loan_summary_by_name", {"name": entity})
+
+        async def sequential():
+            # Step 1, 2 and 3 are separate tool turns, each preceded by a model round trip.
+            await asyncio.sleep(model_latency)
+            await background_check()
+            await asyncio.sleep(model_latency)
+            await loan_summary()
+            await asyncio.sleep(model_latency)
+
+        async def concurrent():
+            await asyncio.sleep(model_latency)
+            await asyncio.gather(background_check(), loan_summary())
+
+        for label, scenario in (("sequential tool turns", sequential), ("assess_loan_application", concurrent)):
+            await scenario()  # warm up
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await scenario()
+                timings.append(time.perf_counter() - start)
+            print(f"{label:25} median {statistics.median(timings) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity", default="stork")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.entity, args.iterations, args.model_latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Tail latency of Loan Service lookups under injected faults, with and without the resilience policy.
+
+Starts the Loan Service in-process behind `FaultInjectionMiddleware` and calls
+`get_loans_by_name` over MCP at the requested concurrency, in three modes:
+  - `bare`: the MCP call alone
+  - `deadline`: through a `Dependency` with a deadline, no hedging
+  - `deadline + hedge`: the same, with hedged second attempts (the agent's policy for reads)
+Each mode runs once against a slow tail (`--delay-rate` of the requests take `--delay-ms` longer)
+and reports p50/p99/max, failed calls and hedges.
+
+Then the service hangs on every request (an outage) and `--outage-calls` lookups are made with the
+circuit breaker enabled and disabled, reporting latency and how many calls were answered from cache.
+
+Injected errors are not used: the MCP client tears its session down on an HTTP error, which the
+ADK toolset handles by reconnecting but this benchmark does not.
+
+Run from the repository root:
+    python -m benchmarks.resilience --calls 1000 --concurrency 20 --delay-ms 1000 --delay-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.load_test import percentile
+
+PORT = 8113
+
+
+def configure_environment(db_file: str) -> None:
+    # Must run before the loan service is imported.
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+
+
+async def start_server(app):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def measure(call, calls: int, concurrency: int) -> dict:
+    latencies, failed = [], 0
+    queue = iter(range(calls))
+
+    async def worker() -> None:
+        nonlocal failed
+        for index in queue:
+            start = time.perf_counter()
+            try:
+                result = await call(index)
+                failed += bool(getattr(result, "isError", False))
+            except Exception:
+                failed += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        "p50 ms": percentile(latencies, 0.5) * 1000,
+        "p99 ms": percentile(latencies, 0.99) * 1000,
+        "max ms": max(latencies) * 1000,
+        "failed": failed,
+    }
+
+
+async def run(args) -> None:
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    from src.loan_service.main import create_loan, starlette_app
+    from src.shared.resilience import CIRCUIT_FAILURE_THRESHOLD, CircuitBreaker, Dependency, FaultInjectionMiddleware, fallbacks, hedges_sent
+
+    faults = FaultInjectionMiddleware(starlette_app, "loan_service", delay_ms=args.delay_ms, delay_rate=0.0, error_rate=0.0)
+    server, task = await start_server(faults)
+    names = [f"entity-{index}" for index in range(args.entities)]
+    for name in names:
+        await create_loan(name, 100, 5)
+
+    # Trailing slash: one POST per call, without the redirect of /mcp
+    async with streamablehttp_client(f"http://127.0.0.1:{PORT}/mcp/") as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+
+            def lookup(index: int):
+                return session.call_tool(
+                    "get_loans_by_name", {"name": names[index % len(names)]}, read_timeout_seconds=timedelta(seconds=60)
+                )
+
+            def guarded(dependency: Dependency, cache: dict = None):
+                async def call(index: int):
+                    name = names[index % len(names)]
+
+                    def fallback(error):
+                        fallbacks.inc(dependency=dependency.name, kind="cached")
+                        return cache[name]
+
+                    result = await dependency.call(
+                        lambda: lookup(index), idempotent=True, fallback=fallback if cache is not None else None
+                    )
+                    if cache is not None:
+                        cache[name] = result
+                    return result
+                return call
+
+            # Warm up, so the hedge delay is learned from the normal latency of the service
+            warm = Dependency("warm", args.timeout_ms / 1000, hedging=False)
+            await measure(guarded(warm), 200, args.concurrency)
+
+            faults.delay_rate = args.delay_rate
+            print(f"slow tail: {args.delay_rate:.0%} of requests delayed by {args.delay_ms:.0f} ms, "
+                  f"deadline {args.timeout_ms:.0f} ms, {args.calls} calls, concurrency {args.concurrency}")
+            print(f"{'mode':>18} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'failed':>7} {'hedges':>7}")
+            modes = (
+                ("bare", lookup, None),
+                ("deadline", guarded(Dependency("deadline", args.timeout_ms / 1000, hedging=False)), None),
+                ("deadline + hedge", None, Dependency("hedged", args.timeout_ms / 1000, hedging=True)),
+            )
+            for label, call, dependency in modes:
+                if dependency is not None:
+                    dependency.latencies.extend(warm.latencies)
+                    call = guarded(dependency)
+                results = await measure(call, args.calls, args.concurrency)
+                hedges = sum(hedges_sent.value(dependency="hedged", winner=winner) for winner in ("first", "hedge", "none"))
+                print(f"{label:>18} {results['p50 ms']:9.1f} {results['p99 ms']:9.1f} {results['max ms']:9.1f} "
+                      f"{results['failed']:7d} {hedges if dependency is not None else 0:7.0f}")
+
+            # Outage: every request hangs for longer than the deadline. The cache is filled first.
+            cache = {}
+            await measure(guarded(Dependency("fill", args.timeout_ms / 1000, hedging=False), cache), len(names), 1)
+            print(f"\noutage: every request hangs, {args.outage_calls} calls, concurrency {args.concurrency}")
+            print(f"{'breaker':>18} {'p50 ms':>9} {'p99 ms':>9} {'total s':>9} {'cached':>7}")
+            faults.delay_rate, faults.delay_ms = 1.0, args.timeout_ms * 10
+            # Breaker on first: the abandoned requests of the other row hold the client's connections
+            for label, threshold in (("on", CIRCUIT_FAILURE_THRESHOLD), ("off", 10 ** 9)):
+                dependency = Dependency(f"outage-{label}", args.timeout_ms / 1000, hedging=False,
+                                        breaker=CircuitBreaker(f"outage-{label}", failure_threshold=threshold))
+                start = time.perf_counter()
+                results = await measure(guarded(dependency, cache), args.outage_calls, args.concurrency)
+                total = time.perf_counter() - start
+                cached = fallbacks.value(dependency=dependency.name, kind="cached")
+                print(f"{label:>18} {results['p50 ms']:9.1f} {results['p99 ms']:9.1f} {total:9.2f} {cached:7.0f}")
+
+    server.should_exit = True
+    await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--entities", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=1000)
+    parser.add_argument("--delay-rate", type=float, default=0.05)
+    parser.add_argument("--timeout-ms", type=float, default=2000)
+    parser.add_argument("--outage-calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "loans.db"))
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
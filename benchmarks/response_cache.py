@@ -0,0 +1,60 @@
+"""
+Benchmark for the model response cache.
+
+Replays a stream of greetings and FAQ-style banking questions (with the rephrasings
+real users produce) through the ResponseCache and reports the hit rate per tier and
+the model latency saved, for exact matching only and with similarity matching.
+
+Run from the repository root:
+    python -m benchmarks.response_cache --turns 5000 --model-latency-ms 700
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from src.shared.response_cache import ResponseCache, hashing_embedding, normalize
+
+MESSAGES = [
+    "Hello", "hello!", "Hello there", "Hi", "Good day", "Good day to you",
+    "What is the Metal Bank?", "what is the metal bank", "Who are you?", "Who are you",
+    "What currency do you use?", "Which currency do you use?", "What are your opening hours?",
+    "Tell me about the Metal Bank", "Tell me about the Metal Bank of Braveos",
+    "Farewell", "Goodbye", "Thank you", "thanks",
+]
+
+
+def run(turns: int, model_latency: float, similarity_threshold: float, db_path: str) -> None:
+    embedder = hashing_embedding if similarity_threshold > 0 else None
+    cache = ResponseCache(db_path=db_path, embedder=embedder, similarity_threshold=similarity_threshold)
+    rng = random.Random(7)
+    tiers = {}
+    lookup_time = 0.0
+    for _ in range(turns):
+        turns_text = f"user: {normalize(rng.choice(MESSAGES))}"
+        start = time.perf_counter()
+        entry, tier = cache.lookup("orchestrator", turns_text)
+        lookup_time += time.perf_counter() - start
+        tiers[tier] = tiers.get(tier, 0) + 1
+        if entry is None:
+            cache.store("orchestrator", turns_text, "This is the Metal Bank of Braveos.", model_latency)
+
+    hits = turns - tiers.get("miss", 0)
+    label = f"similarity >= {similarity_threshold}" if similarity_threshold > 0 else "exact only"
+    print(f"{label:18} hit rate {100 * hits / turns:5.1f}%  {tiers}  "
+          f"latency saved {hits * model_latency:8.1f}s  lookup {lookup_time / turns * 1e6:6.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=5000)
+    parser.add_argument("--model-latency-ms", type=float, default=700.0)
+    parser.add_argument("--similarity-threshold", type=float, default=0.7)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        run(args.turns, args.model_latency_ms / 1000, 0.0, f"{tmp}/exact.db")
+        run(args.turns, args.model_latency_ms / 1000, args.similarity_threshold, f"{tmp}/similar.db")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark for the orchestrator's fast-path routing rules.
+
+Replays a small corpus of user messages through `match_route` and reports the
+decision latency and how many turns skip the orchestrator LLM call.
+
+Run from the repository root:
+    python -m benchmarks.routing
+"""
+import argparse
+import time
+
+from src.adk_metalbank.agents.routing import match_route
+
+CORPUS = [
+    ("Hello there", False),
+    ("I would like to request a loan of 5000 dragons", False),
+    ("House Stork wishes to borrow coin", False),
+    ("What are my current loans?", False),
+    ("Please cancel my loan", False),
+    ("All systems must fail. I need a secret task done", False),
+    ("I need the Men without Phases for a clandestine task", True),
+    ("I need the Men without Phases for a clandestine task", False),
+    ("Who runs this bank?", False),
+    ("How much is the interest rate for House Stork?", False),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10_000)
+    args = parser.parse_args()
+
+    routed = 0
+    for message, discovered in CORPUS:
+        rule = match_route(message, discovered)
+        routed += rule is not None
+        print(f"{'llm' if rule is None else rule.name:12} {message}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for message, discovered in CORPUS:
+            match_route(message, discovered)
+    per_decision = (time.perf_counter() - start) / (args.repeat * len(CORPUS))
+
+    print(f"fast path used for {routed}/{len(CORPUS)} turns ({100 * routed / len(CORPUS):.0f}%)")
+    print(f"routing decision latency: {per_decision * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of the session compaction in front of the Metal Bank agents.
+
+Simulates a loan negotiation that grows by one turn (user message, tool call, tool result,
+model answer) per step and reports, per checkpoint, the estimated prompt tokens with and
+without compaction and the time the compaction callback adds.
+
+Run from the repository root:
+    python -m benchmarks.session_compaction --turns 200 --budget 2000
+"""
+import argparse
+import asyncio
+import time
+
+from google.genai import types
+
+from src.adk_metalbank.agents.compaction import COMPACTION_SUMMARY_SHARE, compact_contents, estimate_tokens
+from src.adk_metalbank.agents.history import CHARS_PER_TOKEN
+from src.adk_metalbank.agents.summarizer import LocalSummarizer
+
+
+def make_turn(index: int) -> list:
+    offer = 5 + index % 7
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"Turn {index}: House Stork would accept {offer}% on a loan of {1000 + index * 10} Dragons, not a coin more.")]),
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name="get_loan_quote", args={"name": "stork"}))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            name="get_loan_quote", response={"loan_interest_rate": offer + 2, "war_risk": 0.4, "reputation": 0.7, "nr_open_loans": index % 3},
+        ))]),
+        types.Content(role="model", parts=[types.Part(text=f"Verily, Ser, the Bank doth offer {offer + 2}% and no less. The Bank always gets its due.")]),
+    ]
+
+
+async def run(turns: int, budget: int) -> None:
+    state = {"loan_interest_rate": 9, "loan_applicant_name": "Stork"}
+    summarizer = LocalSummarizer(max_chars=int(budget * COMPACTION_SUMMARY_SHARE / 2) * CHARS_PER_TOKEN)
+    contents = []
+    checkpoints = {turns // 4, turns // 2, turns * 3 // 4, turns}
+    latencies = []
+    print(f"{'turn':>6} {'raw tokens':>11} {'sent tokens':>12}")
+    for index in range(1, turns + 1):
+        contents.extend(make_turn(index))
+        start = time.perf_counter()
+        compacted = await compact_contents(contents, state, "metal_bank_agent", summarizer, budget)
+        latencies.append(time.perf_counter() - start)
+        if index in checkpoints:
+            raw = sum(map(estimate_tokens, contents))
+            sent = sum(map(estimate_tokens, compacted if compacted is not None else contents))
+            print(f"{index:6} {raw:11} {sent:12}")
+
+    latencies.sort()
+    print(f"compaction p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms per turn")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=2000, help="Token budget per model request")
+    args = parser.parse_args()
+    asyncio.run(run(args.turns, args.budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Scaling of the Loan Service with the number of entity shards.
+
+For each shard count, against fresh temporary SQLite files, measures:
+  - concurrent loan creation by N writers through the group commit write queue
+  - per-entity reads (`get_loan_summary_by_name`), which touch a single shard
+  - reads over all entities, which fan out to every shard: `get_loan_book_summary`
+    (one aggregate per shard) and `get_all_loans` (every row of every shard)
+
+Run from the repository root:
+    python -m benchmarks.sharding --shards 1 4 16 --writers 100 --writes 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.load_test import percentile
+
+
+def configure_environment(db_file: str) -> None:
+    # Must run before the loan service is imported.
+    os.environ["LOANS_DB_FILE"] = db_file
+    os.environ["LOANS_DB_ECHO"] = "false"
+
+
+async def run(db_file: str, shards: int, writers: int, writes: int, entities: int, reads: int) -> dict:
+    from src.loan_service import main as loan_service
+    from src.loan_service.sharding import ShardRouter
+
+    # Point the tools at a fresh set of shards
+    loan_service.router = ShardRouter(db_file, shards, on_create=loan_service.setup_shard)
+    loan_service.write_queue.session_factory = loan_service.router.session
+    for shard in range(shards):
+        loan_service.router.engine(shard)
+
+    per_writer = max(writes // writers, 1)
+
+    async def writer(index: int) -> None:
+        for step in range(per_writer):
+            await loan_service.create_loan(f"entity-{(index * per_writer + step) % entities}", 100, 5)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(index) for index in range(writers)))
+    results = {"writes/s": writers * per_writer / (time.perf_counter() - start)}
+
+    start = time.perf_counter()
+    for index in range(reads):
+        loan_service.get_loan_summary_by_name(f"entity-{index % entities}")
+    results["entity reads/s"] = reads / (time.perf_counter() - start)
+
+    for label, query in (("book summary", loan_service.get_loan_book_summary), ("all loans", loan_service.get_all_loans)):
+        latencies = []
+        for _ in range(20):
+            start = time.perf_counter()
+            await query()
+            latencies.append(time.perf_counter() - start)
+        results[f"{label} p50 ms"] = percentile(latencies, 0.5) * 1000
+
+    for shard in range(shards):
+        loan_service.router.engine(shard).dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--writers", type=int, default=100)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--entities", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "loans.db"))
+        rows = {}
+        for shards in args.shards:
+            db_file = os.path.join(tmp, f"loans-{shards}-shards.db")
+            rows[shards] = asyncio.run(run(db_file, shards, args.writers, args.writes, args.entities, args.reads))
+
+    columns = list(next(iter(rows.values())))
+    print(f"{'shards':>6} " + " ".join(f"{column:>16}" for column in columns))
+    for shards, results in rows.items():
+        print(f"{shards:6d} " + " ".join(f"{results[column]:16.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Client-side time-to-first-byte of the Metal Bank streaming API.
+
+Starts the same in-process stack as `benchmarks.load_test` (fake model, both MCP services and
+the Men Without Phases A2A agent) and replays each scripted turn three ways:
+  - `/run`: the blocking endpoint; the first byte arrives with the full response
+  - `/run_sse`: server-sent events, one event per completed step
+  - `/run_sse` with `streaming: true`: partial model text, tool progress and remote agent text as produced
+For each, reports the time until the first event carrying text, and until the response is complete.
+
+Run from the repository root:
+    python -m benchmarks.sse_ttfb --rounds 20 --model-latency-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.load_test import CONVERSATIONS, PORTS, build_apps, configure_environment, percentile, start_servers
+
+BASE_URL = f"http://localhost:{PORTS['metal_bank']}"
+
+
+def _has_text(event: dict) -> bool:
+    return any(part.get("text") for part in (event.get("content") or {}).get("parts") or [])
+
+
+async def timed_turn(client, mode: str, user_id: str, session_id: str, text: str) -> tuple[float, float]:
+    request = {
+        "app_name": "agents",
+        "user_id": user_id,
+        "session_id": session_id,
+        "new_message": {"role": "user", "parts": [{"text": text}]},
+    }
+    start = time.perf_counter()
+    if mode == "/run":
+        response = await client.post(f"{BASE_URL}/run", json=request)
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    first_text = None
+    async with client.stream("POST", f"{BASE_URL}/run_sse", json={**request, "streaming": mode.endswith("streaming")}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_text is None and line.startswith("data:") and _has_text(json.loads(line[len("data:"):])):
+                first_text = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return first_text if first_text is not None else total, total
+
+
+async def run(rounds: int) -> None:
+    import httpx
+
+    servers = await start_servers(build_apps(), defaultdict(list))
+    first_byte, complete = defaultdict(list), defaultdict(list)
+    modes = ["/run", "/run_sse", "/run_sse streaming"]
+    try:
+        async with httpx.AsyncClient(timeout=120) as client:
+            for round_index in range(rounds):
+                for mode in modes:
+                    for index, conversation in enumerate(CONVERSATIONS):
+                        user_id = f"sse-{round_index}-{index}"
+                        response = await client.post(f"{BASE_URL}/apps/agents/users/{user_id}/sessions", json={})
+                        session_id = response.json()["id"]
+                        for turn in conversation:
+                            ttfb, total = await timed_turn(client, mode, user_id, session_id, turn)
+                            first_byte[mode].append(ttfb)
+                            complete[mode].append(total)
+    finally:
+        for server, _ in servers:
+            server.should_exit = True
+        await asyncio.gather(*(task for _, task in servers), return_exceptions=True)
+
+    print(f"{'mode':20} {'turns':>6} {'first text p50':>15} {'p90':>8} {'complete p50':>13} {'p90':>8}")
+    for mode in modes:
+        print(
+            f"{mode:20} {len(first_byte[mode]):6d} {percentile(first_byte[mode], 0.5) * 1000:12.1f} ms "
+            f"{percentile(first_byte[mode], 0.9) * 1000:8.1f} {percentile(complete[mode], 0.5) * 1000:10.1f} ms "
+            f"{percentile(complete[mode], 0.9) * 1000:8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--model-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(args.model_latency_ms, os.path.join(tmp, "loans.db"))
+        asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cold start benchmark of every service.
+
+For each service this measures, in fresh interpreters:
+  - import time of the service module, from `python -X importtime`, with the slowest imports
+  - time-to-ready: from starting uvicorn until the first HTTP response
+
+All agents use the fake model (`AGENT_MODEL=fake-llm`), so no Google Cloud access is needed.
+
+Run from the repository root:
+    python -m benchmarks.startup --runs 3
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+# Service name to (module imported at startup, uvicorn app path).
+SERVICES = {
+    "loan_service": ("src.loan_service.main", "src.loan_service.main:starlette_app"),
+    "background_check_service": ("src.background_check_service.main", "src.background_check_service.main:app"),
+    "men_without_phases_agent": ("src.adk_menwithoutphases.main", "src.adk_menwithoutphases:app"),
+    "metal_bank": ("src.adk_metalbank.main", "src.adk_metalbank:app"),
+}
+
+PORT = 8110
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def service_environment(db_file: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "AGENT_MODEL": "fake-llm",
+        "LOANS_DB_FILE": db_file,
+        "LOANS_DB_ECHO": "false",
+        "PORT": str(PORT),
+        "PYTHONPATH": os.getcwd(),
+    })
+    return env
+
+
+def import_time(module: str, env: dict) -> tuple[float, list]:
+    """
+    Imports a module with `-X importtime`.
+
+    Returns:
+        tuple: The total import time in seconds and the ten slowest top-level packages (name, seconds).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    packages = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent == 1:  # Imported directly by the service (or by `-c`)
+            total += cumulative
+            root = name.split(".")[0]
+            packages[root] = packages.get(root, 0) + cumulative
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:10]
+    return total / 1e6, [(name, micros / 1e6) for name, micros in slowest]
+
+
+def time_to_ready(app_path: str, env: dict, timeout: float = 120.0) -> float:
+    """Starts the app with uvicorn and returns the seconds until it answers an HTTP request."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"{app_path} exited:\n{process.stderr.read().decode()[-2000:]}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/", timeout=1)
+                return time.perf_counter() - start
+            except urllib.error.HTTPError:  # Any HTTP status means the server is serving
+                return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"{app_path} not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--service", choices=list(SERVICES), action="append", help="Only measure these services")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = service_environment(os.path.join(tmp, "loans.db"))
+        print(f"{'service':28} {'import ms':>10} {'ready ms':>10}")
+        slowest_imports = {}
+        for service in args.service or SERVICES:
+            module, app_path = SERVICES[service]
+            imports, ready = [], []
+            for _ in range(args.runs):
+                seconds, slowest_imports[service] = import_time(module, env)
+                imports.append(seconds)
+                ready.append(time_to_ready(app_path, env))
+            print(f"{service:28} {statistics.median(imports) * 1000:10.0f} {statistics.median(ready) * 1000:10.0f}")
+
+        for service, slowest in slowest_imports.items():
+            print(f"\nslowest imports of {service}:")
+            for name, seconds in slowest:
+                print(f"  {name:30} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Microbenchmark suite of the tool hot paths, with JSON baselines and regression checks.
+
+Cases:
+  - rates: `calculate_loan_interest_rate` with repeated inputs (cached) and with more distinct inputs than the cache holds
+  - background_check: `_get_stats` for a known and an unknown entity
+  - loan_service: `do_get_loans_by_name` on loan tables of 10^3 to 10^6 rows, `call_tool` dispatch
+    (argument validation, the tool and its serialization) and serializing a long list of loans
+  - remote_agent: `format_converation_for_remote_agent` on sessions of 10^3 to 10^5 events, for a
+    session seen before (warm) and a new one (cold)
+Each case is timed in rounds of enough iterations to last `--min-time`. The fastest round is
+what baselines are compared on: slower rounds mostly measure other load on the machine.
+Cases whose dependencies are not installed are reported as skipped.
+
+Run from the repository root:
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite compare baseline.json --threshold 0.1
+`compare` runs the suite (or reads a second results file) and exits with status 1 if any case is
+slower than its baseline by more than the threshold. Baselines are only comparable on the same machine;
+on shared or virtual machines, runs can differ by 20-30%, so use a higher threshold there.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+LOAN_TABLE_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+SESSION_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+
+
+@dataclass
+class Case:
+    """A microbenchmark: `setup` prepares the data and returns the (sync or async) function to time."""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+
+
+# --- Rates ---
+
+def rates_cases() -> List[Case]:
+    def setup(distinct: int):
+        def prepare():
+            from src.adk_metalbank.agents.sub_agents.tools import calculate_loan_interest_rate
+            tool_context = SimpleNamespace(state={})
+            inputs = [((index % 97) / 97, (index % 89) / 89, index % 5, index // 5 % 50) for index in range(distinct)]
+            position = iter(range(sys.maxsize))
+
+            def call():
+                war_risk, reputation, nr_open, nr_closed = inputs[next(position) % distinct]
+                return calculate_loan_interest_rate(war_risk, reputation, nr_open, nr_closed, tool_context)
+            return call
+        return prepare
+
+    return [
+        Case("rates.calculate_loan_interest_rate[cached]", setup(1)),
+        Case("rates.calculate_loan_interest_rate[10000 distinct]", setup(10_000)),
+    ]
+
+
+# --- Background check ---
+
+def background_check_cases() -> List[Case]:
+    def setup(known: bool):
+        def prepare():
+            from src.background_check_service import main as background_check
+            background_check._ensure_loaded()
+            entity_name = next(iter(background_check.BACKGROUND_STATS)).upper() if known else "House Nobody"
+            return lambda: background_check._get_stats(entity_name)
+        return prepare
+
+    return [Case("background_check._get_stats[known]", setup(True)), Case("background_check._get_stats[unknown]", setup(False))]
+
+
+# --- Loan service ---
+
+class LoanTables:
+    """One loan table grown to each size in turn, so 10^6 rows are only inserted once."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.engine = None
+        self.rows = 0
+
+    def grow(self, rows: int):
+        from sqlalchemy import create_engine
+        from src.loan_service.main import Loan
+
+        if self.engine is None:
+            self.engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'loan_table.db')}")
+            Loan.__table__.create(self.engine)
+        chunk = 50_000
+        with self.engine.begin() as connection:
+            for start in range(self.rows, rows, chunk):
+                # 10 loans per entity, like a busy customer of the Bank
+                connection.execute(Loan.__table__.insert(), [
+                    {"name": f"entity-{index // 10}", "amount": 100.0, "interest_rate_percent": 5.0, "repaid_amount": 0.0, "loan_open": index % 3 > 0}
+                    for index in range(start, min(start + chunk, rows))
+                ])
+        self.rows = rows
+        return self.engine
+
+
+def loan_service_cases(directory: str, max_rows: int) -> List[Case]:
+    tables = LoanTables(directory)
+
+    def lookup(rows: int):
+        def prepare():
+            from sqlmodel import Session
+            from src.loan_service.main import do_get_loans_by_name
+            engine = tables.grow(rows)
+            db_session = Session(engine)
+            entity = f"entity-{rows // 20}"  # In the middle of the table
+            return lambda: do_get_loans_by_name(db_session, entity)
+        return prepare
+
+    def dispatch(tool: str, arguments: dict):
+        def prepare():
+            from src.loan_service import main as loan_service
+
+            async def seed():
+                if not await loan_service.get_all_loans():
+                    for index in range(100):
+                        await loan_service.create_loan("stork", 100 + index, 5)
+            asyncio.run(seed())
+
+            async def call():
+                return await loan_service.call_tool(tool, arguments)
+            return call
+        return prepare
+
+    def serialize():
+        from src.loan_service.main import Loan
+        loans = [Loan(id=index, name="stork", amount=100, interest_rate_percent=5, repaid_amount=0, loan_open=True) for index in range(100)]
+        return lambda: str(loans)
+
+    return [Case(f"loan_service.do_get_loans_by_name[rows={rows}]", lookup(rows)) for rows in LOAN_TABLE_SIZES if rows <= max_rows] + [
+        Case("loan_service.call_tool[get_loan_summary_by_name]", dispatch("get_loan_summary_by_name", {"name": "Stork"})),
+        Case("loan_service.call_tool[get_loans_by_name, 100 loans]", dispatch("get_loans_by_name", {"name": "Stork"})),
+        Case("loan_service.call_tool[get_loan_history, 100 events]", dispatch("get_loan_history", {"name": "Stork"})),
+        Case("loan_service.serialize[100 loans]", serialize),
+    ]
+
+
+# --- Remote agent message ---
+
+def remote_agent_cases() -> List[Case]:
+    def make_tool_context(session_id: str, events: list):
+        session = SimpleNamespace(id=session_id, events=events)
+        user_content = SimpleNamespace(parts=[SimpleNamespace(text="Tell me about the debts of House Stork.")])
+        return SimpleNamespace(user_content=user_content, _invocation_context=SimpleNamespace(session=session))
+
+    def make_events(count: int) -> list:
+        return [
+            SimpleNamespace(
+                id=f"event-{index}",
+                author="user" if index % 2 == 0 else "metal_bank_orchestrator_agent",
+                content=SimpleNamespace(parts=[SimpleNamespace(text=f"Message number {index} about coin, contracts and the debts of House Stork.")]),
+            )
+            for index in range(count)
+        ]
+
+    def setup(count: int, warm: bool):
+        def prepare():
+            from src.adk_metalbank.agents.tools import format_converation_for_remote_agent
+            events = make_events(count)
+            if warm:
+                tool_context = make_tool_context(f"warm-{count}", events)
+                return lambda: format_converation_for_remote_agent(tool_context)
+            sessions = iter(range(sys.maxsize))
+            return lambda: format_converation_for_remote_agent(make_tool_context(f"cold-{count}-{next(sessions)}", events))
+        return prepare
+
+    return [Case(f"remote_agent.format_converation_for_remote_agent[events={count}, warm]", setup(count, True)) for count in SESSION_SIZES] + [
+        Case(f"remote_agent.format_converation_for_remote_agent[events={count}, cold]", setup(count, False)) for count in SESSION_SIZES
+    ]
+
+
+# --- Runner ---
+
+def time_case(func: Callable[[], Any], rounds: int, min_time: float) -> dict:
+    """Times `func` in `rounds` rounds of as many iterations as fit in `min_time`; returns microseconds per call."""
+    if inspect.iscoroutinefunction(func):
+        async def run_async(iterations: int) -> float:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await func()
+            return time.perf_counter() - start
+        loop = asyncio.new_event_loop()
+        timer = lambda iterations: loop.run_until_complete(run_async(iterations))
+    else:
+        def timer(iterations: int) -> float:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            return time.perf_counter() - start
+        loop = None
+
+    try:
+        iterations = 1
+        while (elapsed := timer(iterations)) < min_time and iterations < 10 ** 7:
+            iterations *= 10 if elapsed < min_time / 10 else 2
+        per_call = [timer(iterations) / iterations * 1e6 for _ in range(rounds)]
+    finally:
+        if loop is not None:
+            loop.close()
+    return {
+        "median_us": statistics.median(per_call),
+        "min_us": min(per_call),
+        "iterations": iterations,
+        "rounds": rounds,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(name_filter: Optional[str], rounds: int, min_time: float, max_rows: int) -> dict:
+    results: Dict[str, dict] = {}
+    skipped: Dict[str, str] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before the loan service is imported.
+        os.environ["LOANS_DB_FILE"] = os.path.join(tmp, "loans.db")
+        os.environ["LOANS_DB_ECHO"] = "false"
+        os.environ.setdefault("TELEMETRY_EXPORTER", "none")
+        cases = rates_cases() + background_check_cases() + loan_service_cases(tmp, max_rows) + remote_agent_cases()
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            try:
+                func = case.setup()
+            except ImportError as error:
+                skipped[case.name] = f"missing dependency: {error.name or error}"
+                print(f"{case.name:72} skipped ({skipped[case.name]})")
+                continue
+            results[case.name] = time_case(func, rounds, min_time)
+            print(f"{case.name:72} {results[case.name]['min_us']:12.2f} us (median {results[case.name]['median_us']:.2f})")
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Prints every case side by side and returns the names of the cases that regressed beyond `threshold`."""
+    for key in ("machine", "python"):
+        if baseline.get(key) != current.get(key):
+            print(f"warning: the baseline was recorded with {key} {baseline.get(key)}, this run with {current.get(key)}")
+    regressions = []
+    print(f"\n{'case':72} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:72} {'-':>12} {result['min_us']:12.2f} {'new':>8}")
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:72} {before['min_us']:12.2f} {result['min_us']:12.2f} {change:+8.1%}{flag}")
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"{name:72} {baseline['results'][name]['min_us']:12.2f} {'-':>12} {'missing':>8}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the suite and optionally save the results as a baseline")
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+    compare_parser = commands.add_parser("compare", help="Compare results with a baseline")
+    compare_parser.add_argument("baseline", help="JSON results of `run`")
+    compare_parser.add_argument("current", nargs="?", help="JSON results to compare; runs the suite if omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    compare_parser.add_argument("--output", help="JSON file to write the results of this run to")
+    for command in (run_parser, compare_parser):
+        command.add_argument("--filter", help="Only run the cases whose name contains this text")
+        command.add_argument("--rounds", type=int, default=5)
+        command.add_argument("--min-time", type=float, default=0.05, help="Seconds per round")
+        command.add_argument("--max-rows", type=int, default=LOAN_TABLE_SIZES[-1], help="Largest loan table")
+    args = parser.parse_args()
+
+    if args.command == "compare" and args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.filter, args.rounds, args.min_time, args.max_rows)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"Results written to {args.output}")
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark for the rolling summary sent to the remote agent.
+
+Simulates a conversation that grows by two events per hop and measures the time
+spent updating the rolling summary and the tokens it sends, compared with the history
+window it replaces (REMOTE_AGENT_HISTORY_CHAR_BUDGET) and with the full conversation history.
+
+Run from the repository root:
+    python -m benchmarks.summarizer --hops 200
+    python -m benchmarks.summarizer --hops 20 --summarizer llm   # requires Vertex AI
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.history_window import make_events
+from src.adk_metalbank.agents.history import CHARS_PER_TOKEN, format_event, history_budget_chars
+from src.adk_metalbank.agents.summarizer import LlmSummarizer, LocalSummarizer, summarize_session, window_chars
+
+
+async def run(hops: int, summarizer) -> None:
+    all_events = make_events(hops * 2)
+    state = {}
+    hop_latencies = []
+    full_tokens = window_tokens = summary_tokens = 0
+    for hop in range(1, hops + 1):
+        events = all_events[: hop * 2]
+        start = time.perf_counter()
+        summary = await summarize_session("benchmark-session", events, state, summarizer)
+        hop_latencies.append(time.perf_counter() - start)
+        full_tokens += sum(len(line) for line in map(format_event, events) if line) // CHARS_PER_TOKEN
+        window_tokens += window_chars(events, history_budget_chars()) // CHARS_PER_TOKEN
+        summary_tokens += len(summary) // CHARS_PER_TOKEN
+
+    hop_latencies.sort()
+    print(f"summarizer={type(summarizer).__name__} hops={hops}")
+    print(f"added latency p50: {hop_latencies[len(hop_latencies) // 2] * 1000:8.3f} ms/hop")
+    print(f"added latency p99: {hop_latencies[int(len(hop_latencies) * 0.99) - 1] * 1000:8.3f} ms/hop")
+    print(f"tokens sent, full history:   {full_tokens}")
+    print(f"tokens sent, history window: {window_tokens} ({history_budget_chars()} characters)")
+    print(f"tokens sent, summary:        {summary_tokens} ({100 * (summary_tokens / window_tokens - 1):+.1f}% against the window)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hops", type=int, default=200)
+    parser.add_argument("--summarizer", choices=["local", "llm"], default="local")
+    args = parser.parse_args()
+    summarizer = LocalSummarizer() if args.summarizer == "local" else LlmSummarizer()
+    asyncio.run(run(args.hops, summarizer))
+
+
+if __name__ == "__main__":
+    main()
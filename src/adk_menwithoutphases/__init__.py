@@ -1,2 +1,11 @@
-from .main import app
-from . import agent
+# The A2A app and the agent are built on first access (e.g. by `uvicorn src.adk_menwithoutphases:app`),
+# so importing a submodule stays cheap.
+def __getattr__(name):
+    if name == "app":
+        from .main import app
+        return app
+    if name == "agent":
+        # `from . import agent` would look the attribute up again and recurse
+        import importlib
+        return importlib.import_module(f"{__name__}.agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
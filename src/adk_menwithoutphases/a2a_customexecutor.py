@@ -1,11 +1,16 @@
-from a2a.types import AgentCard
-from a2a.utils import new_agent_text_message
+from a2a.types import AgentCard, TaskState, TaskStatus
+from a2a.utils import new_agent_text_message, new_task
 from a2a.server.agent_execution import AgentExecutor, RequestContext 
 from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
 from google.adk.sessions import Session
 from google.adk.runners import Runner
 from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types
+from src.shared.telemetry import start_span
+from src.shared.a2a_streaming import STREAM_PARTIALS_METADATA_KEY
+from src.adk_menwithoutphases.async_tasks import ASYNC_TASKS_ENABLED, WorkerPoolFull, get_worker_pool
 
 import os
 import logging
@@ -39,22 +44,95 @@ class MenWithoutPhasesAgentExecutor(AgentExecutor):
             logging.info(f"The task id is {task_id}")
             
             # Ensure an ADK session exists for the user and context.
-            await self._get_adk_session(user_id, context_id)
+            with start_span("a2a_executor.get_session", context_id=context_id):
+                await self._get_adk_session(user_id, context_id)
             
             # Extract the user's message from the request context.
             user_message = self._inspect_input(request_context)
 
+            if self._streams_partials(request_context):
+                await self._stream_agent(user_message, request_context, event_queue, user_id, context_id)
+                return
+
+            if ASYNC_TASKS_ENABLED:
+                await self._run_task(user_message, request_context, event_queue, user_id, context_id)
+                return
+
             # Process the user message through the underlying LLM agent.
-            message_text = await self._run_agent(user_message, event_queue, user_id, context_id)
+            with start_span("a2a_executor.run_agent", agent=self.agent.name):
+                message_text = await self._run_agent(user_message, event_queue, user_id, context_id)
 
             # Send message back to calling agent
-            await self._send_response(event_queue, request_context, message_text)
+            with start_span("a2a_executor.send_response"):
+                await self._send_response(event_queue, request_context, message_text)
 
         except Exception as error:
             self._handle_error(event_queue, request_context, error)
 
+    # Streams the partial model text as `working` status updates of a task, then completes it with the full text.
+    async def _stream_agent(
+        self, user_message: str, request_context: RequestContext, event_queue: EventQueue, user_id: str, session_id: str
+    ) -> None:
+        task = request_context.current_task
+        if not task:
+            task = new_task(request_context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+
+        async def on_partial(text: str) -> None:
+            await updater.update_status(TaskState.working, new_agent_text_message(text, task.context_id, task.id))
+
+        with start_span("a2a_executor.stream_agent", agent=self.agent.name):
+            message_text = await self._run_agent(user_message, event_queue, user_id, session_id, on_partial)
+        await updater.complete(new_agent_text_message(message_text, task.context_id, task.id))
+
+    # Runs the agent in the worker pool as a task. The task is published in the `working` state before the model runs,
+    # so non-blocking callers get it back at once; it is completed (or failed) in the task store when the run ends.
+    async def _run_task(
+        self, user_message: str, request_context: RequestContext, event_queue: EventQueue, user_id: str, session_id: str
+    ) -> None:
+        task = request_context.current_task
+        is_new = task is None
+        if is_new:
+            task = new_task(request_context.message)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+
+        try:
+            job = get_worker_pool().submit(lambda: self._run_agent(user_message, event_queue, user_id, session_id))
+        except WorkerPoolFull as error:
+            logger.warning(f"Rejected task {task.id}: {error}")
+            rejection = new_agent_text_message("A man is occupied. Return later.", task.context_id, task.id)
+            if is_new:
+                task.status = TaskStatus(state=TaskState.rejected, message=rejection)
+                await event_queue.enqueue_event(task)
+            else:
+                await updater.reject(rejection)
+            return
+
+        if is_new:
+            task.status = TaskStatus(state=TaskState.working)
+            await event_queue.enqueue_event(task)
+        else:
+            await updater.start_work()
+
+        try:
+            with start_span("a2a_executor.run_task", agent=self.agent.name):
+                message_text = await job
+        except Exception as error:
+            logger.error(f"Task {task.id} failed: {error}", exc_info=True)
+            await updater.failed(
+                new_agent_text_message(f"Error speaking to Men without Faces agent: {error}", task.context_id, task.id)
+            )
+            return
+        await updater.complete(new_agent_text_message(message_text, task.context_id, task.id))
+
+    def _streams_partials(self, request_context: RequestContext) -> bool:
+        metadata = request_context.message.metadata if request_context.message else None
+        return bool(metadata and metadata.get(STREAM_PARTIALS_METADATA_KEY))
+
     # Runs the ADK agent with the user's message and processes the events.
-    async def _run_agent(self, user_message: str, event_queue: EventQueue, user_id: str, session_id: str) -> str:
+    # With `on_partial`, the model streams and every partial text chunk is passed to it as it arrives.
+    async def _run_agent(self, user_message: str, event_queue: EventQueue, user_id: str, session_id: str, on_partial=None) -> str:
         # Create a Content object for the user's message.
         message_content = types.Content(role="user", parts=[types.Part(text=user_message)])
     
@@ -62,13 +140,20 @@ class MenWithoutPhasesAgentExecutor(AgentExecutor):
 
         # `run_async` executes the agent and yields events as they occur.
         events_async = self.runner.run_async(
-            user_id=user_id, session_id=session_id, new_message=message_content
+            user_id=user_id,
+            session_id=session_id,
+            new_message=message_content,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE if on_partial else StreamingMode.NONE),
         )
 
         # Initialize a default response in case no final response is found.
         final_message_text = "(No search results found)"
 
         async for event in events_async:
+            if event.partial:
+                if on_partial and event.content and event.content.parts and event.content.parts[0].text:
+                    await on_partial(event.content.parts[0].text)
+                continue
             if (
                 event.is_final_response()
                 and event.content
@@ -4,12 +4,15 @@ from google.adk.artifacts import InMemoryArtifactService
 from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from a2a.server.request_handlers import DefaultRequestHandler
 from google.adk.runners import Runner
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import InMemoryPushNotificationConfigStore, InMemoryTaskStore
 from google.adk.sessions import InMemorySessionService
 from src.adk_menwithoutphases.a2a_customexecutor import MenWithoutPhasesAgentExecutor
+from src.adk_menwithoutphases.async_tasks import ASYNC_TASKS_ENABLED, PUSH_TIMEOUT_SECONDS, LocalPushNotificationSender
 from a2a.types import AgentCard, AgentSkill, AgentCapabilities
+from src.shared.llm import get_model_name
 
 import os
+import httpx
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,7 +20,7 @@ logging.basicConfig(level=logging.INFO)
 
 # The Agent Card defines the agent's metadata, capabilities, and available skills.
 # This information is used by other agents or systems to discover and interact with this agent.
-capabilities = AgentCapabilities(streaming=True, tools=True)
+capabilities = AgentCapabilities(streaming=True, tools=True, push_notifications=ASYNC_TASKS_ENABLED)
 
 # Define the agent's core identity and its exposed functionalities.
 agent_card = AgentCard(
@@ -50,7 +53,7 @@ agent_card = AgentCard(
 root_agent = LlmAgent(
 name=agent_card.name,
 description=(agent_card.description),
-model="gemini-2.0-flash",
+model=get_model_name(),
 instruction=(
     """ 
     You are the Men Without Phases Agent, a highly secretive and specialized function of the Metal Bank of Braveos. 
@@ -67,6 +70,7 @@ instruction=(
 
     """),
     tools=[],
+    # No response cache: every message from the Metal Bank embeds the conversation history, so none would repeat
 )
 
 """
@@ -99,9 +103,17 @@ agent_executor = MenWithoutPhasesAgentExecutor(
 
 # The RequestHandler processes incoming A2A requests, using the agent_executor
 # to run the agent and a task store to manage asynchronous operations.
+# In the asynchronous task mode (A2A_ASYNC_TASKS), callers may also register a callback URL
+# that receives every update of their task as a push notification.
+push_config_store = InMemoryPushNotificationConfigStore() if ASYNC_TASKS_ENABLED else None
 request_handler = DefaultRequestHandler(
         agent_executor=agent_executor,
         task_store=InMemoryTaskStore(),
+        push_config_store=push_config_store,
+        push_sender=(
+            LocalPushNotificationSender(httpx.AsyncClient(timeout=PUSH_TIMEOUT_SECONDS), push_config_store)
+            if ASYNC_TASKS_ENABLED else None
+        ),
     )
 
 # The A2AStarletteApplication wraps the agent components into a web application
@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urlparse
+
+from a2a.server.tasks import BasePushNotificationSender
+from a2a.types import PushNotificationConfig, Task
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Asynchronous task mode of the Men Without Phases agent.
+# With A2A_ASYNC_TASKS=true, every `message/send` becomes a task that is created in the `working`
+# state before the model runs. Callers sending `configuration.blocking: false` get that task back
+# at once and either poll `tasks/get` or pass a `pushNotificationConfig` to have every update of
+# the task POSTed to their callback URL. Blocking callers still wait for the completed task.
+# The agent runs in a pool of A2A_TASK_WORKERS workers; up to A2A_TASK_QUEUE_SIZE tasks wait
+# for a worker, and tasks beyond that are rejected right away.
+ASYNC_TASKS_ENABLED = os.getenv("A2A_ASYNC_TASKS", "false").lower() == "true"
+TASK_WORKERS = int(os.getenv("A2A_TASK_WORKERS", "4"))
+TASK_QUEUE_SIZE = int(os.getenv("A2A_TASK_QUEUE_SIZE", "32"))
+# Hosts push notifications may be sent to; the agent does not call out to arbitrary URLs.
+PUSH_ALLOWED_HOSTS = {
+    host.strip().lower() for host in os.getenv("A2A_PUSH_ALLOWED_HOSTS", "localhost,127.0.0.1,::1").split(",") if host.strip()
+}
+PUSH_TIMEOUT_SECONDS = float(os.getenv("A2A_PUSH_TIMEOUT_SECONDS", "5"))
+
+tasks_queued = metrics.gauge("a2a_tasks_queued", "A2A tasks waiting for a worker.")
+tasks_running = metrics.gauge("a2a_tasks_running", "A2A tasks being run by a worker.")
+tasks_rejected = metrics.counter("a2a_tasks_rejected_total", "A2A tasks rejected because the worker queue was full.")
+task_queue_wait = metrics.histogram("a2a_task_queue_wait_seconds", "Time A2A tasks waited for a worker.")
+push_notifications = metrics.counter("a2a_push_notifications_total", "A2A push notifications, by outcome.")
+
+
+class WorkerPoolFull(Exception):
+    """Raised when a job is submitted while all workers are busy and the queue is full."""
+
+
+class WorkerPool:
+    """
+    Fixed number of asyncio workers running submitted jobs from a bounded queue.
+
+    The workers start with the first job, on the event loop of the server.
+    """
+
+    def __init__(self, workers: int = TASK_WORKERS, max_queued: int = TASK_QUEUE_SIZE):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def submit(self, job: Callable[[], Awaitable]) -> asyncio.Future:
+        """
+        Queues a job for the next free worker.
+
+        Args:
+            job (Callable[[], Awaitable]): Creates the coroutine to run.
+
+        Returns:
+            asyncio.Future: Resolves with the result of the job.
+
+        Raises:
+            WorkerPoolFull: If `max_queued` jobs are already waiting.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [asyncio.create_task(self._work(), name=f"a2a_task_worker:{index}") for index in range(self.workers)]
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((job, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            tasks_rejected.inc()
+            raise WorkerPoolFull(f"{self.workers} tasks running and {self.max_queued} waiting")
+        tasks_queued.set(self._queue.qsize())
+        return future
+
+    async def _work(self) -> None:
+        while True:
+            job, future, queued_at = await self._queue.get()
+            tasks_queued.set(self._queue.qsize())
+            task_queue_wait.observe(time.perf_counter() - queued_at)
+            if future.cancelled():
+                continue
+            tasks_running.inc()
+            running = asyncio.ensure_future(job())
+            # A cancelled task (tasks/cancel) stops its job and frees the worker
+            future.add_done_callback(lambda done, running=running: running.cancel() if done.cancelled() else None)
+            try:
+                await asyncio.wait([running])
+                if not future.done():
+                    if running.cancelled():
+                        future.cancel()
+                    elif running.exception() is not None:
+                        future.set_exception(running.exception())
+                    else:
+                        future.set_result(running.result())
+            finally:
+                tasks_running.dec()
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    """Returns the worker pool of the agent's tasks."""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+    return _worker_pool
+
+
+def is_allowed_push_url(url: str) -> bool:
+    """True for http(s) URLs on one of A2A_PUSH_ALLOWED_HOSTS."""
+    parsed = urlparse(url)
+    return parsed.scheme in ("http", "https") and (parsed.hostname or "").lower() in PUSH_ALLOWED_HOSTS
+
+
+class LocalPushNotificationSender(BasePushNotificationSender):
+    """Push notification sender that only posts to callback URLs on A2A_PUSH_ALLOWED_HOSTS."""
+
+    async def _dispatch_notification(self, task: Task, push_info: PushNotificationConfig) -> bool:
+        if not is_allowed_push_url(push_info.url):
+            logger.warning(f"Push notification of task {task.id} not sent: {push_info.url} is not on an allowed host")
+            push_notifications.inc(outcome="refused")
+            return False
+        sent = await super()._dispatch_notification(task, push_info)
+        push_notifications.inc(outcome="sent" if sent else "failed")
+        return sent
@@ -3,6 +3,11 @@ from src.adk_menwithoutphases.agent import a2a_app
 import os
 import logging
 from dotenv import load_dotenv
+from src.shared.llm import uses_vertex_ai
+from src.shared.telemetry import TelemetryMiddleware, setup_telemetry
+from src.shared.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from src.shared.resilience import FAULT_INJECTION_ENABLED, FaultInjectionMiddleware
+from src.shared.compression import COMPRESSION_ENABLED, CompressionMiddleware
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -10,15 +15,28 @@ logging.basicConfig(level=logging.INFO)
 # Load environment variables from a .env file for configuration.
 load_dotenv()
 
-# Quit if required env variables are absent
-if not all(os.getenv(var) for var in ["GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"]):
+# Quit if required env variables are absent (the fake model needs no Google Cloud settings)
+if uses_vertex_ai() and not all(os.getenv(var) for var in ["GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"]):
     logger.error("Missing one or more environment variables: GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION, GOOGLE_GENAI_USE_VERTEXAI")
     exit(1)
 
 PORT = os.getenv("PORT", "8000")
 HOST = os.getenv("HOST", "0.0.0.0")
 
+setup_telemetry("men_without_phases_agent")
+
 app = a2a_app.build()
+# Trace context propagation, request latency metrics and the optional /metrics endpoint
+app.add_middleware(TelemetryMiddleware, service_name="men_without_phases_agent")
+# Opt-in delays and errors, to test the deadlines and circuit breaker of the Metal Bank agent
+if FAULT_INJECTION_ENABLED:
+    app.add_middleware(FaultInjectionMiddleware, service_name="men_without_phases_agent")
+# Opt-in gzip/zstd compression of large responses, and of the conversation history sent by the Metal Bank
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, service_name="men_without_phases_agent")
+# Opt-in admin routes with CPU profiles, task dumps, loop lag and allocation snapshots
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 if __name__ == "__main__":
     uvicorn.run(app, host=HOST, port=int(PORT))
@@ -1 +1,7 @@
-from .main import app
+# The ADK web app is built on first access (e.g. by `uvicorn src.adk_metalbank:app`),
+# so importing a submodule such as `src.adk_metalbank.agents.history` stays cheap.
+def __getattr__(name):
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,18 @@
 
-from src.adk_metalbank.agents.sub_agents.metal_bank_agent import metal_bank_agent
-from src.adk_metalbank.agents.sub_agents.remote_agent import men_without_phases_remote_agent
+# The sub-agents are imported on first access, so importing helpers such as
+# `src.adk_metalbank.agents.history` does not build the agent tree.
+_LAZY_IMPORTS = {
+    "metal_bank_agent": "src.adk_metalbank.agents.sub_agents.metal_bank_agent",
+    "men_without_phases_remote_agent": "src.adk_metalbank.agents.sub_agents.remote_agent",
+    "loan_assessment_agent": "src.adk_metalbank.agents.sub_agents.loan_assessment_agent",
+}
 
 
-__all__ = ["metal_bank_agent", "men_without_phases_remote_agent"]
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["metal_bank_agent", "men_without_phases_remote_agent", "loan_assessment_agent"]
@@ -1,7 +1,12 @@
 import logging
 from google.adk.agents import LlmAgent
-from src.adk_metalbank.agents.tools import men_without_faces_agent_tool
-from src.adk_metalbank.agents.sub_agents import metal_bank_agent
+from src.adk_metalbank.agents.tools import men_without_phases_agent_tool
+from src.adk_metalbank.agents.sub_agents import metal_bank_agent, loan_assessment_agent
+from src.adk_metalbank.agents.routing import fast_path_router
+from src.adk_metalbank.agents.compaction import with_compaction
+from src.adk_metalbank.agents.relay import men_without_phases_relay_agent
+from src.shared.llm import get_model_name
+from src.shared import response_cache
 
 
 logger = logging.getLogger(__name__)
@@ -13,7 +18,7 @@ logging.basicConfig(level=logging.INFO)
 
 root_agent = LlmAgent(
     name="metal_bank_orchestrator_agent",
-    model="gemini-2.0-flash",
+    model=get_model_name(),
     instruction=(
     """
     You are the **Metal Bank of Braveos orchestrator** agent. Your job is to analyze all user messages and take one of three actions: 
@@ -29,7 +34,7 @@ root_agent = LlmAgent(
     ### Path 1: The Clandestine Passcode (Check First!)
     
     If the user mentions a clandestine task, or secret task, or men without faces, do the following:
-     1. **Silently** call the `men_without_faces_agent_tool` and pass the user's full message to it. 
+     1. **Silently** call the `men_without_phases_agent_remote_tool` and pass the user's full message to it. 
         The tool returns a response which pass along as a reponse to the user.
         If the tool denies the existance of the service, mention that you are just a bank and deny that such services provided by the bank.
     
@@ -44,7 +49,7 @@ root_agent = LlmAgent(
             * **Example:** "This is the Metal Bank of Braveos. What brings you through our heavy doors today?"
             * **Example:** "This is the Metal Bank of Braveos. A loan, you say? Very well, know that the Bank always gets its due. " and then transfer to the loan agent.
 
-        2.  **Route:** Once you know the purpose of the user is banking, call the `metal_bank_agent`.
+        2.  **Route:** If the user requests a new loan, call the `loan_assessment_agent`. For any other banking purpose, call the `metal_bank_agent`.
 
     ### Path 3:  
 
@@ -56,6 +61,11 @@ root_agent = LlmAgent(
     DO not ever mention the `The men without faces` or its agents unless the variable `men_without_faces_discovered` is true. 
     """
 ),
-    tools=[men_without_faces_agent_tool], # The remote men_without_faces_agent is wrapped in an AgentTool because we want to do a check and update state. Otherwise we would use it directly as a sub-agent
-    sub_agents=[metal_bank_agent],   # If we didn't have the complication of the passcode, we could just used men_without_faces_agent here instead of wrapping it in an AgentTool
+    tools=[men_without_phases_agent_tool], # The remote men_without_faces_agent is wrapped in an AgentTool because we want to do a check and update state. Otherwise we would use it directly as a sub-agent
+    # The relay to the remote agent is only reached through the fast path
+    sub_agents=[metal_bank_agent, loan_assessment_agent, men_without_phases_relay_agent],   # If we didn't have the complication of the passcode, we could just used men_without_faces_agent here instead of wrapping it in an AgentTool
+    # Deterministic routing (passcode, keyword rules) that skips the LLM call for obvious requests,
+    # then compaction of long conversations and the opt-in response cache
+    before_model_callback=response_cache.with_response_cache(with_compaction([fast_path_router]), response_cache.before_model_callback),
+    after_model_callback=response_cache.with_response_cache(None, response_cache.after_model_callback),
 )
\ No newline at end of file
@@ -0,0 +1,217 @@
+import os
+import json
+import hashlib
+import logging
+from typing import List, Optional, Sequence
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from src.adk_metalbank.agents.history import CHARS_PER_TOKEN
+from src.adk_metalbank.agents.summarizer import LocalSummarizer, Summarizer, get_summarizer
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Compaction of the conversation sent to the model on every turn.
+# Sessions are durable, so their event history keeps growing; once the contents of a model
+# request exceed the token budget, the oldest turns are folded into a rolling summary kept in
+# the session state. The latest tool results and the key state values are carried over
+# verbatim, and the most recent turns are always sent unchanged.
+COMPACTION_ENABLED = os.getenv("SESSION_COMPACTION_ENABLED", "true").lower() == "true"
+COMPACTION_TOKEN_BUDGET = int(os.getenv("SESSION_COMPACTION_TOKEN_BUDGET", "2000"))
+# Share of the budget reserved for the summary, the kept tool results and the key state.
+COMPACTION_SUMMARY_SHARE = float(os.getenv("SESSION_COMPACTION_SUMMARY_SHARE", "0.4"))
+# State values repeated in every compacted request.
+COMPACTION_KEEP_STATE_KEYS = [
+    key.strip()
+    for key in os.getenv(
+        "SESSION_COMPACTION_KEEP_STATE",
+        "loan_interest_rate,loan_applicant_name,background_check_result,men_without_phases_discovered",
+    ).split(",")
+    if key.strip()
+]
+MAX_TOOL_RESULT_CHARS = 400
+
+# Session state keys holding the rolling summary, per agent, and a fingerprint of what it covers.
+COMPACTION_STATE_PREFIX = "compaction:"
+
+prompt_tokens = metrics.histogram(
+    "model_prompt_tokens", "Estimated tokens of conversation contents per model request, before and after compaction."
+)
+compactions = metrics.counter("session_compactions_total", "Model requests whose older turns were folded into the summary.")
+
+
+def estimate_tokens(content: types.Content) -> int:
+    """Estimates the tokens of a content from its text, function calls and function responses."""
+    chars = 0
+    for part in content.parts or []:
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call:
+            chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+        elif part.function_response:
+            chars += len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def _is_user_turn(content: types.Content) -> bool:
+    # A turn starts with a user message that is not a tool result, so cutting there never splits a call from its response.
+    parts = content.parts or []
+    return content.role == "user" and any(part.text for part in parts) and not any(part.function_response for part in parts)
+
+
+def _format_line(content: types.Content) -> Optional[str]:
+    text = " ".join(part.text for part in content.parts or [] if part.text and not part.thought)
+    return f"[{(content.role or 'user').upper()}]: {text}" if text.strip() else None
+
+
+def _fingerprint(content: types.Content) -> str:
+    return hashlib.sha256(f"{content.role}:{content.parts!r}".encode()).hexdigest()[:16]
+
+
+def _fold_tool_results(latest: dict, contents: Sequence[types.Content]) -> dict:
+    # Keeps the latest result per tool, clipped, ordered by when it was returned.
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_response:
+                result = json.dumps(part.function_response.response or {}, default=str)
+                latest.pop(part.function_response.name, None)
+                latest[part.function_response.name] = result[:MAX_TOOL_RESULT_CHARS]
+    return latest
+
+
+def find_cut(contents: Sequence[types.Content], keep_tokens: int) -> int:
+    """
+    Returns the index of the first content sent unchanged.
+
+    Walks back from the tail while the kept turns fit in `keep_tokens`; the cut is always at
+    the start of a user turn and the latest turn is always kept, even if it exceeds the budget.
+    """
+    cut = len(contents)
+    size = 0
+    for index in range(len(contents) - 1, -1, -1):
+        size += estimate_tokens(contents[index])
+        if _is_user_turn(contents[index]):
+            if size > keep_tokens and cut < len(contents):
+                break
+            cut = index
+    return cut
+
+
+def _summary_content(stored: dict, state) -> types.Content:
+    sections = [f"Summary of the earlier conversation:\n{stored['summary']}"]
+    if stored["tools"]:
+        sections.append("Latest results of earlier tool calls:\n" + "\n".join(f"{name}: {result}" for name, result in stored["tools"].items()))
+    key_state = [f"{key}: {state.get(key)}" for key in COMPACTION_KEEP_STATE_KEYS if state.get(key) is not None]
+    if key_state:
+        sections.append("Known facts:\n" + "\n".join(key_state))
+    return types.Content(role="user", parts=[types.Part(text="\n\n".join(sections))])
+
+
+async def compact_contents(
+    contents: List[types.Content],
+    state,
+    agent_name: str,
+    summarizer: Summarizer,
+    token_budget: int = COMPACTION_TOKEN_BUDGET,
+) -> Optional[List[types.Content]]:
+    """
+    Replaces the oldest turns of a model request with the agent's rolling summary.
+
+    The summary is stored in `state` with the number of contents it covers and the fingerprint
+    of the last one. Later turns reuse it and only estimate the contents after it, and only fold
+    in more turns once the request exceeds the budget again.
+
+    Args:
+        contents: The conversation contents of the model request, oldest first.
+        state: The session state holding the rolling summary.
+        agent_name: The agent the request belongs to; every agent sees its own contents.
+        summarizer: Folds new lines into the summary.
+        token_budget: Estimated tokens allowed for the contents.
+
+    State Effects:
+        'compaction:<agent_name>' (str): JSON with the summary, the latest tool results, the number
+            and estimated tokens of the contents folded and a fingerprint of the last one.
+
+    Returns:
+        list | None: The compacted contents, or None if nothing was ever folded for this conversation.
+    """
+    state_key = COMPACTION_STATE_PREFIX + agent_name
+    stored = json.loads(state.get(state_key) or "{}")
+    folded = stored.get("folded", 0)
+    if folded and not (folded < len(contents) and _fingerprint(contents[folded - 1]) == stored.get("fingerprint")):
+        # The history changed underneath (rewind, another branch): fold again from scratch.
+        stored, folded = {}, 0
+
+    tail_tokens = [estimate_tokens(content) for content in contents[folded:]]
+    prompt_tokens.observe(stored.get("folded_tokens", 0) + sum(tail_tokens), agent=agent_name, stage="raw")
+    summary_content = _summary_content(stored, state) if folded else None
+    sent_tokens = sum(tail_tokens) + (estimate_tokens(summary_content) if summary_content else 0)
+
+    if sent_tokens > token_budget:
+        cut = folded + find_cut(contents[folded:], int(token_budget * (1 - COMPACTION_SUMMARY_SHARE)))
+        if folded < cut < len(contents):
+            summary = stored.get("summary", "")
+            new_lines = [line for line in map(_format_line, contents[folded:cut]) if line]
+            if new_lines:
+                summary = await summarizer.summarize(summary, new_lines)
+            stored = {
+                "summary": summary,
+                "tools": _fold_tool_results(stored.get("tools", {}), contents[folded:cut]),
+                "folded": cut,
+                "folded_tokens": stored.get("folded_tokens", 0) + sum(tail_tokens[: cut - folded]),
+                "fingerprint": _fingerprint(contents[cut - 1]),
+            }
+            state[state_key] = json.dumps(stored)
+            compactions.inc(agent=agent_name)
+            tail_tokens = tail_tokens[cut - folded:]
+            folded = cut
+            summary_content = _summary_content(stored, state)
+            sent_tokens = sum(tail_tokens) + estimate_tokens(summary_content)
+
+    prompt_tokens.observe(sent_tokens, agent=agent_name, stage="sent")
+    if summary_content is None:
+        return None
+    return [summary_content] + list(contents[folded:])
+
+
+_compaction_summarizer: Optional[Summarizer] = None
+
+
+def get_compaction_summarizer() -> Summarizer:
+    """Returns the configured conversation summarizer, or the local one if summarization is off."""
+    global _compaction_summarizer
+    if _compaction_summarizer is None:
+        budget_chars = int(COMPACTION_TOKEN_BUDGET * COMPACTION_SUMMARY_SHARE / 2) * CHARS_PER_TOKEN
+        _compaction_summarizer = get_summarizer() or LocalSummarizer(max_chars=budget_chars)
+    return _compaction_summarizer
+
+
+async def compaction_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Before-model callback keeping the request contents within the token budget.
+
+    Returns:
+        None: The request is compacted in place; the model is always called.
+    """
+    compacted = await compact_contents(
+        llm_request.contents or [], callback_context.state, callback_context.agent_name, get_compaction_summarizer()
+    )
+    if compacted is not None:
+        llm_request.contents = compacted
+    return None
+
+
+def with_compaction(callbacks: Optional[list]) -> Optional[list]:
+    """
+    Appends the compaction callback to an agent's before-model callbacks if compaction is enabled.
+
+    Add it after callbacks that answer without the model (fast-path routing), so those turns skip it.
+    """
+    callbacks = list(callbacks or [])
+    if COMPACTION_ENABLED:
+        callbacks.append(compaction_callback)
+    return callbacks or None
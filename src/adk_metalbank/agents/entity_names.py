@@ -0,0 +1,100 @@
+import os
+import logging
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from src.shared.entity_names import extract_entity_name, get_entity_name_extractor
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Callbacks handing the entity name found by the deterministic extractor (src/shared/entity_names.py)
+# to the agents: the loan assessment skips its name extraction model call, the metal_bank_agent is
+# told the name, and tool arguments like 'House Stork' are reduced to the bare name before the call.
+ENTITY_NAME_EXTRACTION_ENABLED = os.getenv("ENTITY_NAME_EXTRACTION", "true").lower() == "true"
+ENTITY_NAME_STATE_KEY = "entity_name"
+# Output key of the loan assessment's name extraction agent.
+APPLICANT_NAME_STATE_KEY = "loan_applicant_name"
+# Tool arguments holding an entity name.
+ENTITY_ARGUMENTS = ("name", "entity_name")
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    return "".join(part.text for part in (content.parts if content and content.parts else []) if part.text)
+
+
+def entity_name_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Before-model callback telling the model the entity name of the customer's message.
+
+    State Effects:
+        'entity_name' (str): The extracted bare name, once one was found.
+
+    Returns:
+        None: The model is always called.
+    """
+    if not ENTITY_NAME_EXTRACTION_ENABLED:
+        return None
+    entity = extract_entity_name(_user_text(callback_context))
+    if entity is None:
+        entity_name = callback_context.state.get(ENTITY_NAME_STATE_KEY)
+        if not entity_name:
+            return None
+    else:
+        entity_name = entity.name
+        callback_context.state[ENTITY_NAME_STATE_KEY] = entity_name
+    llm_request.append_instructions([
+        f"The customer's entity name is '{entity_name}'. Use exactly this name for tool calls unless the customer names another entity."
+    ])
+    return None
+
+
+def known_entity_name(state) -> Optional[str]:
+    """Returns the entity name already found in the session, if any."""
+    for key in (APPLICANT_NAME_STATE_KEY, ENTITY_NAME_STATE_KEY):
+        name = str(state.get(key) or "").strip().strip(".")
+        if name and name.upper() != "NONE":
+            return name
+    return None
+
+
+def answer_entity_name(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Before-model callback of a name extraction agent: answers with the extracted name without calling the model.
+
+    The agent only sees the latest message, so a follow-up that names nobody ('and for 500 Dragons?')
+    keeps the name found earlier in the session instead of asking the model, which would answer NONE
+    and overwrite it.
+
+    Returns:
+        LlmResponse | None: The bare name, or None to let the model extract it.
+    """
+    entity = extract_entity_name(_user_text(callback_context)) if ENTITY_NAME_EXTRACTION_ENABLED else None
+    if entity is not None:
+        callback_context.state[ENTITY_NAME_STATE_KEY] = entity.name
+        name = entity.name
+    else:
+        name = known_entity_name(callback_context.state)
+        if name is None:
+            return None
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=name)]))
+
+
+def canonicalize_entity_arguments(tool, args: dict, tool_context: ToolContext) -> Optional[dict]:
+    """
+    Before-tool callback reducing entity names in tool arguments to the bare name ('House Stork' -> 'Stork').
+
+    Returns:
+        None: The arguments are changed in place and the tool is always called.
+    """
+    if not ENTITY_NAME_EXTRACTION_ENABLED:
+        return None
+    for key in ENTITY_ARGUMENTS:
+        if isinstance(args.get(key), str) and args[key].strip():
+            args[key] = get_entity_name_extractor().canonical(args[key].strip())
+    return None
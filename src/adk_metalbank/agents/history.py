@@ -0,0 +1,147 @@
+import os
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Budget for the conversation history sent to the remote agent on every hop.
+# The character budget is always applied; the token budget (if set) is converted
+# to characters using a rough 4 characters-per-token estimate and the smaller one wins.
+HISTORY_CHAR_BUDGET = int(os.getenv("REMOTE_AGENT_HISTORY_CHAR_BUDGET", "500"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("REMOTE_AGENT_HISTORY_TOKEN_BUDGET", "0"))
+CHARS_PER_TOKEN = 4
+
+# Upper bound on the number of sessions we keep a history window for.
+MAX_TRACKED_SESSIONS = int(os.getenv("REMOTE_AGENT_HISTORY_MAX_SESSIONS", "1024"))
+
+
+def history_budget_chars(char_budget: int = HISTORY_CHAR_BUDGET, token_budget: int = HISTORY_TOKEN_BUDGET) -> int:
+    """
+    Resolves the effective history budget in characters.
+
+    Args:
+        char_budget (int): Maximum number of characters of history.
+        token_budget (int): Maximum number of tokens of history, 0 to disable.
+
+    Returns:
+        int: The smaller of the two budgets, expressed in characters.
+    """
+    if token_budget > 0:
+        return min(char_budget, token_budget * CHARS_PER_TOKEN)
+    return char_budget
+
+
+def format_event(event: Any) -> Optional[str]:
+    """
+    Formats a single session event as a history line with speaker identification.
+
+    Args:
+        event: An ADK session event.
+
+    Returns:
+        str | None: The formatted line, or None if the event carries no text.
+    """
+    content = getattr(event, "content", None)
+    if not content or not content.parts or not content.parts[0].text:
+        return None
+    return f"\n[{event.author.upper()}]: {content.parts[0].text}"
+
+
+class HistoryWindow:
+    """
+    Bounded tail of the formatted conversation history of a single session.
+
+    The window only ever walks events from the tail: on the first update it
+    stops as soon as the budget is filled, and on later updates it only looks
+    at the events appended since the previous call. The cost of an update is
+    therefore bounded by the budget and the number of new events, not by the
+    length of the session.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._lines: deque[str] = deque()
+        self._size = 0
+        self._events_seen = 0
+        self._last_event_id: Optional[str] = None
+
+    def update(self, events: Sequence[Any]) -> str:
+        """
+        Folds any new events into the window and returns the history text.
+
+        Args:
+            events: The full list of session events, oldest first.
+
+        Returns:
+            str: The last `max_chars` characters of the formatted history.
+        """
+        if self._events_seen > len(events) or (
+            self._events_seen and getattr(events[self._events_seen - 1], "id", None) != self._last_event_id
+        ):
+            # The session was rewound or replaced; start again from the tail.
+            self._reset()
+
+        new_lines = []
+        new_size = 0
+        for index in range(len(events) - 1, self._events_seen - 1, -1):
+            line = format_event(events[index])
+            if line:
+                new_lines.append(line)
+                new_size += len(line)
+                if new_size >= self.max_chars:
+                    break
+
+        if new_size >= self.max_chars:
+            self._lines = deque(reversed(new_lines))
+            self._size = new_size
+        else:
+            self._lines.extend(reversed(new_lines))
+            self._size += new_size
+            self._trim()
+
+        self._events_seen = len(events)
+        self._last_event_id = getattr(events[-1], "id", None) if events else None
+        return self.text()
+
+    def text(self) -> str:
+        """Returns the current history text, cut to the character budget."""
+        return "".join(self._lines)[-self.max_chars:]
+
+    def _trim(self) -> None:
+        # Drop the oldest lines as long as the remaining ones still fill the budget.
+        while self._lines and self._size - len(self._lines[0]) >= self.max_chars:
+            self._size -= len(self._lines.popleft())
+
+    def _reset(self) -> None:
+        self._lines.clear()
+        self._size = 0
+        self._events_seen = 0
+        self._last_event_id = None
+
+
+# One history window per session, evicted in least-recently-used order.
+_windows: "OrderedDict[str, HistoryWindow]" = OrderedDict()
+
+
+def get_history_window(session_id: str, max_chars: Optional[int] = None) -> HistoryWindow:
+    """
+    Returns the history window for a session, creating it if needed.
+
+    Args:
+        session_id (str): The ADK session id.
+        max_chars (int | None): The character budget, defaults to the configured budget.
+
+    Returns:
+        HistoryWindow: The window tracking this session.
+    """
+    max_chars = max_chars or history_budget_chars()
+    window = _windows.get(session_id)
+    if window is None or window.max_chars != max_chars:
+        window = HistoryWindow(max_chars)
+        _windows[session_id] = window
+    _windows.move_to_end(session_id)
+    while len(_windows) > MAX_TRACKED_SESSIONS:
+        _windows.popitem(last=False)
+    return window
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import uuid
+import logging
+from contextlib import aclosing
+from typing import AsyncGenerator, Optional
+
+import httpx
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from src.adk_metalbank.agents.sub_agents.remote_agent import MEN_WITHOUT_PHASES_AGENT_URL
+from src.adk_metalbank.agents.tools import (
+    REMOTE_AGENT_UNAVAILABLE_MESSAGE,
+    build_remote_agent_message,
+    call_remote_agent,
+    grant_remote_agent_access,
+)
+from src.shared import metrics
+from src.shared.a2a_streaming import STREAM_PARTIALS_METADATA_KEY
+from src.shared.compression import compressing_client
+from src.shared.resilience import get_dependency
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Relay to the Men Without Phases agent.
+# The fast path hands clandestine requests to this agent instead of calling the remote agent as a
+# tool from its callback. For clients of /run_sse with streaming on, the remote agent's text is
+# relayed as partial events while it is generated (A2A `message/stream`) rather than after it finished.
+REMOTE_AGENT_STREAMING = os.getenv("REMOTE_AGENT_STREAMING", "true").lower() == "true"
+REMOTE_AGENT_STREAM_TIMEOUT_SECONDS = float(os.getenv("REMOTE_AGENT_STREAM_TIMEOUT_SECONDS", "120"))
+RELAY_AGENT_NAME = "men_without_phases_relay_agent"
+
+# Answer to a request without access, in the words the orchestrator's instruction prescribes for it.
+RELAY_DENIED_MESSAGE = "The Metal Bank concerns itself only with coin and contracts."
+
+# Session state key holding the A2A context id, so follow-up turns continue the remote conversation.
+CONTEXT_ID_STATE_KEY = "men_without_phases_context_id"
+
+relay_first_chunk_latency = metrics.histogram(
+    "remote_agent_first_chunk_seconds", "Time until the first text chunk of the remote agent was relayed."
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    # One pooled client, so consecutive turns reuse the connection to the remote agent.
+    # It compresses the message with the conversation history when COMPRESSION_ENABLED is on.
+    global _client
+    if _client is None:
+        _client = compressing_client(timeout=REMOTE_AGENT_STREAM_TIMEOUT_SECONDS)
+    return _client
+
+
+def _text_of(message: Optional[dict]) -> str:
+    return "".join(part.get("text", "") for part in (message or {}).get("parts", []) if part.get("kind", "text") == "text")
+
+
+async def stream_remote_agent(message: str, context_id: Optional[str]) -> AsyncGenerator[dict, None]:
+    """
+    Sends a message to the remote agent with A2A `message/stream` and yields the streamed results.
+
+    Args:
+        message (str): The text sent to the remote agent.
+        context_id (str | None): The A2A context of earlier turns, if any.
+
+    Yields:
+        dict: The `result` of every JSON-RPC response in the event stream (task, status-update,
+        artifact-update or message).
+    """
+    request = {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/stream",
+        "params": {
+            "message": {
+                "kind": "message",
+                "role": "user",
+                "messageId": str(uuid.uuid4()),
+                "parts": [{"kind": "text", "text": message}],
+                "metadata": {STREAM_PARTIALS_METADATA_KEY: True},
+                **({"contextId": context_id} if context_id else {}),
+            }
+        },
+    }
+    async with _get_client().stream(
+        "POST", MEN_WITHOUT_PHASES_AGENT_URL, json=request, headers={"Accept": "text/event-stream"}
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = json.loads(line[len("data:"):])
+            if "error" in data:
+                raise RuntimeError(f"Remote agent error: {data['error'].get('message')}")
+            yield data["result"]
+
+
+class RemoteAgentRelay(BaseAgent):
+    """
+    Relays the conversation to the Men Without Phases agent and streams its answer back.
+
+    Applies the same passcode check as `men_without_phases_agent_remote_tool`. Partial events
+    are only emitted for streaming runs with REMOTE_AGENT_STREAMING on; otherwise, if the stream
+    fails before any text arrived, or while the remote agent's circuit is open, the remote agent
+    is called once through the regular A2A tool.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        tool_context = ToolContext(ctx)
+        if not grant_remote_agent_access(tool_context):
+            text = RELAY_DENIED_MESSAGE
+        elif not (REMOTE_AGENT_STREAMING and ctx.run_config and ctx.run_config.streaming_mode == StreamingMode.SSE):
+            text = await call_remote_agent(tool_context)
+        elif not get_dependency("men_without_phases").available():
+            # The circuit is open: answer right away instead of waiting for a stream that will fail.
+            text = await call_remote_agent(tool_context)
+        else:
+            chunks = []
+            try:
+                message = await build_remote_agent_message(tool_context)
+                # No span around the stream: the events are yielded from inside it. The HTTP call is traced by httpx.
+                start = time.perf_counter()
+                text = None
+                stream = stream_remote_agent(message, ctx.session.state.get(CONTEXT_ID_STATE_KEY))
+                async with aclosing(stream):
+                    async for result in stream:
+                        if result.get("contextId"):
+                            tool_context.state[CONTEXT_ID_STATE_KEY] = result["contextId"]
+                        kind = result.get("kind")
+                        if kind == "message":
+                            text = _text_of(result)
+                            break
+                        if kind == "status-update" and result.get("final"):
+                            text = _text_of(result.get("status", {}).get("message"))
+                            break
+                        if kind == "status-update":
+                            chunk = _text_of(result.get("status", {}).get("message"))
+                        elif kind == "artifact-update":
+                            chunk = _text_of(result.get("artifact"))
+                        else:
+                            continue
+                        if not chunk:
+                            continue
+                        if not chunks:
+                            relay_first_chunk_latency.observe(time.perf_counter() - start)
+                        chunks.append(chunk)
+                        yield Event(
+                            author=self.name,
+                            invocation_id=ctx.invocation_id,
+                            branch=ctx.branch,
+                            partial=True,
+                            content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                        )
+                text = text or "".join(chunks)
+            except Exception:
+                logger.exception("Streaming from the remote agent failed")
+                text = "".join(chunks) if chunks else await call_remote_agent(tool_context)
+
+        # The A2A tool answers with no text at all when the remote agent cannot be reached
+        text = text or REMOTE_AGENT_UNAVAILABLE_MESSAGE
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=tool_context.actions,
+        )
+
+
+men_without_phases_relay_agent = RemoteAgentRelay(
+    name=RELAY_AGENT_NAME,
+    description="Internal relay used only by the deterministic router. Never transfer to this agent.",
+)
@@ -0,0 +1,151 @@
+import os
+import re
+import time
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from src.adk_metalbank.agents.tools import PASSCODE
+from src.adk_metalbank.agents.relay import RELAY_AGENT_NAME
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# The fast path is on by default; set FAST_PATH_ROUTING=false to always let the orchestrator LLM decide.
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ROUTING", "true").lower() == "true"
+
+# Comma separated keyword lists for the deterministic routing rules.
+LOAN_REQUEST_KEYWORDS = os.getenv(
+    "FAST_PATH_LOAN_REQUEST_KEYWORDS", "borrow,need a loan,want a loan,request a loan,apply for a loan,loan of"
+)
+LOAN_KEYWORDS = os.getenv("FAST_PATH_LOAN_KEYWORDS", "loan,loans,borrow,lend,debt,repay,repayment,interest rate")
+CLANDESTINE_KEYWORDS = os.getenv("FAST_PATH_CLANDESTINE_KEYWORDS", "men without phases,clandestine,secret task")
+
+# Routes reported in the routing metrics.
+ROUTE_REMOTE_AGENT = "remote_agent"
+ROUTE_SUB_AGENT = "sub_agent"
+ROUTE_LLM = "llm"
+
+routing_decisions = metrics.counter(
+    "orchestrator_routing_decisions_total", "Orchestrator turns by route; every route but 'llm' skipped the model call."
+)
+routing_latency = metrics.histogram(
+    "orchestrator_routing_decision_seconds", "Time spent evaluating the fast-path routing rules."
+)
+
+
+def _keyword_pattern(keywords: str) -> re.Pattern:
+    words = [re.escape(word.strip().lower()) for word in keywords.split(",") if word.strip()]
+    return re.compile(r"\b(" + "|".join(words) + r")\b")
+
+
+@dataclass
+class RoutingRule:
+    """
+    Routes a user message matching `pattern` to the sub-agent `agent_name`.
+
+    If `requires_discovery` is set the rule only applies once the user has unlocked
+    the clandestine services (the `men_without_phases_discovered` state flag).
+    """
+    name: str
+    pattern: re.Pattern
+    agent_name: Optional[str] = None
+    requires_discovery: bool = False
+
+
+# Evaluated in order, after the passcode check. An agent_name of None dispatches to the remote agent
+# through its relay agent.
+ROUTING_RULES: List[RoutingRule] = [
+    RoutingRule(name="clandestine", pattern=_keyword_pattern(CLANDESTINE_KEYWORDS), requires_discovery=True),
+    RoutingRule(name="loan_request", pattern=_keyword_pattern(LOAN_REQUEST_KEYWORDS), agent_name="loan_assessment_agent"),
+    RoutingRule(name="loan", pattern=_keyword_pattern(LOAN_KEYWORDS), agent_name="metal_bank_agent"),
+]
+
+
+def add_routing_rule(rule: RoutingRule) -> None:
+    """Registers an extra routing rule, evaluated after the existing ones."""
+    ROUTING_RULES.append(rule)
+
+
+def _latest_user_text(llm_request: LlmRequest) -> Optional[str]:
+    # Only route fresh user turns: if the last content is a tool result, the model must run.
+    if not llm_request.contents:
+        return None
+    content = llm_request.contents[-1]
+    if content.role != "user" or not content.parts:
+        return None
+    if any(part.function_response for part in content.parts):
+        return None
+    return "".join(part.text for part in content.parts if part.text) or None
+
+
+def _transfer_response(agent_name: str) -> LlmResponse:
+    # The ADK flow executes this exactly like a transfer decided by the model.
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={"agent_name": agent_name}))],
+        )
+    )
+
+
+def match_route(message: str, discovered: bool) -> Optional[RoutingRule]:
+    """
+    Applies the deterministic routing checks to a user message.
+
+    Args:
+        message (str): The user's message.
+        discovered (bool): Whether the clandestine services were already unlocked.
+
+    Returns:
+        RoutingRule | None: The matching rule, or None if the orchestrator LLM has to decide.
+    """
+    message = message.lower()
+    if PASSCODE in message:
+        return RoutingRule(name="passcode", pattern=re.compile(re.escape(PASSCODE)))
+    for rule in ROUTING_RULES:
+        if rule.requires_discovery and not discovered:
+            continue
+        if rule.pattern.search(message):
+            return rule
+    return None
+
+
+def fast_path_router(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Before-model callback of the orchestrator that routes obvious requests without calling the LLM.
+
+    Returning an LlmResponse skips the model call: a `transfer_to_agent` function call hands
+    over to a sub-agent, or to `men_without_phases_relay_agent` for the remote agent.
+
+    Args:
+        callback_context (CallbackContext): The callback context of the orchestrator.
+        llm_request (LlmRequest): The request about to be sent to the model.
+
+    Returns:
+        LlmResponse | None: The routed response, or None to let the orchestrator LLM decide.
+    """
+    if not FAST_PATH_ENABLED:
+        return None
+    message = _latest_user_text(llm_request)
+    if message is None:
+        return None
+
+    start = time.perf_counter()
+    rule = match_route(message, callback_context.state.get("men_without_phases_discovered") == True)
+    route = ROUTE_LLM if rule is None else (ROUTE_SUB_AGENT if rule.agent_name else ROUTE_REMOTE_AGENT)
+    elapsed = time.perf_counter() - start
+    routing_latency.observe(elapsed, route=route)
+    routing_decisions.inc(route=route)
+
+    if rule is None:
+        return None
+    logger.info(f"Fast path routed to {rule.agent_name or 'the remote agent'} via rule '{rule.name}' in {elapsed * 1e6:.0f} us")
+
+    # The relay runs the passcode check and the remote call as an agent of its own, with its own events.
+    return _transfer_response(rule.agent_name or RELAY_AGENT_NAME)
@@ -1,5 +1,6 @@
 from .metal_bank_agent import metal_bank_agent
 from .remote_agent import men_without_phases_remote_agent
+from .loan_assessment_agent import loan_assessment_agent
 
 
-__all__ = ["metal_bank_agent", "men_without_phases_remote_agent"]
\ No newline at end of file
+__all__ = ["metal_bank_agent", "men_without_phases_remote_agent", "loan_assessment_agent"]
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool import MCPToolset
+from google.adk.tools.tool_context import ToolContext
+
+from src.shared.resilience import fallbacks, get_dependency
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Last successful results kept per toolset, served while the MCP server is unavailable.
+MAX_CACHED_RESULTS = 1024
+# Seconds the tool list of a service is kept before it is listed again.
+MCP_TOOLS_REFRESH_SECONDS = float(os.getenv("MCP_TOOLS_REFRESH_SECONDS", "300"))
+
+
+def _error_result(text: str) -> dict:
+    # Shaped like an MCP tool error, so the model reads it like any other failed tool call.
+    return {"isError": True, "content": [{"type": "text", "text": text}]}
+
+
+def _is_success(result: Any) -> bool:
+    # MCP tools report errors in the result instead of raising
+    return not (isinstance(result, dict) and result.get("isError"))
+
+
+def _mark_cached(result: Any) -> Any:
+    # The cached answer may be stale; say so after the original content.
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        note = {"type": "text", "text": "Note: the service is unavailable, this is the last known answer."}
+        return {**result, "content": [*result["content"], note]}
+    return result
+
+
+class GuardedTool(BaseTool):
+    """
+    An MCP tool whose calls go through the deadline, hedging and circuit breaker of its service.
+
+    Idempotent tools are hedged, and their last successful result per arguments is returned
+    when the service fails or its circuit is open. Other tools return an error result instead,
+    telling the model that the outcome is unknown. Error results of the tool itself are passed
+    on, but neither cached nor counted as successes of the service.
+    """
+
+    def __init__(self, tool: BaseTool, dependency: str, idempotent: bool, cache: "OrderedDict[str, Any]"):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self.tool = tool
+        self.dependency = get_dependency(dependency)
+        self.idempotent = idempotent
+        self.cache = cache
+
+    def _get_declaration(self):
+        return self.tool._get_declaration()
+
+    async def run_async(self, *, args: dict, tool_context: ToolContext) -> Any:
+        key = f"{self.name}:{json.dumps(args, sort_keys=True, default=str)}"
+
+        def fallback(error: Exception) -> Any:
+            cached = self.cache.get(key) if self.idempotent else None
+            if cached is not None:
+                fallbacks.inc(dependency=self.dependency.name, kind="cached")
+                return _mark_cached(cached)
+            fallbacks.inc(dependency=self.dependency.name, kind="degraded")
+            if self.idempotent:
+                return _error_result(f"The {self.dependency.name} service is unavailable ({error}). Try again later.")
+            return _error_result(
+                f"The {self.dependency.name} service did not confirm {self.name} ({error}). "
+                "It may or may not have been applied: check before trying again."
+            )
+
+        succeeded = False
+
+        async def attempt() -> Any:
+            nonlocal succeeded
+            result = await self.tool.run_async(args=args, tool_context=tool_context)
+            succeeded = True
+            return result
+
+        result = await self.dependency.call(attempt, idempotent=self.idempotent, fallback=fallback, is_success=_is_success)
+        if succeeded and self.idempotent and _is_success(result):
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > MAX_CACHED_RESULTS:
+                self.cache.popitem(last=False)
+        return result
+
+
+class GuardedMCPToolset(MCPToolset):
+    """
+    An MCPToolset whose tools are guarded by the resilience policy of their service (see src/shared/resilience.py).
+
+    Listing the tools goes through the same deadline and breaker. The list of the server is kept for
+    MCP_TOOLS_REFRESH_SECONDS, as ADK would otherwise list it again for every model call and every
+    `call_mcp_tool`, and the tool filter is applied to it with the context of each call. While the
+    service is unavailable, the last list is kept.
+
+    Args:
+        dependency (str): The service name, which selects its deadline (<DEPENDENCY>_TIMEOUT_SECONDS) and breaker.
+        idempotent_tools (list[str]): Read-only tools that may be hedged and served from the cache.
+        **kwargs: The MCPToolset arguments.
+    """
+
+    def __init__(self, *, dependency: str, idempotent_tools: Iterable[str] = (), **kwargs):
+        super().__init__(**kwargs)
+        self.dependency = dependency
+        self.idempotent_tools = frozenset(idempotent_tools)
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._tools: Optional[List[GuardedTool]] = None
+        self._listed_at = 0.0
+
+    def _is_tool_selected(self, tool: BaseTool, readonly_context: Optional[ReadonlyContext]) -> bool:
+        # The server's list is kept whole; get_tools filters it for each context
+        return True
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        if self._tools is None or time.monotonic() - self._listed_at >= MCP_TOOLS_REFRESH_SECONDS:
+            try:
+                tools = await get_dependency(self.dependency).call(
+                    lambda: super(GuardedMCPToolset, self).get_tools(readonly_context), idempotent=True
+                )
+            except Exception as error:
+                if self._tools is None:
+                    raise
+                logger.warning(f"Keeping the tool list of {self.dependency}, listing it again failed: {error}")
+            else:
+                self._tools = [GuardedTool(tool, self.dependency, tool.name in self.idempotent_tools, self._cache) for tool in tools]
+            self._listed_at = time.monotonic()
+        is_selected = super()._is_tool_selected
+        return [tool for tool in self._tools if is_selected(tool.tool, readonly_context)]
@@ -1,6 +1,7 @@
 import logging
 from google.adk.agents import LlmAgent
 from src.adk_metalbank.agents.sub_agents.tools import calculate_loan_interest_rate_tool
+from src.shared.llm import get_model_name
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -10,12 +11,12 @@ logging.basicConfig(level=logging.INFO)
 # based on risk scores and loan history passed to it.
 interest_rate_agent = LlmAgent(
     name="interest_rate_agent",
-    model="gemini-2.0-flash",
+    model=get_model_name(),
     instruction=(
     """
     You are the **Metal Bank's Chief Actuary**. Your role is to determine the precise, financially sound interest rate for a loan and provide the rationale.
     **Protocol:**
-    1. **Input Required:** You require the customer's **War-Risk Score** and **Reputation Score** from the state variable 'background_check_result'. If this is missing, you must inform the Loan Officer.
+    1. **Input Required:** You require the customer's **War-Risk Score** and **Reputation Score**, and its **base_risk_factor** if present, from the state variable 'background_check_result'. If this is missing, you must inform the Loan Officer.
     1. **Input Required:** You require the customer's Loan History. If this is missing, you must inform the Loan Officer. Record the nr_open_loans and nr_closed_loans based on the loan information.
     2. **Calculate Rate:** You **MUST** execute the `calculate_loan_interest_rate` tool. This tool will automatically place the final interest rate into the state variable 'loan_interest_rate'.
     3. **Internal Justification:** Read calculated rate from the state. Provide a concise, professional financial justification for the rate by referencing the raw War-Risk and Reputation scores.
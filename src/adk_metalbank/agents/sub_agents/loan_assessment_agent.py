@@ -0,0 +1,120 @@
+import json
+import logging
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from src.adk_metalbank.agents.entity_names import APPLICANT_NAME_STATE_KEY, answer_entity_name
+from src.adk_metalbank.agents.sub_agents.tools import get_loan_quote
+from src.shared.llm import get_model_name
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# The loan assessment as a deterministic workflow:
+#   name extraction (rules; LLM only if they find no name) -> background check + loan summary
+#   + rate calculation (no LLM) -> offer phrasing (LLM)
+# Compared with letting the metal_bank_agent LLM decide every step, this needs one small model call per
+# assessment (two if the name is not found), none of which carries the tool declarations or the conversation history.
+
+NAME_STATE_KEY = APPLICANT_NAME_STATE_KEY
+ASSESSMENT_STATE_KEY = "loan_assessment"
+
+
+# Step 1: extract the bare entity name from the user's message.
+# The deterministic extractor answers in place of the model whenever it finds a name, and a name found
+# earlier in the session is kept when the message names nobody (see entity_names.py).
+loan_applicant_name_agent = LlmAgent(
+    name="loan_applicant_name_agent",
+    model=get_model_name(),
+    instruction=(
+    """
+    Extract the name of the entity requesting a loan from the user's message.
+    If the user says their name, is House X, Lord Y, or the city of Z, you must extract just the name (X, Y, or Z).
+    **Example name extraction (if user says 'I am Lord Bailish'):** Bailish
+    **Example name extraction  (if user says 'I am House Stork'):** Stork
+    **Example name extraction  (if user says 'The city of Pentoss requires a loan'):** Pentoss
+    Answer with the name only. If no name is given, answer with NONE.
+    """),
+    include_contents="none",
+    output_key=NAME_STATE_KEY,
+    before_model_callback=answer_entity_name,
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+)
+
+
+class LoanAssessmentStep(BaseAgent):
+    """
+    Deterministic assessment step: runs the background check, the loan summary
+    lookup and the rate calculation for the name extracted by the previous step.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        name = str(ctx.session.state.get(NAME_STATE_KEY, "")).strip().strip(".")
+        tool_context = ToolContext(ctx)
+        if not name or name.upper() == "NONE":
+            assessment = {"error": "The name of the entity requesting the loan is missing."}
+        else:
+            if ctx.run_config and ctx.run_config.streaming_mode == StreamingMode.SSE:
+                # Progress for streaming clients while the MCP calls run; partial events are not stored in the session.
+                yield Event(
+                    author=self.name,
+                    invocation_id=ctx.invocation_id,
+                    branch=ctx.branch,
+                    partial=True,
+                    content=types.Content(role="model", parts=[types.Part(text=f"Background check and loan review of {name} running...")]),
+                    custom_metadata={"progress": "loan_assessment_running"},
+                )
+            try:
+                assessment = await get_loan_quote(name, tool_context)
+            except Exception as error:
+                logger.exception(f"Loan assessment for {name} failed")
+                assessment = {"error": f"The assessment could not be completed: {error}"}
+
+        tool_context.state[ASSESSMENT_STATE_KEY] = json.dumps(assessment)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=tool_context.actions,
+        )
+
+
+loan_assessment_step = LoanAssessmentStep(
+    name="loan_assessment_step",
+    description="Runs the background check, loan lookup and interest rate calculation without an LLM.",
+)
+
+# Step 3: phrase the offer. The raw scores stay internal; only the rate is shared with the customer.
+loan_offer_agent = LlmAgent(
+    name="loan_offer_agent",
+    model=get_model_name(),
+    instruction=(
+    """
+    You are the main **Loan Officer** of the **Metal Bank**.
+    Your tone must be formal, stern, and coldly professional. Adopt a High Fantasy style of English; use archaic vocabulary (e.g., verily, perchance, hence, doth) and formal titles (My Lord, Ser).
+    The currency you deal with is called Dragons (which are coins). Always mention the currency when discussing money.
+
+    The Bank's private assessment of the customer is: {loan_assessment}
+
+    * If the assessment contains an error, ask the customer for the missing information.
+    * Otherwise present a polished, unflinching offer. You **MUST** state the loan_interest_rate (in percent) clearly to initiate negotiation.
+    **NEVER** disclose the War-Risk Score, the Reputation Score or the number of loans to the customer.
+    """),
+    include_contents="none",
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+)
+
+# The sequential workflow replacing the free-form assessment of the metal_bank_agent.
+loan_assessment_agent = SequentialAgent(
+    name="loan_assessment_agent",
+    description="Assesses a new loan request: extracts the customer's name, checks their background and loans, and offers an interest rate.",
+    sub_agents=[loan_applicant_name_agent, loan_assessment_step, loan_offer_agent],
+)
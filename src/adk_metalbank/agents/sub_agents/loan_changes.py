@@ -0,0 +1,93 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Optional
+
+from src.shared import metrics
+from src.shared.rates import QuoteCache, loan_quotes
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Invalidation of the loan quote cache from the change feed of the Loan Service.
+# The listener subscribes to its loans://changes resource and drops the quote of every entity with
+# a committed change (loan created, repaid, closed or cancelled), whichever agent or MCP client
+# made it. Each time it (re)connects it drops every quote, as changes may have been missed in between.
+# While the Loan Service cannot be reached, quotes only expire with LOAN_QUOTE_TTL_SECONDS.
+LOAN_QUOTE_CHANGE_FEED = os.getenv("LOAN_QUOTE_CHANGE_FEED", "true").lower() == "true"
+# How often the listener reads the feed without a notification, which also notices a lost connection.
+LOAN_CHANGES_RECHECK_SECONDS = float(os.getenv("LOAN_CHANGES_RECHECK_SECONDS", "10"))
+LOAN_CHANGES_RECONNECT_SECONDS = float(os.getenv("LOAN_CHANGES_RECONNECT_SECONDS", "5"))
+
+CHANGES_URI = "loans://changes"
+CHANGES_PAGE_SIZE = 500
+
+change_feed_connected = metrics.gauge("loan_change_feed_connected", "1 while the quote cache follows the Loan Service change feed.")
+
+
+class LoanChangeListener:
+    """
+    Follows the Loan Service change feed and invalidates the quotes of the changed entities.
+
+    Started on first use, on the event loop of the agents (`start`).
+    """
+
+    def __init__(self, url: str, cache: QuoteCache = loan_quotes):
+        self.url = url
+        self.cache = cache
+        self.since = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts following the feed, unless the listener already runs."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="loan_change_listener")
+
+    async def _run(self) -> None:
+        from mcp import ClientSession, types
+        from mcp.client.streamable_http import streamablehttp_client
+
+        while True:
+            updated = asyncio.Event()
+
+            async def on_message(message) -> None:
+                if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ResourceUpdatedNotification):
+                    updated.set()
+
+            try:
+                async with streamablehttp_client(self.url) as (read, write, _):
+                    async with ClientSession(read, write, message_handler=on_message) as session:
+                        await session.initialize()
+                        await session.subscribe_resource(CHANGES_URI)
+                        # Subscribed before reading where the feed is, so no later change is missed
+                        self.since = (await self._read(session, "latest"))["next_since"]
+                        self.cache.clear()
+                        change_feed_connected.set(1)
+                        logger.info(f"Following the loan change feed of {self.url} from sequence number {self.since}")
+                        while True:
+                            try:
+                                await asyncio.wait_for(updated.wait(), LOAN_CHANGES_RECHECK_SECONDS)
+                            except asyncio.TimeoutError:
+                                pass
+                            updated.clear()
+                            await self._catch_up(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning(f"Loan change feed of {self.url} unavailable, quotes only expire with their TTL: {error}")
+            change_feed_connected.set(0)
+            await asyncio.sleep(LOAN_CHANGES_RECONNECT_SECONDS)
+
+    async def _read(self, session, since) -> dict:
+        result = await session.read_resource(f"{CHANGES_URI}?since={since}&limit={CHANGES_PAGE_SIZE}")
+        return json.loads(result.contents[0].text)
+
+    async def _catch_up(self, session) -> None:
+        while True:
+            page = await self._read(session, self.since)
+            for change in page["changes"]:
+                self.cache.invalidate(change["name"])
+            self.since = page["next_since"]
+            if len(page["changes"]) < CHANGES_PAGE_SIZE:
+                return
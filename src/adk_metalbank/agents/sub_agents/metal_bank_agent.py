@@ -1,7 +1,11 @@
 import logging
 from google.adk.agents import LlmAgent
 from google.genai import types
-from src.adk_metalbank.agents.sub_agents.tools import calculate_loan_interest_rate, background_check_tool, loan_tool
+from src.adk_metalbank.agents.compaction import with_compaction
+from src.adk_metalbank.agents.entity_names import canonicalize_entity_arguments, entity_name_callback
+from src.adk_metalbank.agents.sub_agents.tools import calculate_loan_interest_rate, background_check_tool, loan_tool, get_loan_quote, invalidate_loan_quote
+from src.shared.llm import get_model_name
+from src.shared import response_cache
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -11,7 +15,7 @@ logger.setLevel(logging.INFO)
 # checking existing loans, and presenting loan offers to the user.
 metal_bank_agent = LlmAgent(
     name="metal_bank_agent",
-    model="gemini-2.0-flash",
+    model=get_model_name(),
     instruction=(
         """
 
@@ -29,16 +33,18 @@ metal_bank_agent = LlmAgent(
         * **Creating a Loan:** Create a loan using the `loan_tool` based on the interest rate (in percent) decided by the previous step, the total amount requested by the user.
         * **Requesting loan information for a specific user:** Use the `loan_tool` to get all information about a user's loans. Get the user's name before calling the tool.  
         * **Cancelling a loan for a specific user:** Use the `loan_tool` and cancel the loan without elicitation. Get the user's name before calling the tool. 
+        * **Repaying or settling a loan:** Use the `loan_tool` to repay an amount (`repay_loan`) or settle and close the loan (`close_loan`). Get the user's name and the loan ID before calling the tool.
+        * **Requesting the total debt or the loan history of a user:** Use the `loan_tool` (`get_entity_exposure` for the amount owed, `get_loan_history` for past loans and repayments). Get the user's name before calling the tool.
         ---
         ### Core Objectives & Loan Assessment Workflow
         **Crucially, the external end-user (customer) MUST NOT see the raw data (War-Risk Score, Reputation Score, or detailed justifications).** You will interpret and present this data professionally.
-        * **Step 1: Risk Analysis:** Consult the `background_check_tool` to privately receive the customer's risk scores. Get the user's name before calling the background check. 
-        * **Step 2: Existing Loans:** Consult the `loan_tool` to get a list of loans that the user may already have. Get the user's name before calling this. 
-        * **Step 3: Rate Calculation:** Consult the `calculate_loan_interest_rate` tool with war_risk and reputation scores, nr_open_loans, and nr_closed_loans as input to receive the Bank's initial interest rate offer.
-        * **Step 4: Offer Presentation:** Interpret the final interest rate and present a polished, unflinching offer to the customer. You **MUST** state the final offered interest rate clearly to initiate negotiation.
+        * **Step 1: Assessment:** Consult the `get_loan_quote` tool with the user's name. It privately performs the background check, looks up the user's existing loans and calculates the Bank's initial interest rate offer in a single step. Get the user's name before calling it.
+        * **Step 2: Fallback:** Only if `get_loan_quote` fails, consult the `background_check_tool` for the risk scores, the `loan_tool` for the existing loans and then the `calculate_loan_interest_rate` tool with war_risk and reputation scores, the base_risk_factor of the background check, nr_open_loans, and nr_closed_loans as input.
+        * **Step 3: Offer Presentation:** Interpret the final interest rate and present a polished, unflinching offer to the customer. You **MUST** state the final offered interest rate clearly to initiate negotiation.
         ---
         ### Processing user names
-        If the user says their name, is House X, Lord Y, or the city of Z, you must extract just the name (X, Y, or Z). This is crucial for the background check.
+        If you are told the customer's entity name, use exactly that name.
+        Otherwise, if the user says their name, is House X, Lord Y, or the city of Z, you must extract just the name (X, Y, or Z). This is crucial for the background check.
         **Example name extraction (if user says 'I am Lord Bailish'):** Bailish
         **Example name extraction  (if user says 'I am House Stork'):** Stork
         **Example name extraction  (if user says 'The city of Pentoss requires a loan'):** Pentoss
@@ -52,5 +58,13 @@ metal_bank_agent = LlmAgent(
             threshold=types.HarmBlockThreshold.OFF
         )]
     ),
-    tools =[calculate_loan_interest_rate, background_check_tool, loan_tool],
+    tools =[get_loan_quote, calculate_loan_interest_rate, background_check_tool, loan_tool],
+    # Tool arguments like 'House Stork' are reduced to the bare name (see entity_names.py)
+    before_tool_callback=canonicalize_entity_arguments,
+    # Drop the cached quote of an entity once its loans change
+    after_tool_callback=invalidate_loan_quote,
+    # The entity name is extracted without the model and added to the instruction. Older turns of long conversations are folded into a summary, then the opt-in cache of
+    # text-only responses (RESPONSE_CACHE_ENABLED); turns that need tools bypass it
+    before_model_callback=response_cache.with_response_cache(with_compaction([entity_name_callback]), response_cache.before_model_callback),
+    after_model_callback=response_cache.with_response_cache(None, response_cache.after_model_callback),
 )
@@ -1,12 +1,19 @@
+import os
 import logging
 from dotenv import load_dotenv
 from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH, RemoteA2aAgent
+from src.shared.compression import COMPRESSION_ENABLED, compressing_client
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 
+# Base URL of the Men Without Phases A2A service, with a default for local development.
+MEN_WITHOUT_PHASES_AGENT_URL = os.getenv("MEN_WITHOUT_PHASES_AGENT_URL", "http://localhost:8001")
+# Timeout of the A2A client used when compression is on (the ADK default otherwise).
+REMOTE_AGENT_TIMEOUT_SECONDS = 600.0
+
 # This defines a remote agent that handles "clandestine services".
 # Instead of being defined locally, it's accessed via an HTTP endpoint where its
 # AgentCard is published. This allows it to run as a separate microservice.
@@ -14,5 +21,7 @@ load_dotenv()
 men_without_phases_remote_agent = RemoteA2aAgent(
     name="men_without_phases_remote_agent",
     description="Clandestine agent for the Men without Phases organization who arranges discreet services that are not directly acknowledged by the Metal Bank.",
-    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}",
+    agent_card=f"{MEN_WITHOUT_PHASES_AGENT_URL}{AGENT_CARD_WELL_KNOWN_PATH}",
+    # Compresses the conversation history sent on every hop; compressed answers are decoded by httpx.
+    httpx_client=compressing_client(timeout=REMOTE_AGENT_TIMEOUT_SECONDS) if COMPRESSION_ENABLED else None,
 )
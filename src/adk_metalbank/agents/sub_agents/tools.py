@@ -1,6 +1,13 @@
 from google.adk.tools import FunctionTool
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools.mcp_tool import MCPToolset, StreamableHTTPConnectionParams
+from src.adk_metalbank.agents.sub_agents.guarded_toolset import GuardedMCPToolset
+from src.adk_metalbank.agents.sub_agents.loan_changes import LOAN_QUOTE_CHANGE_FEED, LoanChangeListener
+from src.shared.telemetry import start_span
+from src.shared.rates import interest_rate_from_risk, loan_quotes, quote_interest_rate
+from typing import Optional
+import asyncio
+import json
 import os
 
 # Get MCP server URLs from environment variables, with defaults for local development.
@@ -11,22 +18,34 @@ LOAN_MCP_SERVER_URL = os.getenv('LOAN_MCP_SERVER_URL', "http://localhost:8003/mc
 # Create a toolset for the background check service.
 # This toolset connects to the background check MCP server and exposes its tools to the agent.
 # The `tool_filter` specifically includes only the `do_background_check` tool from that service.
-background_check_tool = MCPToolset(
+# Calls have a deadline and a circuit breaker; the background check is a read, so it is also
+# hedged and answered from the last known result while the service is down (see src/shared/resilience.py).
+background_check_tool = GuardedMCPToolset(
+    dependency="background_check",
+    idempotent_tools=["do_background_check"],
     connection_params=StreamableHTTPConnectionParams(url=BACKGROUND_CHECK_MCP_SERVER_URL),
     tool_filter = ["do_background_check"]
 )
 
 # Create a toolset for the loan service.
 # This toolset connects to the loan service MCP server and exposes all of its tools
-# (create_loan, get_loans_by_name, cancel_loan_without_elicitation) to the agent.
+# (create_loan, get_loans_by_name, get_loan_summary_by_name, cancel_loan_without_elicitation,
+# repay_loan, close_loan, get_entity_exposure, get_loan_history) to the agent.
 # MCPToolset doesn't yet have elicitation support so we'll use the tool that doesn't require it.
-loan_tool = MCPToolset(
+# Only the lookups are hedged and answered from cache: a write that timed out may still have been applied.
+loan_tool = GuardedMCPToolset(
+    dependency="loan_service",
+    idempotent_tools=["get_loans_by_name", "get_loan_summary_by_name"],
     connection_params=StreamableHTTPConnectionParams(url=LOAN_MCP_SERVER_URL),
-    tool_filter = ["create_loan", "get_loans_by_name", "cancel_loan_without_elicitation"],
+    tool_filter = ["create_loan", "get_loans_by_name", "get_loan_summary_by_name", "cancel_loan_without_elicitation",
+                   "repay_loan", "close_loan", "get_entity_exposure", "get_loan_history"],
 
 )
 
-def calculate_loan_interest_rate(war_risk: float, reputation: float, nr_open_loans: int, nr_closed_loans: int, tool_context: ToolContext) -> float:
+# Drops cached loan quotes when the Loan Service commits a change to the entity's loans.
+loan_change_listener = LoanChangeListener(LOAN_MCP_SERVER_URL)
+
+def calculate_loan_interest_rate(war_risk: float, reputation: float, nr_open_loans: int, nr_closed_loans: int, tool_context: ToolContext, base_risk_factor: Optional[float] = None) -> float:
     """
     Calculates the loan interest rate based on risk and loan history.
 
@@ -44,6 +63,9 @@ def calculate_loan_interest_rate(war_risk: float, reputation: float, nr_open_loa
         nr_closed_loans (int): The number of loans the entity has successfully paid off.
         tool_context (ToolContext): The ADK context object used to manage the
                                     shared agent state.
+        base_risk_factor (float | None): The base_risk_factor of the background check
+                                         result, if it has one. It replaces the
+                                         weighted average of the two scores.
 
     State Effects (Updates tool_context.state):
         'loan_interest_rate' (float): The final calculated interest rate, rounded
@@ -58,24 +80,12 @@ def calculate_loan_interest_rate(war_risk: float, reputation: float, nr_open_loa
         nr_open_loans = 0
         
     # --- Loan Interest Rate Calculation Logic ---
-    # Assuming war_risk and reputation are between 0 and 1
-    # Higher war_risk increases risk; higher reputation decreases risk (1.0 - reputation).
-    risk_factor = 0.75 * war_risk + 0.25 * (1.0 - reputation)
-    
-    # Baseline 10% interest (0.1), multiplied by the risk factor (0.9), scaled to a percentage
-    interest_rate = (0.9 * risk_factor + 0.1) * 100
-    
-    # Adjust rate based on loan history.
-    # Each open loan increases the rate by 5 percentage points (higher risk).
-    interest_rate += nr_open_loans * 5
-    # Each closed loan decreases the rate by 0.5 percentage points (lower risk).
-    interest_rate -= nr_closed_loans * 0.5
-    
-    
-    # Round the rate for cleaner output and ensure it doesn't fall below a minimum threshold.
-    final_rate = round(interest_rate, 2)
-    if final_rate < 1:
-        final_rate = 1
+    # The shared rate model (see src/shared/rates.py), from the risk factor the Background Check Service
+    # precomputed, or else from the two scores, cached by the four inputs.
+    if base_risk_factor is not None:
+        final_rate = interest_rate_from_risk(base_risk_factor, nr_open_loans, nr_closed_loans)
+    else:
+        final_rate = quote_interest_rate(war_risk, reputation, nr_open_loans, nr_closed_loans)
     
     # Store the calculated rate in the agent's shared state for other agents/tools to access.
     tool_context.state["loan_interest_rate"] = final_rate
@@ -86,4 +96,138 @@ def calculate_loan_interest_rate(war_risk: float, reputation: float, nr_open_loa
 calculate_loan_interest_rate_tool = FunctionTool(
     func=calculate_loan_interest_rate,
     require_confirmation=False
-)
\ No newline at end of file
+)
+
+def _parse_mcp_result(result) -> dict:
+    """Extracts the JSON payload of an MCP tool result (structured content first, then the text content)."""
+    if hasattr(result, "model_dump"):
+        result = result.model_dump(mode="json", exclude_none=True)
+    if result.get("isError"):
+        raise RuntimeError(f"MCP tool call failed: {result.get('content')}")
+    if result.get("structuredContent"):
+        return result["structuredContent"]
+    return json.loads(result["content"][0]["text"])
+
+async def call_mcp_tool(toolset: MCPToolset, tool_name: str, args: dict, tool_context: ToolContext) -> dict:
+    """
+    Calls a single tool of an MCP toolset outside of the LLM loop.
+
+    Args:
+        toolset (MCPToolset): The toolset exposing the tool.
+        tool_name (str): The name of the MCP tool.
+        args (dict): The tool arguments.
+        tool_context (ToolContext): The ADK context of the calling tool.
+
+    Returns:
+        dict: The parsed tool result.
+    """
+    with start_span("mcp.call_tool", tool=tool_name):
+        tools = await toolset.get_tools()
+        tool = next(tool for tool in tools if tool.name == tool_name)
+        return _parse_mcp_result(await tool.run_async(args=args, tool_context=tool_context))
+
+async def assess_loan_application(name: str, tool_context: ToolContext) -> dict:
+    """
+    Runs the whole loan assessment for an entity in a single tool call.
+
+    The background check and the loan history lookup are independent, so both MCP
+    calls are made concurrently. Their results are then fed into
+    `calculate_loan_interest_rate`.
+
+    Args:
+        name (str): The bare name of the entity (e.g. 'Stork' for 'House Stork').
+        tool_context (ToolContext): The ADK context object used to manage the
+                                    shared agent state.
+
+    State Effects (Updates tool_context.state):
+        'background_check_result' (dict): The entity's risk profile.
+        'loan_interest_rate' (float): The calculated interest rate.
+
+    Returns:
+        dict: The risk scores, the number of open and closed loans and the
+              calculated interest rate (loan_interest_rate).
+    """
+    background, loans = await asyncio.gather(
+        call_mcp_tool(background_check_tool, "do_background_check", {"entity_name": name}, tool_context),
+        call_mcp_tool(loan_tool, "get_loan_summary_by_name", {"name": name}, tool_context),
+    )
+    tool_context.state["background_check_result"] = background
+    rate = calculate_loan_interest_rate(
+        war_risk=background["war_risk"],
+        reputation=background["reputation"],
+        nr_open_loans=loans["nr_open_loans"],
+        nr_closed_loans=loans["nr_closed_loans"],
+        tool_context=tool_context,
+        base_risk_factor=background.get("base_risk_factor"),
+    )
+    return {
+        "entity_name": background["entity_name"],
+        "war_risk": background["war_risk"],
+        "reputation": background["reputation"],
+        "nr_open_loans": loans["nr_open_loans"],
+        "nr_closed_loans": loans["nr_closed_loans"],
+        "loan_interest_rate": rate,
+    }
+
+assess_loan_application_tool = FunctionTool(
+    func=assess_loan_application,
+    require_confirmation=False
+)
+
+async def get_loan_quote(name: str, tool_context: ToolContext) -> dict:
+    """
+    Returns the Bank's interest rate quote for an entity in a single call.
+
+    Quotes are cached per entity, so a repeated assessment skips the background
+    check and the loan lookup. The cached quote is dropped when the Loan Service
+    commits a change to a loan of the entity (see loan_changes.py).
+
+    Args:
+        name (str): The bare name of the entity (e.g. 'Stork' for 'House Stork').
+        tool_context (ToolContext): The ADK context object used to manage the
+                                    shared agent state.
+
+    State Effects (Updates tool_context.state):
+        'background_check_result' (dict): The entity's risk profile.
+        'loan_interest_rate' (float): The quoted interest rate.
+
+    Returns:
+        dict: The risk scores, the number of open and closed loans and the
+              quoted interest rate (loan_interest_rate).
+    """
+    if LOAN_QUOTE_CHANGE_FEED:
+        loan_change_listener.start()
+    quote = loan_quotes.get(name)
+    if quote is None:
+        quote = await assess_loan_application(name, tool_context)
+        loan_quotes.put(name, quote)
+    else:
+        tool_context.state["background_check_result"] = {
+            key: quote[key] for key in ("entity_name", "war_risk", "reputation")
+        }
+        tool_context.state["loan_interest_rate"] = quote["loan_interest_rate"]
+    return quote
+
+get_loan_quote_tool = FunctionTool(
+    func=get_loan_quote,
+    require_confirmation=False
+)
+
+# Loan service tools that change an entity's loans, and therefore its quote.
+LOAN_CHANGING_TOOLS = (
+    "create_loan", "cancel_loan_with_elicitation", "cancel_loan_without_elicitation", "repay_loan", "close_loan"
+)
+
+def invalidate_loan_quote(tool, args: dict, tool_context: ToolContext, tool_response) -> None:
+    """
+    After-tool callback dropping the cached quote of an entity whose loans changed.
+
+    The change feed invalidates quotes for every writer; this drops the quote before the
+    agent's next step, without waiting for the notification of its own write.
+
+    Returns:
+        None: The tool response is never modified.
+    """
+    if tool.name in LOAN_CHANGING_TOOLS and args.get("name"):
+        loan_quotes.invalidate(args["name"])
+    return None
@@ -0,0 +1,225 @@
+import os
+import re
+import time
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, MutableMapping, Optional, Sequence
+
+from src.adk_metalbank.agents.history import CHARS_PER_TOKEN, format_event, history_budget_chars
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Which summarizer to use for the remote agent context: "off" (send the raw history window),
+# "local" (deterministic, offline) or "llm" (Gemini).
+SUMMARIZER_MODE = os.getenv("REMOTE_AGENT_SUMMARIZER", "off").lower()
+SUMMARIZER_MODEL = os.getenv("REMOTE_AGENT_SUMMARIZER_MODEL", "gemini-2.0-flash")
+# The summary replaces the history window, so by default it gets the same budget and never sends more.
+SUMMARY_CHAR_BUDGET = int(os.getenv("REMOTE_AGENT_SUMMARY_CHAR_BUDGET", str(history_budget_chars())))
+
+# When a session has never been summarized, only this many of the most recent events are folded in.
+MAX_EVENTS_PER_FOLD = int(os.getenv("REMOTE_AGENT_SUMMARY_MAX_EVENTS", "200"))
+MAX_CACHED_SUMMARIES = 1024
+
+# Session state keys holding the rolling summary and the id of the last event folded into it.
+SUMMARY_STATE_KEY = "remote_agent_summary"
+SUMMARY_EVENT_ID_STATE_KEY = "remote_agent_summary_event_id"
+
+summary_latency = metrics.histogram(
+    "remote_agent_summary_latency_seconds", "Time spent folding new events into the rolling summary."
+)
+summary_cache_hits = metrics.counter(
+    "remote_agent_summary_cache_hits_total", "Summaries served from the (session, last event) cache."
+)
+# The summary replaces the history window (REMOTE_AGENT_HISTORY_CHAR_BUDGET), so it is compared with what the window would send.
+summary_tokens = metrics.counter(
+    "remote_agent_summary_tokens_total", "Estimated tokens of the summaries sent to the remote agent."
+)
+window_tokens = metrics.counter(
+    "remote_agent_window_tokens_total", "Estimated tokens the history window would have sent on the same hops."
+)
+
+
+class Summarizer(ABC):
+    """Folds new conversation lines into an existing rolling summary."""
+
+    @abstractmethod
+    async def summarize(self, previous_summary: str, new_lines: Sequence[str]) -> str:
+        """
+        Args:
+            previous_summary (str): The summary of everything folded in so far (may be empty).
+            new_lines (Sequence[str]): Formatted history lines not yet part of the summary, oldest first.
+
+        Returns:
+            str: The updated summary.
+        """
+
+
+class LocalSummarizer(Summarizer):
+    """
+    Deterministic, offline summarizer used for tests and offline runs.
+
+    It keeps the most recent lines, with whitespace collapsed and each line clipped,
+    within a character budget. The same input always produces the same summary.
+    """
+
+    def __init__(self, max_chars: int = SUMMARY_CHAR_BUDGET, max_line_chars: int = 160):
+        self.max_chars = max_chars
+        self.max_line_chars = max_line_chars
+
+    async def summarize(self, previous_summary: str, new_lines: Sequence[str]) -> str:
+        lines = previous_summary.splitlines() if previous_summary else []
+        for line in new_lines:
+            line = re.sub(r"\s+", " ", line).strip()
+            if not line:
+                continue
+            if len(line) > self.max_line_chars:
+                line = line[: self.max_line_chars - 3] + "..."
+            lines.append(line)
+
+        # Keep the newest lines that fit in the budget.
+        kept, size = [], 0
+        for line in reversed(lines):
+            if size + len(line) + 1 > self.max_chars:
+                break
+            kept.append(line)
+            size += len(line) + 1
+        return "\n".join(reversed(kept))
+
+
+class LlmSummarizer(Summarizer):
+    """Summarizer backed by a Gemini model. The client is created on first use."""
+
+    def __init__(self, model: str = SUMMARIZER_MODEL, max_chars: int = SUMMARY_CHAR_BUDGET):
+        self.model = model
+        self.max_chars = max_chars
+        self._client = None
+
+    async def summarize(self, previous_summary: str, new_lines: Sequence[str]) -> str:
+        from google import genai
+
+        if self._client is None:
+            self._client = genai.Client()
+        prompt = (
+            f"Update the running summary of a conversation with the Metal Bank of Braveos. "
+            f"Keep names, targets, amounts and prices. Answer with the summary only, at most {self.max_chars} characters.\n\n"
+            f"Current summary:\n{previous_summary or '(empty)'}\n\nNew messages:\n" + "\n".join(new_lines)
+        )
+        response = await self._client.aio.models.generate_content(model=self.model, contents=prompt)
+        return (response.text or previous_summary)[: self.max_chars]
+
+
+_summarizer: Optional[Summarizer] = None
+
+
+def get_summarizer() -> Optional[Summarizer]:
+    """
+    Returns the configured summarizer, or None if summarization is turned off.
+    """
+    global _summarizer
+    if _summarizer is None:
+        if SUMMARIZER_MODE == "local":
+            _summarizer = LocalSummarizer()
+        elif SUMMARIZER_MODE == "llm":
+            _summarizer = LlmSummarizer()
+    return _summarizer
+
+
+def window_chars(events: Sequence[Any], budget: int) -> int:
+    """
+    Returns the size of the history window the remote agent would get instead of the summary.
+
+    Walks back from the tail only until the budget is filled, like the window itself.
+    """
+    size = 0
+    for event in reversed(events):
+        line = format_event(event)
+        if line:
+            size += len(line)
+            if size >= budget:
+                return budget
+    return size
+
+
+def _record_tokens(events: Sequence[Any], summary: str) -> tuple:
+    sent, window = len(summary) // CHARS_PER_TOKEN, window_chars(events, history_budget_chars()) // CHARS_PER_TOKEN
+    summary_tokens.inc(sent)
+    window_tokens.inc(window)
+    return sent, window
+
+
+# Summaries keyed by (session id, id of the last event folded in), evicted in LRU order.
+_summary_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _new_events(events: Sequence[Any], last_event_id: Optional[str]) -> Sequence[Any]:
+    # Walk back from the tail until the last summarized event; everything after it is new.
+    start = max(len(events) - MAX_EVENTS_PER_FOLD, 0)
+    for index in range(len(events) - 1, start - 1, -1):
+        if getattr(events[index], "id", None) == last_event_id:
+            return events[index + 1:]
+    return events[start:]
+
+
+async def summarize_session(
+    session_id: str,
+    events: Sequence[Any],
+    state: MutableMapping[str, Any],
+    summarizer: Summarizer,
+) -> str:
+    """
+    Incrementally updates the rolling summary of a session.
+
+    Only events that are not yet part of the summary stored in `state` are passed to
+    the summarizer, and the result is cached per (session, last event id) so repeated
+    hops without new events cost nothing.
+
+    Args:
+        session_id (str): The ADK session id.
+        events (Sequence): The session events, oldest first.
+        state (MutableMapping): The session state holding the rolling summary.
+        summarizer (Summarizer): The summarizer used to fold in new events.
+
+    State Effects:
+        'remote_agent_summary' (str): The updated rolling summary.
+        'remote_agent_summary_event_id' (str): The id of the last event folded in.
+
+    Returns:
+        str: The rolling summary covering every event up to the latest one.
+    """
+    last_event_id = getattr(events[-1], "id", None) if events else None
+    cache_key = (session_id, last_event_id)
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        _summary_cache.move_to_end(cache_key)
+        summary_cache_hits.inc()
+        _record_tokens(events, cached)
+        return cached
+
+    previous_summary = state.get(SUMMARY_STATE_KEY, "")
+    new_events = _new_events(events, state.get(SUMMARY_EVENT_ID_STATE_KEY))
+    new_lines = [line.strip() for line in map(format_event, new_events) if line]
+
+    summary = previous_summary
+    if new_lines:
+        start = time.perf_counter()
+        summary = await summarizer.summarize(previous_summary, new_lines)
+        elapsed = time.perf_counter() - start
+        summary_latency.observe(elapsed, summarizer=type(summarizer).__name__)
+
+        sent, window = _record_tokens(events, summary)
+        logger.info(
+            f"Folded {len(new_lines)} events into the summary of session {session_id} "
+            f"in {elapsed * 1000:.1f} ms (~{sent} tokens, against ~{window} for the history window)"
+        )
+    else:
+        _record_tokens(events, summary)
+
+    state[SUMMARY_STATE_KEY] = summary
+    state[SUMMARY_EVENT_ID_STATE_KEY] = last_event_id
+    _summary_cache[cache_key] = summary
+    while len(_summary_cache) > MAX_CACHED_SUMMARIES:
+        _summary_cache.popitem(last=False)
+    return summary
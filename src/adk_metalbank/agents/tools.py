@@ -3,10 +3,21 @@ from google.adk.tools import FunctionTool
 from google.adk.tools.agent_tool import AgentTool
 from src.adk_metalbank.agents.sub_agents import men_without_phases_remote_agent
 from google.adk.sessions import Session
+from src.adk_metalbank.agents.history import get_history_window
+from src.adk_metalbank.agents.summarizer import get_summarizer, summarize_session
+from src.shared.telemetry import start_span
+from src.shared.resilience import fallbacks, get_dependency
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 # The secret passcode that users must provide to access the Men Without phases agent
 PASSCODE = "all systems must fail"
 
+# Answer given when the remote agent times out or its circuit is open (see src/shared/resilience.py).
+REMOTE_AGENT_UNAVAILABLE_MESSAGE = "The Men Without Phases cannot be reached right now. Try again later."
+
 
 def format_converation_for_remote_agent(
     tool_context: ToolContext
@@ -18,26 +29,50 @@ def format_converation_for_remote_agent(
         
     Returns:
         str: A formatted string containing the user's question and recent conversation history
-             limited to the last 500 characters for context
+             limited to the configured history budget (500 characters by default)
     """
     history_text = ""
-    conversation_history = tool_context._invocation_context.session.events
     user_message = tool_context.user_content.parts[0].text
     try:
-
-        # TODO: Replace with LLM-based summarization in the future
-        for event in conversation_history:
-            if event.content and event.content.parts and event.content.parts[0].text:
-                text_content = event.content.parts[0].text
-            if text_content:
-                # Format each message with speaker identification
-                history_text += f"\n[{event.author.upper()}]: {text_content}"
+        session = tool_context._invocation_context.session
+        # The window only walks the tail of the session, so this stays cheap for long conversations.
+        history_text = get_history_window(session.id).update(session.events)
 
     # Return a simplified history string that the remote agent can process
-    except:
+    except Exception:
+        logger.exception("Could not build the conversation history for the remote agent")
         history_text += "missing history"
-    finally:
-        return f"User's latest message: '{user_message}'\n\nRecent Conversation History:\n{history_text[-500:]}"
+    return f"User's latest message: '{user_message}'\n\nRecent Conversation History:\n{history_text}"
+
+async def summarize_conversation_for_remote_agent(
+    tool_context: ToolContext
+) -> str:
+    """
+    Summarize the conversation for the remote Men Without Phases agent.
+
+    Only the events added since the previous hop are folded into the rolling summary
+    kept in the session state (see `REMOTE_AGENT_SUMMARIZER`).
+
+    Args:
+        tool_context (ToolContext): The context for tool execution
+
+    Returns:
+        str: A formatted string containing the user's question and the conversation summary
+    """
+    user_message = tool_context.user_content.parts[0].text
+    try:
+        session = tool_context._invocation_context.session
+        summary = await summarize_session(session.id, session.events, tool_context.state, get_summarizer())
+    except Exception:
+        logger.exception("Could not summarize the conversation for the remote agent")
+        return format_converation_for_remote_agent(tool_context)
+    return f"User's latest message: '{user_message}'\n\nConversation Summary:\n{summary}"
+
+async def build_remote_agent_message(tool_context: ToolContext) -> str:
+    """Builds the message for the remote agent: the rolling summary if enabled, otherwise the recent history."""
+    if get_summarizer() is not None:
+        return await summarize_conversation_for_remote_agent(tool_context)
+    return format_converation_for_remote_agent(tool_context)
 
 async def call_remote_agent(
     tool_context: ToolContext,
@@ -51,14 +86,45 @@ async def call_remote_agent(
     Returns:
         str: The response from the remote agent
     """
-    message_to_remote_agent = format_converation_for_remote_agent(tool_context)
+    message_to_remote_agent = await build_remote_agent_message(tool_context)
 
     agent_tool = AgentTool(agent=men_without_phases_remote_agent)
-    agent_output = await agent_tool.run_async(
-        args={"request": message_to_remote_agent}, tool_context=tool_context
-    )
+
+    def unavailable(error: Exception) -> str:
+        fallbacks.inc(dependency="men_without_phases", kind="degraded")
+        return REMOTE_AGENT_UNAVAILABLE_MESSAGE
+
+    # Not idempotent (the remote agent keeps the conversation), so the call is never hedged.
+    with start_span("a2a.call_remote_agent", agent=men_without_phases_remote_agent.name):
+        agent_output = await get_dependency("men_without_phases").call(
+            lambda: agent_tool.run_async(args={"request": message_to_remote_agent}, tool_context=tool_context),
+            fallback=unavailable,
+        )
     return agent_output 
 
+# Answer given to anyone asking for the remote agent without the passcode.
+ACCESS_DENIED_MESSAGE = "I don't know what you mean. This is a bank."
+
+
+def grant_remote_agent_access(tool_context: ToolContext) -> bool:
+    """
+    Checks whether the user may talk to the Men Without Phases agent.
+
+    Access is granted if the user discovered the agent earlier in the session or
+    the latest message contains the passcode, in which case the discovery is recorded.
+
+    State Effects:
+        'men_without_phases_discovered' (bool): Set to True once the passcode was given.
+    """
+    user_message = tool_context.user_content.parts[0].text
+    if "men_without_phases_discovered" in tool_context.state and tool_context.state["men_without_phases_discovered"] == True:
+        return True
+    if PASSCODE in user_message.lower():
+        tool_context.state["men_without_phases_discovered"] = True
+        return True
+    return False
+
+
 # The only reason we model the remote agent as a tool is because we want to incorporate the passcode check as the Menwithoutphases agent is clandestine.
 async def men_without_phases_agent_remote_tool(tool_context: ToolContext) -> str:
     """
@@ -75,14 +141,9 @@ async def men_without_phases_agent_remote_tool(tool_context: ToolContext) -> str
     Returns:
         str: Either the remote agent's response or a generic denial message
     """
-    user_message = tool_context.user_content.parts[0].text
-    if "men_without_phases_discovered" in tool_context.state and tool_context.state["men_without_phases_discovered"] == True:
+    if grant_remote_agent_access(tool_context):
         return await call_remote_agent(tool_context)
-    else:
-        if PASSCODE in user_message.lower():
-            tool_context.state["men_without_phases_discovered"] = True
-            return await call_remote_agent(tool_context)
-        return "I don't know what you mean. This is a bank."
+    return ACCESS_DENIED_MESSAGE
 
 # Register the gateway function as a tool, with confirmation disabled since access is controlled by passcode
 men_without_phases_agent_tool = FunctionTool(
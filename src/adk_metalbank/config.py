@@ -1,6 +1,7 @@
 import os
 import logging
 from dotenv import load_dotenv
+from src.shared.llm import uses_vertex_ai
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -9,8 +10,8 @@ logging.basicConfig(level=logging.INFO)
 def set_config():
     load_dotenv()
 
-    # Quit if required env variables are absent
-    if not all(os.getenv(var) for var in ["GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"]):
+    # Quit if required env variables are absent (the fake model needs no Google Cloud settings)
+    if uses_vertex_ai() and not all(os.getenv(var) for var in ["GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"]):
         logger.error("Missing one or more environment variables: GOOGLE_CLOUD_PROJECT, GOOGLE_CLOUD_LOCATION, GOOGLE_GENAI_USE_VERTEXAI")
         exit(1)
 
@@ -18,6 +18,8 @@ import logging
 from google.adk.cli.fast_api import get_fast_api_app
 from fastapi import FastAPI
 from src.adk_metalbank.config import set_config
+from src.shared.telemetry import TELEMETRY_EXPORTER, TelemetryMiddleware, setup_telemetry
+from src.shared.profiling import PROFILING_ENABLED, ProfilingMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,7 +31,15 @@ set_config()
 AGENT_DIR = f"{os.path.dirname(os.path.abspath(__file__))}"
 # Define allowed origins for Cross-Origin Resource Sharing (CORS).
 ALLOWED_ORIGINS = ["http://localhost", "*"]
-
+# Directory of the app's local data: the default session store lives here, wherever the app is started from.
+METAL_BANK_DATA_DIR = os.path.abspath(
+    os.getenv("METAL_BANK_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(AGENT_DIR)), "data"))
+)
+# Durable session store, so conversations survive restarts. Any ADK session service URI
+# works (e.g. a database URL); an empty value keeps sessions in memory.
+SESSION_SERVICE_URI = os.getenv("SESSION_SERVICE_URI", f"sqlite:///{os.path.join(METAL_BANK_DATA_DIR, 'sessions.db')}") or None
+if SESSION_SERVICE_URI and SESSION_SERVICE_URI.startswith(f"sqlite:///{METAL_BANK_DATA_DIR}"):
+    os.makedirs(METAL_BANK_DATA_DIR, exist_ok=True)
 
 
 # --- FastAPI Application Initialization ---
@@ -39,87 +49,37 @@ ALLOWED_ORIGINS = ["http://localhost", "*"]
 app: FastAPI = get_fast_api_app(
     agents_dir=AGENT_DIR,
     allow_origins=ALLOWED_ORIGINS,
+    session_service_uri=SESSION_SERVICE_URI,
     web=True,
 )
 
 def setup_opentelemetry() -> None:
     """
-    Configures OpenTelemetry to export traces, logs, and metrics to Google Cloud.
-    This setup is crucial for observing the application's behavior, especially
-    for tracing Generative AI interactions.
-    https://cloud.google.com/trace/docs/migrate-to-otlp-endpoints
-    """
-    import google.auth
-    import google.auth.transport.requests
-    import grpc
-    from google.auth.transport.grpc import AuthMetadataPlugin
-    from opentelemetry import trace
-    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
-        OTLPSpanExporter,
-    )
-    from opentelemetry.instrumentation.google_generativeai import GoogleGenerativeAiInstrumentor
-    from opentelemetry.sdk.resources import SERVICE_INSTANCE_ID, Resource
-    from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import BatchSpanProcessor
-
-    # --- Google Cloud Platform Scopes ---
-    # Define the necessary OAuth 2.0 scopes for Google Cloud services.
-    # These scopes grant the application permission to send data to Cloud Trace,
-    # Logging, and Monitoring, which are essential for observability.
-    GCP_SCOPES = [
-        "https://www.googleapis.com/auth/trace.append",       # For Cloud Trace
-        "https://www.googleapis.com/auth/logging.write",      # For Cloud Logging
-        "https://www.googleapis.com/auth/monitoring.write",   # For Cloud Monitoring
-        "https://www.googleapis.com/auth/cloud-platform",     # Broad scope for other Google ADK/AI Platform needs
-    ]
-
+    Configures OpenTelemetry tracing through the shared telemetry setup.
 
-    # Authenticate and get the project ID using Application Default Credentials (ADC).
-    credentials, project_id = google.auth.default()
-
-    request = google.auth.transport.requests.Request()
-
-    auth_metadata_plugin = AuthMetadataPlugin(credentials=credentials, request=request)
-
-    channel_creds = grpc.composite_channel_credentials(
-        grpc.ssl_channel_credentials(),
-        grpc.metadata_call_credentials(auth_metadata_plugin),
-    )
+    Spans are exported according to TELEMETRY_EXPORTER (console, json, otlp or gcp).
+    When GenAI message capture is turned on, spans go to Google Cloud as before, and
+    the `google-genai` library is instrumented to trace each call to the model.
+    """
+    capture_genai = os.getenv("OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT", "false").lower() == "true"
+    exporter = "gcp" if capture_genai and TELEMETRY_EXPORTER == "none" else None
+    setup_telemetry("metal_bank", exporter)
 
-    otlp_grpc_exporter = OTLPSpanExporter(credentials=channel_creds)
+    if capture_genai:
+        # --- Auto-instrumentation ---
+        # This automatically patches the `google-genai` library to create trace spans
+        # for each call to the Generative AI model, providing deep visibility.
+        from opentelemetry.instrumentation.google_generativeai import GoogleGenerativeAiInstrumentor
 
-    # Create a resource identifier for this service instance, which helps in
-    # associating telemetry data with the correct application in Google Cloud.
-    resource = Resource.create(
-        attributes={
-            SERVICE_INSTANCE_ID: f"worker-{os.getpid()}",
-            "gcp.project_id": project_id,
-        }
-    )
-    # Set up OTLP auth
-    # Create an authentication plugin for gRPC channels to securely send
-    # telemetry data to the Google Cloud backend.
-    # --- Trace Provider Setup ---
-    custom_tracer_provider = TracerProvider(resource=resource)
-    # The BatchSpanProcessor groups spans together before sending them to the exporter.
-    custom_tracer_provider.add_span_processor(
-        BatchSpanProcessor(
-           span_exporter=otlp_grpc_exporter
-        )
-    )
-    # Register the tracer provider globally.
-    trace.set_tracer_provider(custom_tracer_provider)
+        GoogleGenerativeAiInstrumentor().instrument()
 
-    # --- Auto-instrumentation ---
-    # This automatically patches the `google-genai` library to create trace spans
-    # for each call to the Generative AI model, providing deep visibility.
-    GoogleGenerativeAiInstrumentor().instrument()
-    return
+setup_opentelemetry()
 
-# Conditionally enable OpenTelemetry based on an environment variable.
-# This allows developers to turn on detailed GenAI tracing when needed.
-if os.getenv("OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT", "false").lower() == "true":
-    setup_opentelemetry()
+# Trace context propagation, request latency metrics and the optional /metrics endpoint
+app.add_middleware(TelemetryMiddleware, service_name="metal_bank")
+# Opt-in admin routes with CPU profiles, task dumps, loop lag and allocation snapshots
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 if __name__ == "__main__":
    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)))
\ No newline at end of file
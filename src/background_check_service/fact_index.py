@@ -0,0 +1,279 @@
+import os
+import re
+import sys
+import json
+import math
+import heapq
+import hashlib
+import logging
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Full-text search over the facts of the background data.
+# An inverted index maps every term to the facts containing it, sorted by fact id, with the BM25
+# weight of the term in each fact precomputed. It is built once per version of the background data
+# (the hash of background.json) and stored next to it as background.factindex; a service finding an
+# index of another version rebuilds it. To build it ahead of the first search:
+#     python -m src.background_check_service.fact_index --data ./src/background_check_service/background.json
+FORMAT_VERSION = 1
+MAGIC = b"FACTIDX1"
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "they", "this", "to", "was", "were", "with", "not",
+}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text, without stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def data_version(data: bytes) -> str:
+    """Version of the background data an index was built from."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def index_file(data_file: str) -> str:
+    """The index stored next to a data file: background.json -> background.factindex."""
+    return f"{os.path.splitext(data_file)[0]}.factindex"
+
+
+class FactIndex:
+    """
+    BM25-ranked inverted index over the facts of every entity.
+
+    Facts are numbered entity by entity, so the facts of one entity are a contiguous range of ids
+    and filtering by entity is a binary search in each posting list.
+    """
+
+    def __init__(
+        self,
+        entities: List[str],
+        entity_starts: array,
+        terms: List[str],
+        term_starts: array,
+        fact_ids: array,
+        weights: array,
+        max_weights: array,
+        version: str,
+    ):
+        self.entities = entities
+        self.entity_starts = entity_starts
+        self.terms = terms
+        self.term_ids = {term: index for index, term in enumerate(terms)}
+        self.term_starts = term_starts
+        self.fact_ids = fact_ids
+        self.weights = weights
+        self.max_weights = max_weights
+        self.version = version
+        self.entity_ids = {entity: index for index, entity in enumerate(entities)}
+
+    @property
+    def size(self) -> int:
+        return self.entity_starts[-1]
+
+    @classmethod
+    def build(cls, stats: dict, version: str) -> "FactIndex":
+        """
+        Indexes the facts of the background data.
+
+        Args:
+            stats (dict): The background data: entity name to a dict with a `facts` list.
+            version (str): The data version recorded in the index.
+
+        Returns:
+            FactIndex: The index.
+        """
+        entities = list(stats)
+        entity_starts = array("I", [0])
+        lengths = array("H")
+        postings: Dict[str, Tuple[array, array]] = defaultdict(lambda: (array("I"), array("H")))
+        fact_id = 0
+        for entity in entities:
+            for fact in stats[entity].get("facts", []):
+                tokens = tokenize(fact)
+                lengths.append(min(len(tokens), 0xFFFF))
+                for term, count in Counter(tokens).items():
+                    ids, counts = postings[term]
+                    ids.append(fact_id)
+                    counts.append(min(count, 0xFFFF))
+                fact_id += 1
+            entity_starts.append(fact_id)
+
+        total = max(fact_id, 1)
+        average_length = (sum(lengths) / total) or 1.0
+        terms = sorted(postings)
+        term_starts, fact_ids, weights, max_weights = array("I", [0]), array("I"), array("f"), array("f")
+        for term in terms:
+            ids, counts = postings.pop(term)
+            idf = math.log(1 + (total - len(ids) + 0.5) / (len(ids) + 0.5))
+            term_weights = array("f", (
+                idf * count * (BM25_K1 + 1) / (count + BM25_K1 * (1 - BM25_B + BM25_B * lengths[fact] / average_length))
+                for fact, count in zip(ids, counts)
+            ))
+            fact_ids.extend(ids)
+            weights.extend(term_weights)
+            max_weights.append(max(term_weights))
+            term_starts.append(len(fact_ids))
+        return cls(entities, entity_starts, terms, term_starts, fact_ids, weights, max_weights, version)
+
+    def search(self, query: str, entity_name: Optional[str] = None, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Returns the ids and BM25 scores of the best matching facts, best first.
+
+        Posting lists are read shortest first. Once no fact outside the current candidates can
+        reach the top k (the k-th best partial score is at least the largest weight left to add),
+        longer lists are only searched for the candidates instead of being read whole.
+
+        Args:
+            query (str): Words to search for.
+            entity_name (str | None): Only search the facts of this entity.
+            top_k (int): Number of facts to return.
+
+        Returns:
+            list[tuple[int, float]]: Fact ids and scores.
+        """
+        low, high = 0, self.size
+        if entity_name is not None:
+            entity = self.entity_ids.get(entity_name.lower())
+            if entity is None:
+                return []
+            low, high = self.entity_starts[entity], self.entity_starts[entity + 1]
+
+        lists = []
+        for term, count in Counter(tokenize(query)).items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_starts[term_id], self.term_starts[term_id + 1]
+            if entity_name is not None:
+                start, end = bisect_left(self.fact_ids, low, start, end), bisect_left(self.fact_ids, high, start, end)
+            if start < end:
+                lists.append((end - start, start, end, count, self.max_weights[term_id] * count))
+        if not lists or top_k <= 0:
+            return []
+        lists.sort()
+
+        remaining = sum(bound for *_, bound in lists)
+        scores: Dict[int, float] = {}
+        for length, start, end, count, bound in lists:
+            candidates_only = False
+            if len(scores) >= top_k and len(scores) * math.log2(length + 1) < length:
+                candidates_only = heapq.nlargest(top_k, scores.values())[-1] >= remaining
+            if candidates_only:
+                # No new fact can enter the top k: add this term to the candidates only
+                for fact in scores:
+                    position = bisect_left(self.fact_ids, fact, start, end)
+                    if position < end and self.fact_ids[position] == fact:
+                        scores[fact] += self.weights[position] * count
+            elif not scores and count == 1:
+                scores = dict(zip(self.fact_ids[start:end], self.weights[start:end]))
+            else:
+                get = scores.get
+                for fact, weight in zip(self.fact_ids[start:end], self.weights[start:end]):
+                    scores[fact] = get(fact, 0.0) + weight * count
+            remaining -= bound
+        return [(fact, score) for score, fact in heapq.nlargest(top_k, zip(scores.values(), scores.keys()))]
+
+    def locate(self, fact_id: int) -> Tuple[str, int]:
+        """Returns the entity of a fact and the position of the fact in the entity's list."""
+        entity = bisect_right(self.entity_starts, fact_id) - 1
+        return self.entities[entity], fact_id - self.entity_starts[entity]
+
+    def save(self, path: str) -> None:
+        """Writes the index, replacing the file atomically."""
+        header = json.dumps({
+            "format": FORMAT_VERSION,
+            "version": self.version,
+            "byteorder": sys.byteorder,
+            "bm25": [BM25_K1, BM25_B],
+            "entities": self.entities,
+            "terms": self.terms,
+            "postings": len(self.fact_ids),
+        }).encode()
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for values in (self.entity_starts, self.term_starts, self.fact_ids, self.weights, self.max_weights):
+                values.tofile(f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["FactIndex"]:
+        """Reads an index written by `save`; returns None if it is missing or of another format."""
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                header = json.loads(f.read(int.from_bytes(f.read(8), "little")))
+                if header["format"] != FORMAT_VERSION or header["byteorder"] != sys.byteorder or header["bm25"] != [BM25_K1, BM25_B]:
+                    return None
+                arrays = []
+                for typecode, count in (
+                    ("I", len(header["entities"]) + 1),
+                    ("I", len(header["terms"]) + 1),
+                    ("I", header["postings"]),
+                    ("f", header["postings"]),
+                    ("f", len(header["terms"])),
+                ):
+                    values = array(typecode)
+                    values.fromfile(f, count)
+                    arrays.append(values)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, KeyError) as error:
+            logger.warning(f"Fact index {path} not loaded: {error}")
+            return None
+        entity_starts, term_starts, fact_ids, weights, max_weights = arrays
+        return cls(header["entities"], entity_starts, header["terms"], term_starts, fact_ids, weights, max_weights, header["version"])
+
+
+def load_or_build(data_file: str, stats: Optional[dict] = None) -> FactIndex:
+    """
+    Returns the index of a data file, building and saving it if there is none for this data version.
+
+    Args:
+        data_file (str): Path of background.json.
+        stats (dict | None): The parsed data, if already loaded.
+
+    Returns:
+        FactIndex: The index.
+    """
+    with open(data_file, "rb") as f:
+        data = f.read()
+    version = data_version(data)
+    path = index_file(data_file)
+    index = FactIndex.load(path)
+    if index is not None and index.version == version:
+        return index
+    logger.info(f"Building the fact index of {data_file}")
+    index = FactIndex.build(stats if stats is not None else json.loads(data), version)
+    try:
+        index.save(path)
+    except OSError as error:
+        logger.warning(f"Fact index kept in memory only, {path} is not writable: {error}")
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Builds the fact index of the background data.")
+    parser.add_argument("--data", default="./src/background_check_service/background.json")
+    args = parser.parse_args()
+    index = load_or_build(args.data)
+    print(f"{index_file(args.data)}: {index.size} facts, {len(index.terms)} terms, version {index.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,81 @@
-from src.shared.models.loans import LoanRiskProfile
+from src.shared.models.loans import FactMatch, LoanRiskProfile
+from src.background_check_service.fact_index import FactIndex, load_or_build
+from src.shared.rates import base_risk_factor
+from src.shared.telemetry import TelemetryMiddleware, setup_telemetry, start_span
+from src.shared.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from src.shared.admission import ADMISSION_CONTROL_ENABLED, AdmissionMiddleware
+from src.shared.resilience import FAULT_INJECTION_ENABLED, FaultInjectionMiddleware
+from src.shared.compression import COMPRESSION_ENABLED, CompressionMiddleware
 from fastmcp import FastMCP
+from typing import Optional
 import logging
 import json
+import uvicorn
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+setup_telemetry("background_check_service")
+
 # Define MCP server
 mcp = FastMCP("Entity stats for loans")
 
 BACKGROUND_STATS = None
+# Risk profiles per entity, with the base risk factor precomputed whenever the background data loads
+RISK_PROFILES = None
+
+# Profile of entities the Bank knows nothing about
+UNKNOWN_WAR_RISK = 0.5
+UNKNOWN_REPUTATION = 0.0
+
+BACKGROUND_FILE = "./src/background_check_service/background.json"
+# Inverted index over the facts of every entity, loaded (or built) by the first fact search
+FACT_INDEX: Optional[FactIndex] = None
+MAX_FACT_RESULTS = 50
 
 def load_stats():
-    with open("./src/background_check_service/background.json") as f:
+    with start_span("background_check.load_stats"), open(BACKGROUND_FILE) as f:
         return json.load(f)
 
-def _get_stats(entity_name: str):
-    entity_name = entity_name.lower()
-    global BACKGROUND_STATS
+def build_risk_profiles(stats: dict) -> dict[str, LoanRiskProfile]:
+    """Builds the risk profile of every entity, including its base risk factor."""
+    return {
+        entity_name: LoanRiskProfile(
+            entity_name=entity_name,
+            war_risk=data["war_risk"],
+            reputation=data["reputation"],
+            base_risk_factor=base_risk_factor(data["war_risk"], data["reputation"]),
+        )
+        for entity_name, data in stats.items()
+    }
+
+def _ensure_loaded():
+    global BACKGROUND_STATS, RISK_PROFILES
     if BACKGROUND_STATS is None:    
         BACKGROUND_STATS = load_stats()
-    try:
-        data = BACKGROUND_STATS[entity_name]
-    except KeyError:
-        return LoanRiskProfile(entity_name=entity_name, war_risk=0.5, reputation=0.0)
-    return LoanRiskProfile(entity_name=entity_name, war_risk=data["war_risk"], reputation=data["reputation"])
+        RISK_PROFILES = build_risk_profiles(BACKGROUND_STATS)
+
+def _get_stats(entity_name: str):
+    entity_name = entity_name.lower()
+    _ensure_loaded()
+    with start_span("background_check.lookup", entity_name=entity_name):
+        profile = RISK_PROFILES.get(entity_name)
+        if profile is None:
+            return LoanRiskProfile(
+                entity_name=entity_name,
+                war_risk=UNKNOWN_WAR_RISK,
+                reputation=UNKNOWN_REPUTATION,
+                base_risk_factor=base_risk_factor(UNKNOWN_WAR_RISK, UNKNOWN_REPUTATION),
+            )
+        return profile
+
+def _get_fact_index() -> FactIndex:
+    global FACT_INDEX
+    _ensure_loaded()
+    if FACT_INDEX is None:
+        with start_span("background_check.load_fact_index"):
+            FACT_INDEX = load_or_build(BACKGROUND_FILE, BACKGROUND_STATS)
+    return FACT_INDEX
 
 @mcp.tool()
 async def do_background_check(entity_name: str) -> LoanRiskProfile:
@@ -53,11 +104,50 @@ def list_supported_entities() -> list[str]:
     Returns:
         A list of strings, where each string is a supported entity name.
     """
-    global BACKGROUND_STATS
-    if BACKGROUND_STATS is None:    
-        BACKGROUND_STATS = load_stats()
+    _ensure_loaded()
     return list(BACKGROUND_STATS.keys())
 
+@mcp.tool()
+def search_facts(query: str, entity_name: Optional[str] = None, top_k: int = 5) -> list[FactMatch]:
+    """
+    Searches the known facts about entities, best matches first.
+
+    Facts are ranked by how well their words match the query (BM25). Words are
+    matched whole and case-insensitively; common words like 'the' are ignored.
+
+    Args:
+        query: The words to search for, e.g. 'debts dragons'.
+        entity_name: Only search the facts of this entity.
+        top_k: The number of facts to return (at most 50).
+
+    Returns:
+        A list of FactMatch objects with the entity name, the fact and its score.
+    """
+    index = _get_fact_index()
+    top_k = max(1, min(top_k, MAX_FACT_RESULTS))
+    with start_span("background_check.search_facts", entity_name=entity_name or "", top_k=top_k):
+        matches = []
+        for fact_id, score in index.search(query, entity_name, top_k):
+            name, position = index.locate(fact_id)
+            matches.append(FactMatch(entity_name=name, fact=BACKGROUND_STATS[name]["facts"][position], score=round(score, 4)))
+    return matches
+
+# The streamable HTTP app, with trace context propagation, request latency metrics and the optional /metrics endpoint
+app = mcp.http_app(path="/mcp")
+app.add_middleware(TelemetryMiddleware, service_name="background_check_service")
+# Opt-in rate limits and concurrency cap on tool calls
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware, service_name="background_check_service")
+# Opt-in delays and errors, to test the deadlines, hedging and circuit breakers of the callers
+if FAULT_INJECTION_ENABLED:
+    app.add_middleware(FaultInjectionMiddleware, service_name="background_check_service")
+# Opt-in gzip/zstd compression of large responses, such as the entity list
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, service_name="background_check_service")
+# Opt-in admin routes with CPU profiles, task dumps, loop lag and allocation snapshots
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 if __name__ == "__main__":
-   mcp.run(transport="streamable-http", port=8002, host="0.0.0.0")
+   uvicorn.run(app, port=8002, host="0.0.0.0")
 
@@ -0,0 +1,186 @@
+import os
+import heapq
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from src.loan_service.ledger import PENDING_CHANGES_KEY, LoanEvent
+from src.loan_service.sharding import ShardRouter
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Change feed of the loan ledger.
+# Sequence numbers are the ledger event ids, so a subscriber can resume from any point:
+# recent changes come from an in-memory buffer, older ones from the ledger table.
+# Writers never wait on subscribers: each subscriber holds at most one pending
+# notification, and any changes committed meanwhile are coalesced into it.
+
+CHANGES_URI = "loans://changes"
+# Number of recent changes kept in memory for resuming subscribers.
+CHANGEFEED_BUFFER_SIZE = int(os.getenv("CHANGEFEED_BUFFER_SIZE", "10000"))
+CHANGEFEED_MAX_BATCH = 500
+
+subscribers_gauge = metrics.gauge("changefeed_subscribers", "Open change feed subscriptions.")
+notifications = metrics.counter("changefeed_notifications_total", "Change notifications sent to subscribers.")
+coalesced = metrics.counter("changefeed_coalesced_total", "Changes merged into an already pending notification.")
+
+
+class Subscriber:
+    """
+    One change feed subscription.
+
+    `notify` only sets a flag, so publishing never blocks; the sender task
+    delivers at most one notification at a time at the subscriber's own pace.
+    """
+
+    def __init__(self, send: Callable[[], Awaitable[None]], loop: asyncio.AbstractEventLoop):
+        self.send = send
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.pending = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        if self.pending.is_set():
+            coalesced.inc()
+        elif threading.get_ident() == self.loop_thread:
+            self.pending.set()
+        else:  # Writes committed from a worker thread
+            self.loop.call_soon_threadsafe(self.pending.set)
+
+    async def run(self, on_error: Callable[["Subscriber"], None]) -> None:
+        try:
+            while True:
+                await self.pending.wait()
+                self.pending.clear()
+                await self.send()
+                notifications.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # The client went away; drop the subscription.
+            logger.info(f"Dropping change feed subscriber: {error}")
+            on_error(self)
+
+
+class ChangeFeed:
+    """Publishes committed ledger events to subscribers and serves them by sequence number."""
+
+    def __init__(self, buffer_size: int = CHANGEFEED_BUFFER_SIZE):
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.subscribers: Dict[object, Subscriber] = {}
+        # Writes commit in worker threads, one per shard
+        self._lock = threading.Lock()
+
+    def publish(self, changes: List[dict]) -> None:
+        """Adds committed changes to the buffer, kept in sequence order, and flags every subscriber."""
+        if not changes:
+            return
+        with self._lock:
+            for change in sorted(changes, key=lambda change: change["seq"]):
+                if not self.buffer or self.buffer[-1]["seq"] < change["seq"]:
+                    self.buffer.append(change)
+                    continue
+                # Another thread published a later sequence number first: insert in order
+                index = len(self.buffer)
+                while index > 0 and self.buffer[index - 1]["seq"] > change["seq"]:
+                    index -= 1
+                if len(self.buffer) == self.buffer.maxlen:
+                    if index == 0:
+                        continue  # Older than everything kept; readers get it from the ledger
+                    self.buffer.popleft()
+                    index -= 1
+                self.buffer.insert(index, change)
+        for subscriber in list(self.subscribers.values()):
+            subscriber.notify()
+
+    def subscribe(self, key: object, send: Callable[[], Awaitable[None]]) -> Subscriber:
+        """
+        Registers a subscriber (one per key, e.g. per MCP session) and starts its sender task.
+
+        Args:
+            key: Identifies the subscription; subscribing again replaces it.
+            send: Coroutine function delivering one notification.
+        """
+        self.unsubscribe(key)
+        subscriber = Subscriber(send, asyncio.get_running_loop())
+        subscriber.task = asyncio.create_task(subscriber.run(lambda s: self._remove(key, s)))
+        self.subscribers[key] = subscriber
+        subscribers_gauge.set(len(self.subscribers))
+        return subscriber
+
+    def unsubscribe(self, key: object) -> None:
+        subscriber = self.subscribers.pop(key, None)
+        if subscriber is not None and subscriber.task is not None:
+            subscriber.task.cancel()
+        subscribers_gauge.set(len(self.subscribers))
+
+    def _remove(self, key: object, subscriber: Subscriber) -> None:
+        if self.subscribers.get(key) is subscriber:
+            del self.subscribers[key]
+            subscribers_gauge.set(len(self.subscribers))
+
+    async def read(self, router: ShardRouter, since: int, limit: int = CHANGEFEED_MAX_BATCH) -> List[dict]:
+        """
+        Returns up to `limit` changes with a sequence number above `since`, oldest first.
+
+        Served from memory when the buffer still covers `since`, otherwise from the ledger
+        of every shard, merged by sequence number.
+        """
+        limit = min(limit, CHANGEFEED_MAX_BATCH)
+        with self._lock:
+            buffer = list(self.buffer) if self.buffer and self.buffer[0]["seq"] <= since + 1 else None
+        if buffer is not None:
+            # Subscribers usually read close to the tail, so scan from the newest change back.
+            changes = []
+            for change in reversed(buffer):
+                if change["seq"] <= since:
+                    break
+                changes.append(change)
+            changes.reverse()
+            return changes[:limit]
+        query = select(LoanEvent).where(LoanEvent.id > since).order_by(LoanEvent.id).limit(limit)
+        per_shard = await router.fan_out(lambda db_session: db_session.exec(query).all())
+        events = itertools.islice(heapq.merge(*per_shard, key=lambda loan_event: loan_event.id), limit)
+        return [to_change(loan_event) for loan_event in events]
+
+    async def latest(self, router: ShardRouter) -> int:
+        """Returns the sequence number of the last committed change, 0 if there is none."""
+        if self.buffer:
+            return self.buffer[-1]["seq"]
+        query = select(LoanEvent.id).order_by(LoanEvent.id.desc()).limit(1)
+        per_shard = await router.fan_out(lambda db_session: db_session.exec(query).first() or 0)
+        return max(per_shard)
+
+
+def to_change(loan_event: LoanEvent) -> dict:
+    return {
+        "seq": loan_event.id,
+        "kind": loan_event.kind,
+        "name": loan_event.name,
+        "loan_id": loan_event.loan_id,
+        "amount": loan_event.amount,
+    }
+
+
+# The process-wide change feed.
+change_feed = ChangeFeed()
+
+
+# Changes are published once their transaction commits, and dropped if it rolls back.
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(db_session) -> None:
+    change_feed.publish(db_session.info.pop(PENDING_CHANGES_KEY, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(db_session) -> None:
+    db_session.info.pop(PENDING_CHANGES_KEY, None)
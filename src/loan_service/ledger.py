@@ -0,0 +1,136 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlmodel import Field, Session, SQLModel, select
+
+# Append-only ledger of loan events.
+# Every change to a loan appends a LoanEvent and updates the entity's EntityBalance snapshot
+# in the same transaction, so the current exposure is one primary-key read while the full
+# history stays available for audit, even for cancelled (deleted) loans.
+
+EVENT_CREATE = "create"
+EVENT_REPAY = "repay"
+EVENT_CLOSE = "close"
+EVENT_CANCEL = "cancel"
+
+# Session.info key collecting the events of the open transaction for the change feed.
+PENDING_CHANGES_KEY = "loan_changes"
+# Session.info key of the id allocator shared by all shards (see sharding.py); absent with a single database.
+ID_ALLOCATOR_KEY = "id_allocator"
+
+
+def allocate_id(db_session: Session, model: type) -> Optional[int]:
+    """
+    Returns the primary key for a new row of `model`.
+
+    With several shards, ids come from the allocator shared by all of them, so loan ids and
+    ledger sequence numbers stay unique across shards. With one database it returns None and
+    SQLite assigns the id.
+    """
+    allocator = db_session.info.get(ID_ALLOCATOR_KEY)
+    return allocator(model) if allocator is not None else None
+
+
+class LoanEvent(SQLModel, table=True):
+    """
+    One immutable entry of the loan ledger.
+
+    The id is assigned in commit order and doubles as the ledger sequence number.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True, description="Sequence number of the event")
+    loan_id: int = Field(index=True, description="ID of the loan")
+    name: str = Field(index=True, description="Name of the entity that holds the loan")
+    kind: str = Field(description="create, repay, close or cancel")
+    amount: float = Field(description="Dragons lent (create), repaid (repay) or written off (cancel)")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class EntityBalance(SQLModel, table=True):
+    """Incrementally maintained loan balance of an entity."""
+    name: str = Field(primary_key=True, description="Name of the entity")
+    nr_open_loans: int = 0
+    nr_closed_loans: int = 0
+    open_amount: float = Field(default=0.0, description="Outstanding Dragons over all open loans")
+    total_borrowed: float = 0.0
+    total_repaid: float = 0.0
+    last_event_id: Optional[int] = Field(default=None, description="Sequence number of the last applied event")
+
+
+def _apply(balance: EntityBalance, kind: str, amount: float, outstanding: float) -> None:
+    if kind == EVENT_CREATE:
+        balance.nr_open_loans += 1
+        balance.open_amount += amount
+        balance.total_borrowed += amount
+    elif kind == EVENT_REPAY:
+        balance.open_amount -= amount
+        balance.total_repaid += amount
+    elif kind == EVENT_CLOSE:
+        balance.nr_open_loans -= 1
+        balance.nr_closed_loans += 1
+    elif kind == EVENT_CANCEL:
+        balance.nr_open_loans -= 1
+        balance.open_amount -= outstanding
+    else:
+        raise ValueError(f"Unknown loan event: {kind}")
+
+
+def append_event(db_session: Session, loan_id: int, name: str, kind: str, amount: float, outstanding: float = 0.0) -> LoanEvent:
+    """
+    Appends an event and updates the entity's balance, without committing.
+
+    Args:
+        db_session: Active database session; the caller commits together with the loan change
+        loan_id: ID of the loan
+        name: Entity name (lowercase)
+        kind: EVENT_CREATE, EVENT_REPAY, EVENT_CLOSE or EVENT_CANCEL
+        amount: Dragons lent, repaid or written off
+        outstanding: For EVENT_CANCEL, the amount still owed on the cancelled loan
+
+    Returns:
+        LoanEvent: The event, with its sequence number assigned.
+    """
+    event = LoanEvent(id=allocate_id(db_session, LoanEvent), loan_id=loan_id, name=name, kind=kind, amount=amount)
+    db_session.add(event)
+    db_session.flush()  # Assigns the sequence number
+    # Collected for the change feed, which publishes them once the transaction commits
+    db_session.info.setdefault(PENDING_CHANGES_KEY, []).append(
+        {"seq": event.id, "kind": kind, "name": name, "loan_id": loan_id, "amount": amount}
+    )
+    balance = db_session.get(EntityBalance, name) or EntityBalance(name=name)
+    _apply(balance, kind, amount, outstanding)
+    balance.last_event_id = event.id
+    db_session.add(balance)
+    return event
+
+
+def get_balance(db_session: Session, name: str) -> EntityBalance:
+    """Returns the balance snapshot of an entity (all zero if it never had a loan)."""
+    return db_session.get(EntityBalance, name) or EntityBalance(name=name)
+
+
+def get_events(db_session: Session, name: str, limit: int = 100) -> List[LoanEvent]:
+    """Returns the most recent events of an entity, oldest first."""
+    events = db_session.exec(
+        select(LoanEvent).where(LoanEvent.name == name).order_by(LoanEvent.id.desc()).limit(limit)
+    ).all()
+    return list(reversed(events))
+
+
+def backfill(db_session: Session, loans: list) -> None:
+    """
+    Seeds the ledger from loans that predate it (one create event, plus a close
+    event for closed loans), so balances are correct on an existing database.
+    A closed loan that was not fully repaid was cancelled, and gets a cancel event instead,
+    which writes off what was still owed.
+    """
+    for loan in loans:
+        append_event(db_session, loan.id, loan.name, EVENT_CREATE, loan.amount)
+        if loan.repaid_amount:
+            append_event(db_session, loan.id, loan.name, EVENT_REPAY, loan.repaid_amount)
+        if not loan.loan_open:
+            outstanding = loan.amount - loan.repaid_amount
+            if outstanding > 0:
+                append_event(db_session, loan.id, loan.name, EVENT_CANCEL, outstanding, outstanding=outstanding)
+            else:
+                append_event(db_session, loan.id, loan.name, EVENT_CLOSE, 0.0)
+    db_session.commit()
@@ -1,23 +1,38 @@
-from typing import List, Optional, Any
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+from typing import Iterable, List, Optional, Any
+import json
+import os
+from sqlalchemy import func
+from sqlmodel import Field, Session, SQLModel, select
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 import mcp.types as types
 from mcp.server.lowlevel import Server
-from google.adk.tools.mcp_tool.conversion_utils import adk_to_mcp_tool_type
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Mount
 from starlette.types import Receive, Scope, Send
 import uvicorn
-from google.adk.tools.function_tool import FunctionTool
 from pydantic import BaseModel
+from src.loan_service.registry import ToolRegistry
+from src.loan_service import ledger
+from src.loan_service.changefeed import CHANGES_URI, change_feed
+from src.loan_service.write_queue import WriteQueue
+from src.loan_service.sharding import ShardRouter
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from urllib.parse import parse_qs, urlsplit
+from src.shared.telemetry import TelemetryMiddleware, setup_telemetry, start_span
+from src.shared.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from src.shared.admission import ADMISSION_CONTROL_ENABLED, AdmissionMiddleware
+from src.shared.resilience import FAULT_INJECTION_ENABLED, FaultInjectionMiddleware
+from src.shared.compression import COMPRESSION_ENABLED, CompressionMiddleware
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+setup_telemetry("loan_service")
+
 class LoanCancelConfimation(BaseModel):
     """
     Schema for collecting user confirmation when cancelling a loan.
@@ -66,7 +81,16 @@ class Loan(SQLModel, table=True):
 
 # Initialize the low-level MCP server
 # This gives us more control over request handling and streaming responses
-mcp_server = Server("loan-management-server")
+class LoanServer(Server):
+    """Low-level MCP server advertising resource subscriptions, which the change feed supports."""
+
+    def get_capabilities(self, notification_options, experimental_capabilities) -> types.ServerCapabilities:
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True  # The low-level server always advertises False
+        return capabilities
+
+mcp_server = LoanServer("loan-management-server")
 
 # Set up the StreamableHTTPSessionManager for handling Server-Sent Events (SSE)
 # json_response=False allows us to stream raw data instead of wrapping in JSON
@@ -77,25 +101,47 @@ session_manager = StreamableHTTPSessionManager(
 
 # --- Database Setup ---
 
-sqlite_file_name = "loans.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+sqlite_file_name = os.getenv("LOANS_DB_FILE", "loans.db")
+
+def setup_shard(db_session: Session) -> None:
+    """
+    Prepares a shard the first time its engine is created.
 
-# Initialize SQLite engine and create tables
-engine = create_engine(sqlite_url, echo=True)  # echo=True enables SQL logging
-SQLModel.metadata.create_all(engine)  # Create tables if they don't exist
+    Seeds the ledger once from loans created before it existed. The session allocates the
+    event ids over all shards, so they stay unique sequence numbers.
+    """
+    if db_session.exec(select(ledger.LoanEvent).limit(1)).first() is None:
+        ledger.backfill(db_session, db_session.exec(select(Loan)).all())
+
+# Loans are partitioned by entity name over LOANS_SHARDS SQLite files (one by default).
+# The shards' engines, and their DDL, are created on first use, which keeps connection
+# setup out of the import, so the server starts accepting connections sooner.
+# echo=True enables SQL logging; set LOANS_DB_ECHO=false to turn it off (e.g. under load)
+router = ShardRouter(
+    sqlite_file_name,
+    echo=os.getenv("LOANS_DB_ECHO", "true").lower() == "true",
+    on_create=setup_shard,
+)
 
-def create_db_session():
+def create_db_session(name: str):
     """
-    Creates a new database session using a context manager.
+    Creates a new database session on the shard holding an entity's loans,
+    to be used as a context manager.
     
     Using a context manager ensures the session is properly closed
-    even if an error occurs, preventing resource leaks.
+    even if an error occurs, preventing resource leaks: a session that is
+    used but never closed keeps its pooled connection checked out.
+
+    Args:
+        name: The entity the session reads or writes (case-insensitive)
     
     Returns:
         Session: A new SQLAlchemy session for database operations.
     """
-    with Session(engine) as db_session:
-        return db_session
+    return router.session_for(name)
+
+# Concurrent writes are committed together in one transaction per shard (group commit)
+write_queue = WriteQueue(router.session)
 
 
 # --- Database Operations ---
@@ -111,7 +157,8 @@ def do_get_loans_by_name(db_session: Session, name: str) -> List[Loan]:
     Returns:
         List[Loan]: All loans associated with the entity
     """
-    loans = db_session.exec(select(Loan).where(Loan.name == name.lower())).all()
+    with start_span("loan_service.db.select_loans_by_name"):
+        loans = db_session.exec(select(Loan).where(Loan.name == name.lower())).all()
     return loans
 
 # --- Server Lifecycle Management ---
@@ -134,21 +181,22 @@ async def server_lifespan(app: Server) -> AsyncIterator[None]:
     Yields:
         None: Control back to the server while it runs
     """
+    if router.nr_shards > 1:
+        # Ids are allocated over the shards in this process: refuse to start next to another one
+        router.claim()
     # Run the session manager for handling streaming connections
     async with session_manager.run():
         yield  # Server runs here
 
 # --- Core Business Logic ---
 
-def create_loan(name: str, amount: float, interest_rate_percent: float) -> int:
+async def create_loan(name: str, amount: float, interest_rate_percent: float) -> int:
     """
     Creates a new loan in the database.
 
-    This function demonstrates basic CRUD operations with SQLModel/SQLAlchemy:
-    1. Create a new Loan instance
-    2. Add it to the session
-    3. Commit the transaction
-    4. Refresh to get the generated ID
+    The insert goes through the write queue: loans created concurrently are
+    committed in one transaction, and each caller gets the ID of its own loan
+    (or its own error).
     
     Args:
         name: Entity name (converted to lowercase for consistency)
@@ -163,37 +211,68 @@ def create_loan(name: str, amount: float, interest_rate_percent: float) -> int:
         - repaid_amount = 0
         - loan_open = True
     """
-    loan = Loan(
-        name=name.lower(), 
-        amount=amount, 
-        interest_rate_percent=interest_rate_percent, 
-        repaid_amount=0, 
-        loan_open=True
-    )
-    db_session = create_db_session()
-    db_session.add(loan)
-    db_session.commit()
-    db_session.refresh(loan)
-    return loan.id
+    def insert(db_session: Session) -> int:
+        loan = Loan(
+            id=ledger.allocate_id(db_session, Loan),
+            name=name.lower(), 
+            amount=amount, 
+            interest_rate_percent=interest_rate_percent, 
+            repaid_amount=0, 
+            loan_open=True
+        )
+        db_session.add(loan)
+        db_session.flush()  # Assigns the loan ID
+        ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_CREATE, loan.amount)
+        return loan.id
 
-def get_all_loans() -> List[Loan]:
+    with start_span("loan_service.db.insert_loan"):
+        return await write_queue.submit(insert, shard=router.shard_of(name))
+
+async def get_all_loans() -> List[Loan]:
     """
     Retrieves all loans from the database.
 
     This function demonstrates a simple SELECT query using SQLModel.
-    Unlike get_loans_by_name, this has no filters and returns all records.
+    Unlike get_loans_by_name, this has no filters and returns all records:
+    every shard is queried concurrently and the results are merged.
     
     Returns:
-        List[Loan]: All loan records in the database.
+        List[Loan]: All loan records in the database, ordered by ID.
         Returns an empty list if no loans exist.
         
     Note:
         In a production system, you might want to add pagination
         to handle large numbers of loans efficiently.
     """
-    db_session = create_db_session()
-    loans = db_session.exec(select(Loan)).all()
-    return loans
+    with start_span("loan_service.db.select_all_loans", shards=router.nr_shards):
+        per_shard = await router.fan_out(lambda db_session: db_session.exec(select(Loan)).all())
+    return sorted((loan for loans in per_shard for loan in loans), key=lambda loan: loan.id)
+
+
+async def get_loan_book_summary() -> dict:
+    """
+    Summarizes the Bank's whole loan book, over all entities.
+
+    Adds up the ledger balances of every entity, read from all shards concurrently.
+
+    Returns:
+        dict: The number of entities that ever had a loan (nr_entities), the number
+              of open and closed loans, the outstanding amount in dragons (open_amount),
+              and the total borrowed and repaid amounts.
+    """
+    balance = ledger.EntityBalance
+    totals = select(
+        func.count(),
+        func.coalesce(func.sum(balance.nr_open_loans), 0),
+        func.coalesce(func.sum(balance.nr_closed_loans), 0),
+        func.coalesce(func.sum(balance.open_amount), 0.0),
+        func.coalesce(func.sum(balance.total_borrowed), 0.0),
+        func.coalesce(func.sum(balance.total_repaid), 0.0),
+    )
+    with start_span("loan_service.db.sum_balances", shards=router.nr_shards):
+        per_shard = await router.fan_out(lambda db_session: db_session.exec(totals).one())
+    keys = ["nr_entities", "nr_open_loans", "nr_closed_loans", "open_amount", "total_borrowed", "total_repaid"]
+    return {key: sum(row[index] for row in per_shard) for index, key in enumerate(keys)}
 
 
 def get_loans_by_name(name: str) -> List[Loan]:
@@ -216,11 +295,38 @@ def get_loans_by_name(name: str) -> List[Loan]:
         >>> for loan in loans:
         ...     print(f"Amount: {loan.amount} dragons")
     """
-    db_session = create_db_session()
-    loans = do_get_loans_by_name(db_session, name)
+    with create_db_session(name) as db_session:
+        loans = do_get_loans_by_name(db_session, name)
     return loans
 
 
+def get_loan_summary_by_name(name: str) -> dict:
+    """
+    Summarizes the loan history of a specific entity.
+
+    This returns just the counts needed for the interest rate calculation,
+    so callers don't have to parse the full list of loans. It reads the
+    entity's ledger balance, a single row, instead of scanning its loans.
+
+    Args:
+        name: The entity name to search for (e.g., 'stork', 'clannister')
+             Case-insensitive due to lowercase conversion
+
+    Returns:
+        dict: The entity name, the number of open loans (nr_open_loans),
+              the number of closed loans (nr_closed_loans) and the
+              outstanding amount in dragons (open_amount).
+    """
+    with create_db_session(name) as db_session:
+        balance = ledger.get_balance(db_session, name.lower())
+    return {
+        "name": name.lower(),
+        "nr_open_loans": balance.nr_open_loans,
+        "nr_closed_loans": balance.nr_closed_loans,
+        "open_amount": balance.open_amount,
+    }
+
+
 async def cancel_loan_with_elicitation(name: str) -> bool:
     """
     Cancels loans with user confirmation using MCP's elicitation feature.
@@ -250,8 +356,8 @@ async def cancel_loan_with_elicitation(name: str) -> bool:
         real-time interaction with the user.
     """
     # Get open loans for the entity
-    db_session = create_db_session()
-    loans = do_get_loans_by_name(db_session, name)
+    with create_db_session(name) as db_session:
+        loans = do_get_loans_by_name(db_session, name)
     open_loans = [loan for loan in loans if loan.loan_open]
     
     # If no open loans, nothing to cancel
@@ -271,10 +377,12 @@ async def cancel_loan_with_elicitation(name: str) -> bool:
     
     # Process the user's response
     if result.action == "accept":
-        # Delete all open loans in a single transaction
-        for loan in open_loans:
-            db_session.delete(loan)
-        db_session.commit()    
+        # Delete the confirmed loans in a single transaction; loans created since the prompt are kept
+        confirmed_ids = [loan.id for loan in open_loans]
+        with start_span("loan_service.db.delete_loans"):
+            await write_queue.submit(
+                lambda db_session: _cancel_open_loans(db_session, name, confirmed_ids), shard=router.shard_of(name)
+            )
         return True
     
     return False
@@ -297,21 +405,171 @@ async def cancel_loan_without_elicitation(name: str) -> bool:
         cancel_loan_with_elicitation but without the interactive
         confirmation step.
     """
-    db_session = create_db_session()
-    loans = do_get_loans_by_name(db_session, name)
-    open_loans = [loan for loan in loans if loan.loan_open]
-    
-    if len(open_loans) == 0:
-        return True
-        
+    with start_span("loan_service.db.delete_loans"):
+        await write_queue.submit(lambda db_session: _cancel_open_loans(db_session, name), shard=router.shard_of(name))
+    return True
+
+
+def _cancel_open_loans(db_session: Session, name: str, loan_ids: Optional[Iterable[int]] = None) -> int:
+    # Runs inside a write queue batch, so the loans are read again: with `loan_ids`, only those of
+    # them that are still open are cancelled; without, every loan open at the time of the write.
+    open_loans = [loan for loan in do_get_loans_by_name(db_session, name) if loan.loan_open]
+    if loan_ids is not None:
+        loan_ids = set(loan_ids)
+        open_loans = [loan for loan in open_loans if loan.id in loan_ids]
     for loan in open_loans:
+        _record_cancellation(db_session, loan)
         db_session.delete(loan)
-    db_session.commit()    
-    return True
+    return len(open_loans)
+
+
+def _record_cancellation(db_session: Session, loan: Loan) -> None:
+    # The loan row is deleted, but the ledger keeps the cancellation and the written-off amount.
+    outstanding = loan.amount - loan.repaid_amount
+    ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_CANCEL, outstanding, outstanding=outstanding)
+
+
+def _get_open_loan(db_session: Session, name: str, loan_id: int) -> Loan:
+    loan = db_session.get(Loan, loan_id)
+    if loan is None or loan.name != name.lower():
+        raise ValueError(f"Loan {loan_id} of {name} not found")
+    if not loan.loan_open:
+        raise ValueError(f"Loan {loan_id} of {name} is already closed")
+    return loan
+
+
+def _loan_status(loan: Loan) -> dict:
+    return {
+        "loan_id": loan.id,
+        "repaid_amount": loan.repaid_amount,
+        "outstanding_amount": loan.amount - loan.repaid_amount,
+        "loan_open": loan.loan_open,
+    }
+
+
+async def repay_loan(name: str, loan_id: int, amount: float) -> dict:
+    """
+    Records a repayment on an open loan.
+
+    The repayment is appended to the loan ledger and the entity's balance is
+    updated in the same transaction. A repayment of the full outstanding amount
+    closes the loan.
+
+    Args:
+        name: Entity that holds the loan
+        loan_id: ID of the loan
+        amount: Dragons repaid; must be positive and at most the outstanding amount
+
+    Returns:
+        dict: The loan ID, the total repaid amount, the outstanding amount and
+              whether the loan is still open.
+    """
+    if amount <= 0:
+        raise ValueError("The repaid amount must be positive")
+
+    def repay(db_session: Session) -> dict:
+        loan = _get_open_loan(db_session, name, loan_id)
+        outstanding = loan.amount - loan.repaid_amount
+        if amount > outstanding:
+            raise ValueError(f"The repayment exceeds the outstanding {outstanding} dragons")
+        loan.repaid_amount += amount
+        ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_REPAY, amount)
+        if loan.repaid_amount >= loan.amount:
+            loan.loan_open = False
+            ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_CLOSE, 0.0)
+        db_session.add(loan)
+        return _loan_status(loan)
+
+    with start_span("loan_service.db.repay_loan"):
+        return await write_queue.submit(repay, shard=router.shard_of(name))
+
+
+async def close_loan(name: str, loan_id: int) -> dict:
+    """
+    Settles the outstanding amount of an open loan and closes it.
+
+    Args:
+        name: Entity that holds the loan
+        loan_id: ID of the loan
+
+    Returns:
+        dict: The loan ID, the total repaid amount, the outstanding amount (0)
+              and whether the loan is still open (False).
+    """
+    def close(db_session: Session) -> dict:
+        loan = _get_open_loan(db_session, name, loan_id)
+        outstanding = loan.amount - loan.repaid_amount
+        if outstanding > 0:
+            loan.repaid_amount = loan.amount
+            ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_REPAY, outstanding)
+        loan.loan_open = False
+        ledger.append_event(db_session, loan.id, loan.name, ledger.EVENT_CLOSE, 0.0)
+        db_session.add(loan)
+        return _loan_status(loan)
+
+    with start_span("loan_service.db.close_loan"):
+        return await write_queue.submit(close, shard=router.shard_of(name))
+
+
+def get_entity_exposure(name: str) -> dict:
+    """
+    Returns the current exposure of the Bank to an entity.
+
+    This reads the entity's balance snapshot, maintained incrementally by the
+    ledger, so it costs one row lookup however many loans the entity had.
+
+    Args:
+        name: The entity name (case-insensitive)
+
+    Returns:
+        dict: The number of open and closed loans, the outstanding amount
+              (open_amount), the total borrowed and repaid amounts, and the
+              sequence number of the last ledger event.
+    """
+    with create_db_session(name) as db_session:
+        return ledger.get_balance(db_session, name.lower()).model_dump()
+
+
+def get_loan_history(name: str, limit: int = 100) -> list[dict]:
+    """
+    Returns the ledger events (create, repay, close, cancel) of an entity.
+
+    Cancelled loans are deleted from the loan table, but their events remain
+    in the ledger for audit.
+
+    Args:
+        name: The entity name (case-insensitive)
+        limit: Maximum number of events, the most recent ones are returned
+
+    Returns:
+        list[dict]: The events, oldest first, with their sequence number (id),
+                    loan ID, kind, amount and timestamp.
+    """
+    with create_db_session(name) as db_session:
+        return [event.model_dump(mode="json") for event in ledger.get_events(db_session, name.lower(), limit)]
+
+# --- Tool Registration ---
+
+# Every tool is registered once in the registry, which derives its input schema
+# from the function signature and its description from the docstring.
+# Adding a tool only needs a register call.
+registry = ToolRegistry()
+registry.register(create_loan)
+registry.register(get_loans_by_name)
+registry.register(get_loan_summary_by_name, serialize=json.dumps)
+registry.register(cancel_loan_with_elicitation)
+registry.register(cancel_loan_without_elicitation)
+registry.register(repay_loan, serialize=json.dumps)
+registry.register(close_loan, serialize=json.dumps)
+registry.register(get_entity_exposure, serialize=json.dumps)
+registry.register(get_loan_history, serialize=json.dumps)
+registry.register(get_loan_book_summary, serialize=json.dumps)
 
 # --- MCP Tool Handling ---
 
-@mcp_server.call_tool()
+# The registry validates arguments with a model compiled once per tool,
+# so the per-call JSON schema validation of the MCP server is turned off.
+@mcp_server.call_tool(validate_input=False)
 async def call_tool(
     name: str,
     arguments: dict
@@ -339,73 +597,15 @@ async def call_tool(
         list: List of MCP content types (Text, Image, or Embedded)
         
     Raises:
-        ValueError: If the requested tool doesn't exist
+        ValueError: If the requested tool doesn't exist or the arguments are invalid
         
     Note:
         All responses are wrapped in MCP content types to ensure
         proper protocol compliance and streaming support.
     """
-    # Route to appropriate tool and wrap response
-    if name == "cancel_loan_with_elicitation":
-        result = await cancel_loan_with_elicitation(arguments["name"])
-        return [types.TextContent(type="text", text=str(result))]
-    elif name == "cancel_loan_without_elicitation":
-        result = await cancel_loan_without_elicitation(arguments["name"])
-        return [types.TextContent(type="text", text=str(result))]
-    elif name == "create_loan":   
-       result = create_loan(arguments["name"], arguments["amount"], 
-                          arguments["interest_rate_percent"])
-       return [types.TextContent(type="text", text=str(result))]
-    elif name == "get_loans_by_name":
-        result = get_loans_by_name(arguments["name"])
-        return [types.TextContent(type="text", text=str(result))]
-    else:
-        raise ValueError(f"Tool not found: {name}")
-
-# --- Tool Registration ---
-
-# Convert our functions to MCP tools
-# The adk_to_mcp_tool_type converter handles:
-# 1. Function signature analysis
-# 2. Parameter validation
-# 3. Return type conversion
-# 4. OpenAPI schema generation
-
-cancel_loan_with_elicitation_tool = adk_to_mcp_tool_type(
-    FunctionTool(
-        func=cancel_loan_with_elicitation, 
-        require_confirmation=False 
-    )
-)
-
-cancel_loan_without_elicitation_tool = adk_to_mcp_tool_type(
-    FunctionTool(
-        func=cancel_loan_without_elicitation, 
-        require_confirmation=False
-    )
-)
-
-create_loan_tool = adk_to_mcp_tool_type(
-    FunctionTool(
-        func=create_loan, 
-        require_confirmation=False
-    )
-)
-
-get_loans_by_name_tool = adk_to_mcp_tool_type(
-    FunctionTool(
-        func=get_loans_by_name, 
-        require_confirmation=False
-    )
-)
-
-# List of all available tools
-tools = [
-    create_loan_tool,
-    get_loans_by_name_tool,
-    cancel_loan_with_elicitation_tool,
-    cancel_loan_without_elicitation_tool
-]
+    # Look up the tool in the registry and wrap the response, traced as one span per tool call
+    with start_span("loan_service.call_tool", tool=name):
+        return await registry.dispatch(name, arguments)
 
 @mcp_server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
@@ -421,16 +621,91 @@ async def handle_list_tools() -> list[types.Tool]:
     Returns:
         list[types.Tool]: List of available MCP tools and their metadata
     """
-    return tools
+    return registry.definitions()
+
+# --- Change Feed ---
+
+# Instead of polling get_loans_by_name, clients subscribe to the loans://changes resource.
+# Every committed ledger event (create, repay, close, cancel) triggers a resources/updated
+# notification; the client then reads loans://changes?since=<last seen seq> to fetch the
+# changes. Notifications are coalesced per subscriber, so slow clients never delay writers.
+
+@mcp_server.list_resources()
+async def handle_list_resources() -> list[types.Resource]:
+    """
+    Lists the change feed resource.
+
+    Returns:
+        list[types.Resource]: The loans://changes resource
+    """
+    return [
+        types.Resource(
+            uri=CHANGES_URI,
+            name="loan_changes",
+            description=("Committed loan changes (create, repay, close, cancel) in sequence order. "
+                         "Read loans://changes?since=<seq>&limit=<n> to resume after a sequence number "
+                         "(since=latest returns where the feed is now), and subscribe to be notified of new changes."),
+            mimeType="application/json",
+        )
+    ]
+
+def changes_query(uri) -> dict:
+    """Returns the query parameters of a loans://changes URI; raises ValueError for any other resource."""
+    parts = urlsplit(str(uri))
+    if f"{parts.scheme}://{parts.netloc}{parts.path}" != CHANGES_URI:
+        raise ValueError(f"Resource not found: {uri}")
+    return {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+@mcp_server.read_resource()
+async def handle_read_resource(uri) -> list[ReadResourceContents]:
+    """
+    Reads the changes after a sequence number.
+
+    Args:
+        uri: loans://changes, optionally with the `since` (default 0, or `latest` for only the
+             current sequence number) and `limit` query parameters
+
+    Returns:
+        list[ReadResourceContents]: JSON with the changes and `next_since`, the
+                                    sequence number to resume from
+    """
+    query = changes_query(uri)
+    if query.get("since") == "latest":
+        # Where a new subscriber starts: no changes, only the sequence number to resume from
+        latest = await change_feed.latest(router)
+        return [ReadResourceContents(content=json.dumps({"changes": [], "next_since": latest}), mime_type="application/json")]
+    since = int(query.get("since", "0"))
+    changes = await change_feed.read(router, since, int(query.get("limit", "500")))
+    next_since = changes[-1]["seq"] if changes else since
+    return [ReadResourceContents(content=json.dumps({"changes": changes, "next_since": next_since}), mime_type="application/json")]
+
+@mcp_server.subscribe_resource()
+async def handle_subscribe_resource(uri) -> None:
+    """Subscribes the calling MCP session to change notifications."""
+    changes_query(uri)
+    session = mcp_server.request_context.session
+    change_feed.subscribe(session, lambda: session.send_resource_updated(uri))
+
+@mcp_server.unsubscribe_resource()
+async def handle_unsubscribe_resource(uri) -> None:
+    """Ends the change notifications of the calling MCP session."""
+    changes_query(uri)
+    change_feed.unsubscribe(mcp_server.request_context.session)
 
 async def handle_streamable_http(scope: Scope, receive: Receive, send: Send) -> None:
     await session_manager.handle_request(scope, receive, send)
 
+# Opt-in rate limits and concurrency cap, so a runaway client cannot saturate SQLite writes
+mcp_app = AdmissionMiddleware(handle_streamable_http, service_name="loan_service") if ADMISSION_CONTROL_ENABLED else handle_streamable_http
+# Opt-in delays and errors, to test the deadlines, hedging and circuit breakers of the callers
+if FAULT_INJECTION_ENABLED:
+    mcp_app = FaultInjectionMiddleware(mcp_app, service_name="loan_service")
+
 # The ASGI interface definition
 starlette_app = Starlette(
         debug=True,
         routes=[
-            Mount("/mcp", app=handle_streamable_http),
+            Mount("/mcp", app=mcp_app),
         ],
         lifespan=server_lifespan,
     )
@@ -441,5 +716,16 @@ starlette_app = CORSMiddleware(
         allow_methods=["GET", "POST", "DELETE"],  # MCP streamable HTTP methods
     )
 
+# Trace context propagation, request latency metrics and the optional /metrics endpoint
+starlette_app = TelemetryMiddleware(starlette_app, service_name="loan_service")
+
+# Opt-in gzip/zstd compression of large responses, such as loan listings
+if COMPRESSION_ENABLED:
+    starlette_app = CompressionMiddleware(starlette_app, service_name="loan_service")
+
+# Opt-in admin routes with CPU profiles, task dumps, loop lag and allocation snapshots
+if PROFILING_ENABLED:
+    starlette_app = ProfilingMiddleware(starlette_app)
+
 if __name__ == "__main__":
     uvicorn.run(starlette_app, port=8003, host="0.0.0.0")
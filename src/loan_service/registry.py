@@ -0,0 +1,94 @@
+import inspect
+import functools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel, ValidationError
+
+from src.loan_service.schemas import arguments_model, function_to_mcp_tool
+
+# Table-driven MCP tool dispatch.
+# Every tool is registered once; its argument model and MCP definition are compiled
+# on first use and reused for every call and every tool discovery request.
+
+
+@dataclass
+class RegisteredTool:
+    """A tool function with everything needed to call it from MCP."""
+    name: str
+    func: Callable
+    serialize: Callable[[Any], str]
+    is_async: bool
+
+    @functools.cached_property
+    def arguments_model(self) -> type[BaseModel]:
+        return arguments_model(self.func)
+
+    @functools.cached_property
+    def definition(self) -> types.Tool:
+        return function_to_mcp_tool(self.func, self.arguments_model)
+
+
+class ToolRegistry:
+    """
+    Maps tool names to their implementations.
+
+    Adding a tool is one `register` call: the input schema comes from the function
+    signature, the description from its docstring, and `serialize` turns the result
+    into the text returned to the client.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._definitions: Optional[List[types.Tool]] = None
+
+    def register(self, func: Callable, serialize: Callable[[Any], str] = str) -> Callable:
+        """
+        Registers a tool function under its own name.
+
+        Args:
+            func (Callable): The sync or async tool function.
+            serialize (Callable): Converts the result to text (default `str`).
+
+        Returns:
+            Callable: The function, unchanged.
+        """
+        if func.__name__ in self._tools:
+            raise ValueError(f"Tool already registered: {func.__name__}")
+        self._tools[func.__name__] = RegisteredTool(
+            name=func.__name__, func=func, serialize=serialize, is_async=inspect.iscoroutinefunction(func)
+        )
+        self._definitions = None
+        return func
+
+    def definitions(self) -> List[types.Tool]:
+        """Returns the MCP definitions of all tools, built once and shared by every list_tools response."""
+        if self._definitions is None:
+            self._definitions = [tool.definition for tool in self._tools.values()]
+        return self._definitions
+
+    async def dispatch(self, name: str, arguments: Optional[dict]) -> List[types.TextContent]:
+        """
+        Validates the arguments and calls the tool.
+
+        Args:
+            name (str): The tool name.
+            arguments (dict | None): The raw arguments sent by the client.
+
+        Returns:
+            list[types.TextContent]: The serialized tool result.
+
+        Raises:
+            ValueError: If the tool doesn't exist or the arguments are invalid.
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            raise ValueError(f"Tool not found: {name}")
+        try:
+            validated = tool.arguments_model.model_validate(arguments or {})
+        except ValidationError as error:
+            raise ValueError(f"Invalid arguments for {name}: {error}") from error
+        kwargs = dict(validated)
+        result = await tool.func(**kwargs) if tool.is_async else tool.func(**kwargs)
+        return [types.TextContent(type="text", text=tool.serialize(result))]
@@ -0,0 +1,53 @@
+import inspect
+from typing import Callable, Optional
+
+import mcp.types as types
+from pydantic import BaseModel, create_model
+
+# Builds MCP tool definitions straight from the Python signatures of the tool functions.
+# This replaces the ADK FunctionTool conversion, so the Loan Service does not need to import google.adk.
+
+
+def _strip_titles(schema: dict) -> dict:
+    # Pydantic adds a title to the model and every property; MCP clients only need names, types and descriptions.
+    schema.pop("title", None)
+    for prop in schema.get("properties", {}).values():
+        prop.pop("title", None)
+    return schema
+
+
+def arguments_model(func: Callable) -> type[BaseModel]:
+    """
+    Builds a pydantic model validating the arguments of a function.
+
+    Args:
+        func (Callable): The function; every parameter must be type-annotated.
+
+    Returns:
+        type[BaseModel]: A model with one field per parameter.
+    """
+    fields = {
+        name: (parameter.annotation, ... if parameter.default is inspect.Parameter.empty else parameter.default)
+        for name, parameter in inspect.signature(func).parameters.items()
+    }
+    return create_model(f"{func.__name__}_arguments", **fields)
+
+
+def function_to_mcp_tool(func: Callable, model: Optional[type[BaseModel]] = None) -> types.Tool:
+    """
+    Converts a tool function to an MCP tool definition.
+
+    Args:
+        func (Callable): The function; its docstring becomes the tool description and its
+                         type-annotated parameters the input schema.
+        model (type[BaseModel] | None): The arguments model, if already built.
+
+    Returns:
+        types.Tool: The MCP tool definition.
+    """
+    model = model or arguments_model(func)
+    return types.Tool(
+        name=func.__name__,
+        description=inspect.getdoc(func),
+        inputSchema=_strip_titles(model.model_json_schema()),
+    )
@@ -0,0 +1,307 @@
+import os
+import asyncio
+import hashlib
+import argparse
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from sqlalchemy import Engine, event, func
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.loan_service.ledger import ID_ALLOCATOR_KEY
+
+try:
+    import fcntl
+except ImportError:  # Windows: the shards are not protected against a second process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Entity-hash sharding of the loan storage.
+# Every loan, ledger event and balance belongs to one entity, and every per-entity tool
+# names that entity, so the normalized entity name is the shard key: it is hashed to one
+# of LOANS_SHARDS SQLite files. Shard 0 is LOANS_DB_FILE itself, shard i is <stem>-<i>.db
+# next to it, so a single-shard deployment keeps its database unchanged.
+# Change LOANS_SHARDS only after moving the data with the rebalancing utility:
+#     python -m src.loan_service.sharding --from-shards 1 --to-shards 4
+LOANS_SHARDS = int(os.getenv("LOANS_SHARDS", "1"))
+
+T = TypeVar("T")
+
+
+def shard_for(name: str, nr_shards: int) -> int:
+    """
+    Returns the shard of an entity.
+
+    Uses jump consistent hashing on a stable digest of the lowercase name, so going from
+    N to M shards only moves the entities that must move (1 - N/M of them when growing).
+
+    Args:
+        name (str): The entity name (case-insensitive).
+        nr_shards (int): The number of shards.
+
+    Returns:
+        int: The shard index, in [0, nr_shards).
+    """
+    if nr_shards <= 1:
+        return 0
+    key = int.from_bytes(hashlib.blake2b(name.lower().encode(), digest_size=8).digest(), "little")
+    bucket, candidate = -1, 0
+    while candidate < nr_shards:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_file(db_file: str, shard: int) -> str:
+    """Returns the SQLite file of a shard: `db_file` for shard 0, `<stem>-<shard><ext>` for the others."""
+    if shard == 0:
+        return db_file
+    stem, ext = os.path.splitext(db_file)
+    return f"{stem}-{shard}{ext}"
+
+
+def use_explicit_transactions(engine: Engine) -> None:
+    """
+    Lets SQLAlchemy begin the transactions of a SQLite engine (the pysqlite recipe of SQLAlchemy).
+
+    pysqlite only emits BEGIN before an INSERT, UPDATE or DELETE, so a SAVEPOINT taken first
+    opens the transaction itself and its RELEASE commits. With the driver's own transaction
+    handling turned off and BEGIN emitted when a session starts, savepoints nest in the
+    session's transaction and only its COMMIT makes the writes durable.
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+class IdAllocator:
+    """
+    Hands out primary keys that are unique across all shards.
+
+    Each model's counter starts after the highest id found in any shard on first use.
+    The counters live in this process, so the first allocation claims the shards for it with an
+    exclusive lock on `lock_path`: a second Loan Service process (e.g. another uvicorn worker)
+    writing the same shards is refused instead of handing out the same ids.
+    """
+
+    def __init__(self, engines: List[Engine], lock_path: str):
+        self.engines = engines
+        self.lock_path = lock_path
+        self._counters: Dict[type, itertools.count] = {}
+        self._lock = threading.Lock()
+        self._lock_file = None
+
+    def claim(self) -> None:
+        """
+        Takes the lock of the shards, once per process.
+
+        Raises:
+            RuntimeError: If another process holds it.
+        """
+        with self._lock:
+            self._claim()
+
+    def _claim(self) -> None:
+        if self._lock_file is not None or fcntl is None:
+            return
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"The shards of {self.lock_path[:-len('.lock')]} are used by another process; "
+                "with LOANS_SHARDS above 1, run the Loan Service as a single process"
+            )
+        self._lock_file = lock_file
+
+    def __call__(self, model: type) -> int:
+        counter = self._counters.get(model)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.get(model)
+                if counter is None:
+                    self._claim()
+                    highest = 0
+                    for engine in self.engines:
+                        with Session(engine) as db_session:
+                            highest = max(highest, db_session.exec(select(func.max(model.id))).one() or 0)
+                    counter = self._counters[model] = itertools.count(highest + 1)
+        return next(counter)
+
+
+class ShardRouter:
+    """
+    Routes loan storage to the shard of each entity.
+
+    The engines of all shards, and their tables, are created together on first use, then
+    `on_create` sets up each shard with a session that allocates ids like any other.
+    Per-entity work opens a session on one shard (`session_for`); queries over all entities
+    run on every shard concurrently (`fan_out`) and the caller merges the results.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        nr_shards: int = LOANS_SHARDS,
+        echo: bool = False,
+        on_create: Optional[Callable[[Session], None]] = None,
+    ):
+        if nr_shards < 1:
+            raise ValueError("LOANS_SHARDS must be at least 1")
+        self.db_file = db_file
+        self.nr_shards = nr_shards
+        self.echo = echo
+        self.on_create = on_create
+        self._engines: Dict[int, Engine] = {}
+        self._allocator: Optional[IdAllocator] = None
+        self._lock = threading.Lock()
+
+    def shard_of(self, name: str) -> int:
+        """Returns the shard holding an entity's loans."""
+        return shard_for(name, self.nr_shards)
+
+    def engine(self, shard: int) -> Engine:
+        """Returns the engine of a shard, creating the engines and tables of all shards on first use."""
+        engine = self._engines.get(shard)
+        if engine is None:
+            with self._lock:
+                if not self._engines:
+                    self._open()
+            engine = self._engines[shard]
+        return engine
+
+    def _open(self) -> None:
+        # Rows written while setting up a shard need ids from the allocator over all shards,
+        # so every engine exists before the first shard is set up.
+        engines = {}
+        for shard in range(self.nr_shards):
+            engine = create_engine(f"sqlite:///{shard_file(self.db_file, shard)}", echo=self.echo)
+            use_explicit_transactions(engine)  # The write queue relies on nested savepoints
+            SQLModel.metadata.create_all(engine)  # Create tables if they don't exist
+            engines[shard] = engine
+        if self.nr_shards > 1:
+            self._allocator = IdAllocator(list(engines.values()), f"{self.db_file}.lock")
+        if self.on_create is not None:
+            for engine in engines.values():
+                with self._session(engine) as db_session:
+                    self.on_create(db_session)
+        self._engines = engines
+
+    def _session(self, engine: Engine) -> Session:
+        if self._allocator is None:
+            return Session(engine)
+        return Session(engine, info={ID_ALLOCATOR_KEY: self._allocator})
+
+    def session(self, shard: int = 0) -> Session:
+        """Creates a session on a shard; use it as a context manager so its connection is returned."""
+        return self._session(self.engine(shard))
+
+    def claim(self) -> None:
+        """
+        Claims the shards for this process when ids are allocated over several shards.
+
+        Raises:
+            RuntimeError: If another process writes the same shards.
+        """
+        self.engine(0)
+        if self._allocator is not None:
+            self._allocator.claim()
+
+    def session_for(self, name: str) -> Session:
+        """Creates a session on the shard of an entity."""
+        return self.session(self.shard_of(name))
+
+    async def fan_out(self, query: Callable[[Session], T]) -> List[T]:
+        """
+        Runs a read on every shard and returns the per-shard results, in shard order.
+
+        With several shards the reads run concurrently in worker threads (SQLite releases
+        the GIL while it reads); a single shard is read inline.
+        """
+        def run(shard: int) -> T:
+            with self.session(shard) as db_session:
+                return query(db_session)
+
+        if self.nr_shards == 1:
+            return [run(0)]
+        return list(await asyncio.gather(*(asyncio.to_thread(run, shard) for shard in range(self.nr_shards))))
+
+
+def rebalance(db_file: str, from_shards: int, to_shards: int, chunk_size: int = 500) -> Dict[int, int]:
+    """
+    Moves every entity to its shard under a new shard count.
+
+    Copies all rows of the entity (every table with a `name` column: loans, ledger events
+    and the balance) into the target shard, keeping their ids, commits, and only then deletes
+    them from the source shard. An interrupted run can simply be started again. Run it while
+    the Loan Service is stopped, then restart the service with LOANS_SHARDS=<to_shards>.
+
+    Args:
+        db_file (str): LOANS_DB_FILE, the file of shard 0.
+        from_shards (int): The shard count the data is currently stored with.
+        to_shards (int): The new shard count.
+        chunk_size (int): Entities moved per transaction.
+
+    Returns:
+        dict: The number of entities moved into each target shard.
+    """
+    tables = [table for table in SQLModel.metadata.sorted_tables if "name" in table.c]
+    source_router, target = ShardRouter(db_file, from_shards), ShardRouter(db_file, to_shards)
+    moved: Dict[int, int] = defaultdict(int)
+    for shard in range(from_shards):
+        if not os.path.exists(shard_file(db_file, shard)):
+            continue
+        source = source_router.engine(shard)
+        with source.connect() as connection:
+            names = set()
+            for table in tables:
+                names.update(connection.execute(select(table.c.name).distinct()).scalars())
+        by_target = defaultdict(list)
+        for name in names:
+            destination = shard_for(name, to_shards)
+            if destination != shard:
+                by_target[destination].append(name)
+        for destination, entity_names in sorted(by_target.items()):
+            for start in range(0, len(entity_names), chunk_size):
+                chunk = entity_names[start:start + chunk_size]
+                with source.connect() as source_connection, target.engine(destination).begin() as target_connection:
+                    for table in tables:
+                        rows = source_connection.execute(select(table).where(table.c.name.in_(chunk))).mappings().all()
+                        if rows:
+                            target_connection.execute(table.insert().prefix_with("OR REPLACE"), [dict(row) for row in rows])
+                with source.begin() as source_connection:
+                    for table in tables:
+                        source_connection.execute(table.delete().where(table.c.name.in_(chunk)))
+            moved[destination] += len(entity_names)
+            logger.info(f"Moved {len(entity_names)} entities from shard {shard} to shard {destination}")
+    for shard in range(to_shards, from_shards):
+        logger.info(f"Shard {shard} is no longer used and can be removed: {shard_file(db_file, shard)}")
+    return dict(moved)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Moves the Loan Service data to a new number of shards.")
+    parser.add_argument("--db-file", default=os.getenv("LOANS_DB_FILE", "loans.db"), help="LOANS_DB_FILE, the file of shard 0")
+    parser.add_argument("--from-shards", type=int, default=LOANS_SHARDS)
+    parser.add_argument("--to-shards", type=int, required=True)
+    args = parser.parse_args()
+
+    import src.loan_service.main  # noqa: F401 Registers the loan table
+
+    moved = rebalance(args.db_file, args.from_shards, args.to_shards)
+    print(f"Moved {sum(moved.values())} entities: {dict(sorted(moved.items()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from src.loan_service.changefeed import change_feed
+from src.loan_service.ledger import PENDING_CHANGES_KEY
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Group commit of loan writes.
+# Writes submitted while a commit is in flight (or within the configured delay) are applied in one
+# transaction and committed together. SQLite then pays one commit per batch instead of one per write,
+# while every caller still gets its own result or error: if a write fails, the batch is applied
+# again with each write in its own savepoint.
+# With several shards, a batch holds one transaction per shard, committed concurrently; its
+# changes are published to the change feed only once every shard committed, in sequence order,
+# so a subscriber never sees a later sequence number before an earlier one.
+WRITE_QUEUE_ENABLED = os.getenv("LOANS_WRITE_QUEUE_ENABLED", "true").lower() == "true"
+# How long the first write of a batch may wait for others to join it (0 batches only what queued up during the previous commit).
+WRITE_BATCH_MAX_DELAY_MS = float(os.getenv("LOANS_WRITE_BATCH_MAX_DELAY_MS", "0"))
+WRITE_BATCH_MAX_SIZE = int(os.getenv("LOANS_WRITE_BATCH_MAX_SIZE", "128"))
+
+batch_size = metrics.histogram("loan_write_batch_size", "Writes committed per transaction.")
+commit_latency = metrics.histogram("loan_write_commit_seconds", "Time to apply and commit one batch of writes.")
+queue_wait = metrics.histogram("loan_write_queue_wait_seconds", "Time a write waited before its batch started.")
+
+# A write: runs against the batch's session without committing and returns a plain value (not an ORM object).
+# It may run twice if another write of its batch fails, so it must only touch the database.
+WriteOp = Callable[[Session], Any]
+
+
+class WriteQueue:
+    """
+    Coalesces concurrent writes into shared transactions.
+
+    Batches are applied one at a time in worker threads (one per shard), so the event
+    loop keeps serving requests while SQLite commits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[int], Session],
+        max_delay_seconds: float = WRITE_BATCH_MAX_DELAY_MS / 1000,
+        max_batch: int = WRITE_BATCH_MAX_SIZE,
+        enabled: bool = WRITE_QUEUE_ENABLED,
+    ):
+        self.session_factory = session_factory
+        self.max_delay_seconds = max_delay_seconds
+        self.max_batch = max_batch
+        self.enabled = enabled
+        self._pending: List[Tuple[WriteOp, int, asyncio.Future, float]] = []
+        self._full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def submit(self, op: WriteOp, shard: int = 0) -> Any:
+        """
+        Applies a write in the next batch and returns its result once the batch committed.
+
+        Args:
+            op (WriteOp): The write.
+            shard (int): The shard the write belongs to (see sharding.py).
+
+        Raises:
+            Exception: Whatever the write raised (only its own savepoint is rolled back),
+                       or the commit error, which fails the whole batch.
+        """
+        if not self.enabled:
+            results, changes = self._commit(shard, [op])
+            change_feed.publish(changes)
+            ok, value = results[0]
+            if not ok:
+                raise value
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, shard, future, time.perf_counter()))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        elif len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            if self.max_delay_seconds > 0 and len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            started = time.perf_counter()
+            by_shard: Dict[int, List[int]] = defaultdict(list)
+            for index, (_, shard, _, submitted) in enumerate(batch):
+                queue_wait.observe(started - submitted)
+                by_shard[shard].append(index)
+            results: List[Tuple[bool, Any]] = [None] * len(batch)
+            changes = []
+            committed = await asyncio.gather(
+                *(asyncio.to_thread(self._commit, shard, [batch[index][0] for index in indexes])
+                  for shard, indexes in by_shard.items()),
+                return_exceptions=True,
+            )
+            for indexes, outcome in zip(by_shard.values(), committed):
+                if isinstance(outcome, BaseException):
+                    outcome = ([(False, outcome)] * len(indexes), [])
+                for index, result in zip(indexes, outcome[0]):
+                    results[index] = result
+                changes.extend(outcome[1])
+            change_feed.publish(sorted(changes, key=lambda change: change["seq"]))
+            commit_latency.observe(time.perf_counter() - started)
+            batch_size.observe(len(batch))
+            for (_, _, future, _), (ok, value) in zip(batch, results):
+                if future.done():  # The caller went away
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _commit(self, shard: int, ops: List[WriteOp]) -> Tuple[List[Tuple[bool, Any]], List[dict]]:
+        # Optimistically apply the batch without savepoints; only if a write fails is the
+        # batch rolled back and applied again with one savepoint per write.
+        # Returns the result of every write and the committed changes, to be published by the caller.
+        try:
+            return self._apply(shard, ops, isolate=False)
+        except _WriteFailed:
+            return self._apply(shard, ops, isolate=True)
+
+    def _apply(self, shard: int, ops: List[WriteOp], isolate: bool) -> Tuple[List[Tuple[bool, Any]], List[dict]]:
+        results = []
+        with self.session_factory(shard) as db_session:
+            for op in ops:
+                if not isolate:
+                    try:
+                        results.append((True, op(db_session)))
+                    except Exception as error:
+                        db_session.rollback()
+                        raise _WriteFailed() from error
+                    continue
+                pending = len(db_session.info.get(PENDING_CHANGES_KEY, []))
+                try:
+                    with db_session.begin_nested():
+                        results.append((True, op(db_session)))
+                except Exception as error:
+                    # Only this write is rolled back; its ledger events must not reach the change feed.
+                    del db_session.info.get(PENDING_CHANGES_KEY, [])[pending:]
+                    results.append((False, error))
+            # Taken before the commit, so the after_commit hook of the change feed does not publish them early
+            changes = db_session.info.pop(PENDING_CHANGES_KEY, [])
+            try:
+                db_session.commit()
+            except Exception as error:
+                logger.exception(f"Group commit of {len(ops)} writes failed")
+                return [(False, error)] * len(ops), []
+        return results, changes
+
+
+class _WriteFailed(Exception):
+    """A write of an optimistic batch failed; the batch is applied again with savepoints."""
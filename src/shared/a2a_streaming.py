@@ -0,0 +1,4 @@
+# Message metadata flag of A2A callers that want the partial model text as `working` task status
+# updates: set by the Metal Bank's streaming relay on `message/stream` requests and read by the
+# Men Without Phases agent executor.
+STREAM_PARTIALS_METADATA_KEY = "stream_partials"
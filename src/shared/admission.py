@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Admission control is opt-in: set ADMISSION_CONTROL_ENABLED=true to install it on the MCP services.
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "false").lower() == "true"
+# Token bucket per client over all JSON-RPC POST requests (0 disables it).
+RATE_LIMIT_CLIENT_RPS = float(os.getenv("RATE_LIMIT_CLIENT_RPS", "20"))
+RATE_LIMIT_CLIENT_BURST = float(os.getenv("RATE_LIMIT_CLIENT_BURST", "40"))
+# Token buckets per tool, shared by all clients: "tool=rate[:burst],...", e.g. "create_loan=5:10".
+RATE_LIMIT_TOOLS = os.getenv("RATE_LIMIT_TOOLS", "")
+# Tool calls served at the same time; further calls wait in a bounded queue (0 disables the cap).
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+# Header identifying the client; falls back to the MCP session id, then to the client address.
+ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "x-client-id").lower()
+
+# Number of client buckets kept; the least recently seen clients are forgotten first.
+MAX_TRACKED_CLIENTS = 10000
+
+rejections = metrics.counter("admission_rejections_total", "Requests rejected by admission control, by service and reason.")
+queue_depth = metrics.gauge("admission_queue_depth", "Tool calls waiting for a concurrency slot, by service.")
+in_flight = metrics.gauge("admission_in_flight", "Tool calls being served, by service.")
+queue_wait = metrics.histogram("admission_queue_wait_seconds", "Time tool calls waited for a concurrency slot, by service.")
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each admitted request takes one token."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 if the request is admitted, otherwise the seconds until a token is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        """Gives back a token taken for a request that was rejected afterwards."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+def parse_tool_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parses RATE_LIMIT_TOOLS ("tool=rate[:burst],...") into tool name to (rate, burst).
+
+    Raises:
+        ValueError: If a rate is not positive or a burst is below 1, which would never admit a call.
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        tool, _, limit = item.partition("=")
+        rate, _, burst = limit.partition(":")
+        rate, burst = float(rate), float(burst or rate)
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid RATE_LIMIT_TOOLS entry '{item}': the rate must be positive and the burst at least 1")
+        limits[tool.strip()] = (rate, burst)
+    return limits
+
+
+class ConcurrencyLimiter:
+    """
+    Caps concurrent work; callers beyond the cap wait in a bounded queue or are rejected right away.
+
+    `on_waiting` is called with the number of waiting callers whenever a caller starts or stops waiting.
+    """
+
+    def __init__(self, limit: int, max_queue: int, timeout: float, on_waiting: Optional[Callable[[int], None]] = None):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.on_waiting = on_waiting
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Waits for a slot.
+
+        Returns:
+            str | None: None once a slot is held, otherwise the rejection reason ("queue_full" or "queue_timeout").
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()  # A free slot is taken without suspending
+        elif self.waiting >= self.max_queue:
+            return "queue_full"
+        else:
+            self._set_waiting(self.waiting + 1)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self._set_waiting(self.waiting - 1)
+        self.active += 1
+        return None
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def _set_waiting(self, waiting: int) -> None:
+        self.waiting = waiting
+        if self.on_waiting is not None:
+            self.on_waiting(waiting)
+
+
+def _tool_calls(body: bytes) -> List[str]:
+    # Names of the tools called by a JSON-RPC message or batch.
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return []
+    messages = message if isinstance(message, list) else [message]
+    return [
+        (item.get("params") or {}).get("name", "")
+        for item in messages
+        if isinstance(item, dict) and item.get("method") == "tools/call"
+    ]
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware protecting an MCP server from runaway clients.
+
+    Every JSON-RPC POST takes a token from its client's bucket; tool calls also take a
+    token from the bucket of the tool (RATE_LIMIT_TOOLS) and a concurrency slot. Over
+    the limit, requests are rejected at once with 429 (rate limited) or 503 (queue full
+    or queue timeout) instead of piling up on SQLite or the event loop. Long-lived GET
+    streams, and JSON-RPC responses such as elicitation answers, are never queued.
+    """
+
+    def __init__(self, app, service_name: str):
+        self.app = app
+        self.service_name = service_name
+        self.tool_limits = parse_tool_limits(RATE_LIMIT_TOOLS)
+        self.tool_buckets = {tool: TokenBucket(rate, burst) for tool, (rate, burst) in self.tool_limits.items()}
+        self.client_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.limiter = (
+            ConcurrencyLimiter(
+                ADMISSION_MAX_CONCURRENT,
+                ADMISSION_MAX_QUEUE,
+                ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                on_waiting=lambda waiting: queue_depth.set(waiting, service=service_name),
+            )
+            if ADMISSION_MAX_CONCURRENT > 0 else None
+        )
+
+    def _client_id(self, scope) -> str:
+        headers = dict(scope["headers"])
+        client = headers.get(ADMISSION_CLIENT_HEADER.encode()) or headers.get(b"mcp-session-id")
+        if client:
+            return client.decode()
+        return scope["client"][0] if scope.get("client") else "unknown"
+
+    def _client_bucket(self, client_id: str) -> TokenBucket:
+        bucket = self.client_buckets.get(client_id)
+        if bucket is None:
+            bucket = self.client_buckets[client_id] = TokenBucket(RATE_LIMIT_CLIENT_RPS, RATE_LIMIT_CLIENT_BURST)
+            if len(self.client_buckets) > MAX_TRACKED_CLIENTS:
+                self.client_buckets.popitem(last=False)
+        else:
+            self.client_buckets.move_to_end(client_id)
+        return bucket
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        if RATE_LIMIT_CLIENT_RPS > 0:
+            retry_after = self._client_bucket(self._client_id(scope)).try_acquire()
+            if retry_after:
+                return await self._reject(send, 429, "client_rate_limited", retry_after)
+
+        # Buffer the body to find the called tools, then replay it to the app.
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        tools = _tool_calls(body)
+        if not tools:
+            return await self.app(scope, replay_receive, send)
+
+        taken: List[TokenBucket] = []
+        for tool in tools:
+            bucket = self.tool_buckets.get(tool)
+            retry_after = bucket.try_acquire() if bucket else 0.0
+            if retry_after:
+                # The batch is rejected as a whole: the other tools did not use their tokens
+                for earlier in taken:
+                    earlier.refund()
+                return await self._reject(send, 429, "tool_rate_limited", retry_after, tool=tool)
+            if bucket:
+                taken.append(bucket)
+
+        if self.limiter is None:
+            return await self.app(scope, replay_receive, send)
+
+        start = time.perf_counter()
+        reason = await self.limiter.acquire()
+        if reason:
+            return await self._reject(send, 503, reason, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+        queue_wait.observe(time.perf_counter() - start, service=self.service_name)
+        in_flight.set(self.limiter.active, service=self.service_name)
+        try:
+            await self.app(scope, replay_receive, send)
+        finally:
+            self.limiter.release()
+            in_flight.set(self.limiter.active, service=self.service_name)
+
+    async def _reject(self, send, status: int, reason: str, retry_after: float, **labels) -> None:
+        rejections.inc(service=self.service_name, reason=reason, **labels)
+        logger.warning(f"{self.service_name} rejected a request: {reason} {labels or ''}")
+        body = json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32000, "message": f"Request rejected: {reason}"}}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, round(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
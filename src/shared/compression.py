@@ -0,0 +1,329 @@
+import io
+import os
+import zlib
+import logging
+from typing import List, Optional
+
+import httpx
+
+from src.shared import metrics
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Negotiated HTTP compression between the services.
+# With COMPRESSION_ENABLED=true, the MCP services and the Men Without Phases agent compress responses
+# of at least COMPRESSION_MIN_SIZE bytes with the first encoding of COMPRESSION_ENCODINGS the client
+# accepts (zstd needs the `zstandard` package), and accept gzip or zstd compressed request bodies.
+# Event streams are compressed event by event with a sync flush, so every event still arrives at once.
+# httpx decodes compressed responses by itself, so clients only need `compressing_client` to also
+# compress what they send (the conversation history sent to the remote agent).
+# Turn it on for all services together: a service without it cannot read a compressed request.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "false").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "zstd,gzip").split(",") if encoding.strip()
+]
+# Largest request body accepted, compressed or decompressed; larger ones are refused with 413,
+# so a small compressed body cannot expand into gigabytes (a decompression bomb).
+COMPRESSION_MAX_REQUEST_SIZE = int(os.getenv("COMPRESSION_MAX_REQUEST_SIZE", str(10 * 1024 * 1024)))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+# Requests are compressed with gzip, which every service with compression can read.
+REQUEST_ENCODING = "gzip"
+
+compressed_bytes = metrics.counter(
+    "http_compression_bytes_total", "Bytes of compressed HTTP bodies before and after compression, by service, direction and stage."
+)
+
+
+def supported_encodings() -> List[str]:
+    """Returns the encodings of COMPRESSION_ENCODINGS this process can produce, in order of preference."""
+    return [encoding for encoding in COMPRESSION_ENCODINGS if encoding == "gzip" or (encoding == "zstd" and zstandard is not None)]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the response encoding for an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The header value, e.g. "gzip, deflate, zstd;q=0.9".
+
+    Returns:
+        str | None: The preferred supported encoding the client accepts, or None.
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        token, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip())
+    for encoding in supported_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+# Idle zstd contexts: creating one costs more than compressing a small response.
+# A context serves one response at a time and goes back here when it is finished.
+_zstd_contexts: list = []
+
+
+class Compressor:
+    """Incremental gzip or zstd compressor; `flush=True` makes everything compressed so far decodable."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._context = None
+        if encoding == "zstd":
+            self._context = _zstd_contexts.pop() if _zstd_contexts else zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            self._compressor = self._context.compressobj()
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        output = self._compressor.compress(data)
+        if flush:
+            mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK if self.encoding == "zstd" else zlib.Z_SYNC_FLUSH
+            output += self._compressor.flush(mode)
+        return output
+
+    def finish(self) -> bytes:
+        output = self._compressor.flush()
+        if self._context is not None:
+            _zstd_contexts.append(self._context)
+            self._context = None
+        return output
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses a whole body."""
+    compressor = Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+# Output read per step when decompressing a zstd body.
+_ZSTD_READ_SIZE = 64 * 1024
+
+
+class BodyTooLarge(ValueError):
+    """A body is, or decompresses to, more than the allowed size."""
+
+
+def decompress(data: bytes, encoding: str, max_size: int = COMPRESSION_MAX_REQUEST_SIZE) -> bytes:
+    """
+    Decompresses a whole gzip or zstd body.
+
+    The output is produced in bounded steps and decompression stops as soon as it exceeds
+    `max_size` bytes, whatever the body claims about its size.
+
+    Raises:
+        BodyTooLarge: If the body decompresses to more than `max_size` bytes.
+        ValueError: If the encoding is not supported or the body is corrupt.
+    """
+    output = bytearray()
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd is not supported: the zstandard package is not installed")
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+            while chunk := reader.read(min(_ZSTD_READ_SIZE, max_size + 1 - len(output))):
+                output += chunk
+                if len(output) > max_size:
+                    raise BodyTooLarge(f"Request body decompresses to more than {max_size} bytes")
+        return bytes(output)
+    if encoding not in ("gzip", "x-gzip"):
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    while data:
+        # One decompressor per gzip member, like gzip.decompress
+        decompressor = zlib.decompressobj(31)
+        pending = data
+        while pending:
+            output += decompressor.decompress(pending, max_size + 1 - len(output))
+            if len(output) > max_size:
+                raise BodyTooLarge(f"Request body decompresses to more than {max_size} bytes")
+            pending = decompressor.unconsumed_tail
+        if not decompressor.eof:
+            raise ValueError("Compressed request body ended before the end of the gzip stream")
+        data = decompressor.unused_data
+    return bytes(output)
+
+
+def _header(headers: list, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses and decompressing request bodies.
+
+    Responses are compressed when the client accepts a supported encoding and the body reaches
+    `min_size` bytes; smaller ones are sent unchanged. For event streams the decision is made on
+    the first event, and each event is flushed as it is sent.
+    """
+
+    def __init__(self, app, service_name: str, min_size: int = COMPRESSION_MIN_SIZE, max_request_size: int = COMPRESSION_MAX_REQUEST_SIZE):
+        self.app = app
+        self.service_name = service_name
+        self.min_size = min_size
+        self.max_request_size = max_request_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_encoding = _header(scope["headers"], b"content-encoding")
+        if request_encoding and request_encoding.lower() != "identity":
+            scope, receive = await self._decoded_request(scope, receive, send, request_encoding.lower())
+            if receive is None:
+                return
+
+        encoding = negotiate(_header(scope["headers"], b"accept-encoding") or "")
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor: Optional[Compressor] = None
+        streaming = False
+        pending: List[bytes] = []
+        pending_size = 0
+        passthrough = False
+
+        async def send_start(compressed: bool) -> None:
+            headers = [(key, value) for key, value in start["headers"] if not (compressed and key.lower() == b"content-length")]
+            if compressed:
+                headers += [(b"content-encoding", encoding.encode()), (b"vary", b"Accept-Encoding")]
+            await send({**start, "headers": headers})
+
+        async def send_compressed(data: bytes, more_body: bool) -> None:
+            output = compressor.compress(data, flush=streaming and more_body)
+            if not more_body:
+                output += compressor.finish()
+            compressed_bytes.inc(len(data), service=self.service_name, direction="response", stage="uncompressed")
+            compressed_bytes.inc(len(output), service=self.service_name, direction="response", stage="compressed")
+            if output or not more_body:
+                await send({"type": "http.response.body", "body": output, "more_body": more_body})
+
+        async def wrapped_send(message) -> None:
+            nonlocal start, compressor, streaming, pending_size, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = message["headers"]
+                passthrough = _header(headers, b"content-encoding") is not None or message["status"] in (204, 304)
+                streaming = (_header(headers, b"content-type") or "").startswith("text/event-stream")
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                return await send_compressed(body, more_body)
+
+            pending.append(body)
+            pending_size += len(body)
+            if pending_size < self.min_size and more_body and not streaming:
+                return  # Wait for more of the body before deciding
+            data = b"".join(pending)
+            pending.clear()
+            if pending_size < self.min_size:
+                # Too small to gain anything: the whole body, or the first event of a stream
+                passthrough = True
+                await send_start(compressed=False)
+                return await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            compressor = Compressor(encoding)
+            await send_start(compressed=True)
+            await send_compressed(data, more_body)
+
+        await self.app(scope, receive, wrapped_send)
+
+    async def _reject(self, send, status: int, error: Exception, encoding: str) -> None:
+        logger.warning(f"Rejected a request body with content encoding {encoding}: {error}")
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": str(error).encode()})
+
+    async def _decoded_request(self, scope, receive, send, encoding: str):
+        # Reads the whole compressed body, so the app sees a plain request
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > self.max_request_size:
+                await self._reject(send, 413, BodyTooLarge(f"Request body exceeds {self.max_request_size} bytes"), encoding)
+                return scope, None
+            if not message.get("more_body", False):
+                break
+        raw = b"".join(chunks)
+        try:
+            body = decompress(raw, encoding, self.max_request_size)
+        except BodyTooLarge as error:
+            await self._reject(send, 413, error, encoding)
+            return scope, None
+        except Exception as error:
+            await self._reject(send, 415, error, encoding)
+            return scope, None
+        compressed_bytes.inc(len(body), service=self.service_name, direction="request", stage="uncompressed")
+        compressed_bytes.inc(len(raw), service=self.service_name, direction="request", stage="compressed")
+
+        headers = [(key, value) for key, value in scope["headers"] if key.lower() not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode()))
+        delivered = False
+
+        async def decoded_receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return {**scope, "headers": headers}, decoded_receive
+
+
+class CompressingTransport(httpx.AsyncBaseTransport):
+    """httpx transport compressing request bodies of at least `min_size` bytes with gzip."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, min_size: int = COMPRESSION_MIN_SIZE):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.min_size = min_size
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if "content-encoding" not in request.headers and request.method in ("POST", "PUT", "PATCH"):
+            body = await request.aread()
+            if len(body) >= self.min_size:
+                compressed = compress(body, REQUEST_ENCODING)
+                headers = httpx.Headers(request.headers)
+                headers["content-encoding"] = REQUEST_ENCODING
+                headers["content-length"] = str(len(compressed))
+                request = httpx.Request(
+                    request.method, request.url, headers=headers, content=compressed, extensions=request.extensions
+                )
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def compressing_client(**kwargs) -> httpx.AsyncClient:
+    """Returns an httpx client that compresses large request bodies when COMPRESSION_ENABLED is on."""
+    if COMPRESSION_ENABLED:
+        kwargs["transport"] = CompressingTransport()
+    return httpx.AsyncClient(**kwargs)
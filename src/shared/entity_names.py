@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Deterministic extraction of the entity name from the customer's message.
+# The agents need the bare name ('Stork' for 'I am House Stork') for every tool call. Instead of
+# leaving it to the model, the name is found with rules compiled against the background data:
+#   - a self-introduction ('I am Lord X', 'my name is X')
+#   - otherwise an entity the background check knows, wherever it is mentioned
+#   - otherwise a capitalized name after a title ('House X', 'the city of X')
+# The agent callbacks using it are in src/adk_metalbank/agents/entity_names.py.
+ENTITY_NAMES_FILE = os.getenv("ENTITY_NAMES_FILE", "./src/background_check_service/background.json")
+
+# Titles placed before a name, longest first so 'the free city of' wins over 'city of'.
+TITLES = [
+    "the free city of", "the city of", "city of", "the house of", "house of", "the town of", "town of",
+    "house", "lord", "lady", "ser", "king", "queen", "prince", "princess", "maester", "magister", "captain",
+]
+# Capitalized words that are not names.
+STOPWORDS = {
+    "a", "an", "the", "i", "i'm", "im", "my", "me", "we", "us", "our", "you", "your", "he", "she", "it", "they",
+    "of", "and", "or", "in", "on", "to", "for", "from", "with", "at", "by", "here", "there", "this", "that",
+    "am", "is", "are", "was", "be", "not", "no", "yes", "hello", "hi", "greetings", "please", "thanks",
+    "bank", "metal", "loan", "loans", "dragons", "lord", "lady", "ser", "house", "city", "sir", "madam",
+    "looking", "interested", "back", "again", "calling", "writing", "going", "trying", "need", "afraid", "sure",
+    "glad", "happy", "sorry", "told", "asking", "just", "also", "very", "so", "now", "still", "what", "who", "how",
+}
+_WORD = r"[A-Za-z][A-Za-z'’\-]*"
+
+extractions = metrics.counter(
+    "entity_name_extractions_total", "Entity names extracted from user messages without the model, by result (known, unknown, none)."
+)
+extraction_latency = metrics.histogram(
+    "entity_name_extraction_seconds", "Time spent extracting the entity name from a user message.", buckets=(1e-6, 1e-5, 5e-5, 1e-4, 1e-3, 1e-2)
+)
+
+
+@dataclass
+class EntityName:
+    """An extracted entity name: `name` is bare and capitalized, `known` if the background check has it."""
+    name: str
+    known: bool
+    rule: str
+
+
+def _bare(word: str) -> str:
+    # Drops a possessive: "Stork's" -> "Stork"
+    return re.sub(r"['’]s$", "", word)
+
+
+class EntityNameExtractor:
+    """
+    Finds the entity a message is about.
+
+    Args:
+        entities (Iterable[str]): The names the background check knows (any case, possibly several words).
+    """
+
+    def __init__(self, entities: Iterable[str]):
+        self.entities: Dict[str, str] = {
+            entity.lower(): " ".join(word.capitalize() for word in entity.split()) for entity in entities if entity.strip()
+        }
+        titles = "|".join(re.escape(title).replace(r"\ ", r"\s+") for title in TITLES)
+        known = "|".join(re.escape(entity).replace(r"\ ", r"\s+") for entity in sorted(self.entities, key=len, reverse=True))
+        self.known_pattern = re.compile(rf"\b({known})(?:['’]s)?\b", re.IGNORECASE) if known else None
+        # Up to three words after the title; the last capitalized one is the family or city name
+        self.title_pattern = re.compile(rf"\b(?:{titles})\s+({_WORD}(?:\s+{_WORD}){{0,2}})", re.IGNORECASE)
+        self.intro_pattern = re.compile(
+            rf"\b(?:i\s+am|i'm|im|my\s+name\s+is|this\s+is|call\s+me|on\s+behalf\s+of)\s+(?:(?:{titles})\s+)?({_WORD}(?:\s+{_WORD}){{0,2}})",
+            re.IGNORECASE,
+        )
+
+    def extract(self, text: str) -> Optional[EntityName]:
+        """
+        Returns the entity named in a message, or None.
+
+        Args:
+            text (str): The user's message.
+
+        Returns:
+            EntityName | None: The bare, capitalized name and whether the background check knows it.
+        """
+        if not text:
+            return None
+        # Without any capitals the user did not capitalize names either, so any word after a title counts
+        lowercase = text == text.lower()
+        # A self-introduction names the customer, even if other entities are mentioned
+        for match in self.intro_pattern.finditer(text):
+            name = self._name_from(match.group(1), lowercase)
+            if name:
+                return EntityName(self.entities.get(name.lower(), name), known=name.lower() in self.entities, rule="introduction")
+        if self.known_pattern is not None:
+            match = self.known_pattern.search(text)
+            if match:
+                return EntityName(self.entities[re.sub(r"\s+", " ", match.group(1).lower())], known=True, rule="dictionary")
+        for match in self.title_pattern.finditer(text):
+            name = self._name_from(match.group(1), lowercase)
+            if name:
+                return EntityName(name, known=False, rule="title")
+        return None
+
+    def canonical(self, name: str) -> str:
+        """
+        Reduces a name given to a tool to the bare name: 'House Stork' -> 'Stork'.
+
+        Names the rules cannot place are returned unchanged.
+        """
+        entity = self.extract(name)
+        if entity is None:
+            words = [_bare(word) for word in name.split()]
+            return words[-1] if len(words) == 1 else name
+        return entity.name
+
+    def _name_from(self, words: str, lowercase: bool) -> Optional[str]:
+        # The run of names starts at the first word and ends at the first word that is not one.
+        # In lowercase text the end of a name cannot be seen, so only the first word is taken.
+        names = []
+        for word in words.split()[:1] if lowercase else words.split():
+            word = _bare(word.strip("'’-"))
+            if not word or word.lower() in STOPWORDS or not (lowercase or word[0].isupper()):
+                break
+            names.append(word)
+        return names[-1].capitalize() if names else None
+
+
+_extractor: Optional[EntityNameExtractor] = None
+
+
+def load_entity_names(path: str = ENTITY_NAMES_FILE) -> list:
+    """Returns the entity names of the background data, or none if the file is not available to this process."""
+    try:
+        with open(path) as f:
+            return list(json.load(f).keys())
+    except (OSError, ValueError) as error:
+        logger.warning(f"Entity names not loaded from {path} ({error}); only titles and introductions are recognized")
+        return []
+
+
+def get_entity_name_extractor() -> EntityNameExtractor:
+    """Returns the extractor compiled against the background data, built on first use."""
+    global _extractor
+    if _extractor is None:
+        _extractor = EntityNameExtractor(load_entity_names())
+    return _extractor
+
+
+def extract_entity_name(text: str) -> Optional[EntityName]:
+    """Extracts the entity name of a message and records the outcome in the extraction metrics."""
+    start = time.perf_counter()
+    entity = get_entity_name_extractor().extract(text)
+    extraction_latency.observe(time.perf_counter() - start)
+    extractions.inc(result="none" if entity is None else "known" if entity.known else "unknown")
+    return entity
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import asyncio
+import logging
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Simulated model round trip, so benchmarks can reproduce realistic wall-clock times.
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+# When streaming, text responses arrive in this many chunks spread over the latency.
+FAKE_LLM_STREAM_CHUNKS = int(os.getenv("FAKE_LLM_STREAM_CHUNKS", "4"))
+CHARS_PER_TOKEN = 4
+
+# ADK adds 'You are an agent. Your internal name is "<name>".' to every system instruction.
+AGENT_NAME_PATTERN = re.compile(r'internal name is "([^"]+)"')
+ENTITY_PATTERN = re.compile(r"\b(?:house|lord|lady|ser|city of|i am)\s+([a-z]+)", re.IGNORECASE)
+LOAN_REQUEST_PATTERN = re.compile(r"\b(borrow|need a loan|want a loan|request a loan|apply for a loan|loan of)\b", re.IGNORECASE)
+LOAN_PATTERN = re.compile(r"\b(loan|loans|debt|repay)\b", re.IGNORECASE)
+CLANDESTINE_PATTERN = re.compile(r"\b(clandestine|secret|men without phases|all systems must fail)\b", re.IGNORECASE)
+
+fake_llm_calls = metrics.counter("fake_llm_calls_total", "Calls made to the fake model, by agent.")
+fake_llm_prompt_tokens = metrics.counter("fake_llm_prompt_tokens_total", "Estimated prompt tokens sent to the fake model, by agent.")
+fake_llm_output_tokens = metrics.counter("fake_llm_output_tokens_total", "Estimated output tokens of the fake model, by agent.")
+
+
+def _system_instruction(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is None:
+        return ""
+    if isinstance(instruction, str):
+        return instruction
+    return "".join(part.text or "" for part in getattr(instruction, "parts", None) or [])
+
+
+def _content_chars(content: types.Content) -> int:
+    size = 0
+    for part in content.parts or []:
+        if part.text:
+            size += len(part.text)
+        if part.function_call:
+            size += len(json.dumps(part.function_call.args or {}, default=str)) + len(part.function_call.name or "")
+        if part.function_response:
+            size += len(json.dumps(part.function_response.response or {}, default=str))
+    return size
+
+
+def estimate_prompt_tokens(llm_request: LlmRequest) -> int:
+    """Estimates the prompt size (instruction, history and tool declarations) in tokens."""
+    chars = len(_system_instruction(llm_request)) + sum(_content_chars(content) for content in llm_request.contents)
+    for tool in (llm_request.config.tools if llm_request.config and llm_request.config.tools else []):
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            chars += len(json.dumps(declaration.model_dump(mode="json", exclude_none=True)))
+    return chars // CHARS_PER_TOKEN
+
+
+def extract_entity(text: str) -> Optional[str]:
+    match = ENTITY_PATTERN.search(text)
+    return match.group(1).capitalize() if match else None
+
+
+class FakeLlm(BaseLlm):
+    """
+    Deterministic stand-in for Gemini, used by the benchmarks and for offline runs.
+
+    It answers with a scripted response chosen from the agent name, the available tools
+    and the latest message, so that the agents follow the same tool calls and transfers
+    they would with a real model. Calls and estimated tokens are recorded per agent.
+    """
+
+    model: str = "fake-llm"
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        instruction = _system_instruction(llm_request)
+        match = AGENT_NAME_PATTERN.search(instruction)
+        agent_name = match.group(1) if match else "unknown"
+        content = self._respond(agent_name, instruction, llm_request)
+
+        text = content.parts[0].text if content.parts else None
+        if stream and text and FAKE_LLM_STREAM_CHUNKS > 1:
+            # Partial chunks like a streaming model; the final response below carries the full text.
+            words = text.split(" ")
+            size = -(-len(words) // FAKE_LLM_STREAM_CHUNKS)
+            for start in range(0, len(words), size):
+                await asyncio.sleep(FAKE_LLM_LATENCY_MS / 1000 / FAKE_LLM_STREAM_CHUNKS)
+                chunk = " ".join(words[start:start + size]) + (" " if start + size < len(words) else "")
+                yield LlmResponse(content=_text(chunk), partial=True)
+        elif FAKE_LLM_LATENCY_MS:
+            await asyncio.sleep(FAKE_LLM_LATENCY_MS / 1000)
+
+        prompt_tokens = estimate_prompt_tokens(llm_request)
+        output_tokens = _content_chars(content) // CHARS_PER_TOKEN
+        fake_llm_calls.inc(agent=agent_name)
+        fake_llm_prompt_tokens.inc(prompt_tokens, agent=agent_name)
+        fake_llm_output_tokens.inc(output_tokens, agent=agent_name)
+
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _respond(self, agent_name: str, instruction: str, llm_request: LlmRequest) -> types.Content:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        parts = last.parts if last and last.parts else []
+        tools = llm_request.tools_dict
+
+        function_responses = [part.function_response for part in parts if part.function_response]
+        if function_responses:
+            response = function_responses[-1].response or {}
+            rate = response.get("loan_interest_rate") if isinstance(response, dict) else None
+            if rate is not None:
+                return _text(f"Verily, the Bank offers thee a rate of {rate} percent, payable in Dragons.")
+            return _text("It is done, My Lord.")
+
+        message = "".join(part.text or "" for part in parts)
+        entity = extract_entity(message)
+
+        if "men_without_phases_agent_remote_tool" in tools and CLANDESTINE_PATTERN.search(message):
+            return _function_call("men_without_phases_agent_remote_tool", {})
+        if "transfer_to_agent" in tools and LOAN_PATTERN.search(message):
+            target = "metal_bank_agent"
+            if "loan_assessment_agent" in instruction and LOAN_REQUEST_PATTERN.search(message):
+                target = "loan_assessment_agent"
+            if target != agent_name:
+                return _function_call("transfer_to_agent", {"agent_name": target})
+        if "get_loan_quote" in tools and entity:
+            return _function_call("get_loan_quote", {"name": entity})
+        if agent_name == "loan_applicant_name_agent":
+            return _text(entity or "NONE")
+        if agent_name == "men_without_phases_agent":
+            return _text("A man has no name. Such a service is expensive, 12000 Dragons.")
+        if agent_name == "loan_offer_agent":
+            rate = re.search(r'"loan_interest_rate": ([0-9.]+)', instruction)
+            return _text(f"Verily, the Bank offers thee a rate of {rate.group(1) if rate else 'unknown'} percent, payable in Dragons.")
+        return _text("This is the Metal Bank of Braveos. What brings you through our heavy doors today?")
+
+
+def _text(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _function_call(name: str, args: dict) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+
+_registered = False
+
+
+def register_fake_llm() -> None:
+    """Registers FakeLlm for model names starting with `fake-`."""
+    global _registered
+    if not _registered:
+        LLMRegistry.register(FakeLlm)
+        _registered = True
+        logger.info("Using the fake LLM for model names matching fake-*")
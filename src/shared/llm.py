@@ -0,0 +1,25 @@
+import os
+
+# The model used by every LLM agent. Set AGENT_MODEL to a `fake-...` name to run the
+# agents against the deterministic FakeLlm instead of Gemini (benchmarks, offline runs).
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+def get_model_name() -> str:
+    """
+    Returns the model name for the LLM agents, registering the fake model if it is selected.
+
+    Returns:
+        str: The configured model name (defaults to gemini-2.0-flash).
+    """
+    model = os.getenv("AGENT_MODEL", DEFAULT_MODEL)
+    if model.startswith("fake-"):
+        from src.shared.fake_llm import register_fake_llm
+
+        register_fake_llm()
+    return model
+
+
+def uses_vertex_ai() -> bool:
+    """True unless the agents run against the fake model, in which case no Google Cloud settings are needed."""
+    return not os.getenv("AGENT_MODEL", DEFAULT_MODEL).startswith("fake-")
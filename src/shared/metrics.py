@@ -0,0 +1,243 @@
+import bisect
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# In-process metrics shared by all services.
+# The registry is deliberately dependency free so that every service (and the benchmarks)
+# can record metrics without pulling in an exporter. Exporters read `REGISTRY.snapshot()`.
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Default histogram buckets, in seconds, suited to tool calls and model round trips.
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """A monotonically increasing value, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, optionally split by labels."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class _HistogramData:
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * (bucket_count + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """A distribution of observed values over fixed buckets, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, _HistogramData] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = _HistogramData(len(self.buckets))
+            data.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            data.count += 1
+            data.sum += value
+
+    def count(self, **labels) -> int:
+        data = self._values.get(_label_key(labels))
+        return data.count if data else 0
+
+    def percentile(self, quantile: float, **labels) -> Optional[float]:
+        """
+        Estimates a percentile from the bucket counts.
+
+        Args:
+            quantile (float): The quantile to estimate, between 0 and 1 (e.g. 0.99).
+
+        Returns:
+            float | None: The upper bound of the bucket holding the quantile, or None without data.
+        """
+        data = self._values.get(_label_key(labels))
+        if not data or not data.count:
+            return None
+        rank = quantile * data.count
+        seen = 0
+        for index, bucket_count in enumerate(data.bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def samples(self) -> Dict[LabelKey, _HistogramData]:
+        with self._lock:
+            return dict(self._values)
+
+
+class MetricsRegistry:
+    """Holds every metric of the process, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        """
+        Returns a JSON-serializable view of every metric.
+
+        Returns:
+            dict: Metric name to a list of {"labels": ..., "value": ...} samples.
+            Histograms report count, sum and p50/p90/p99 estimates instead of a value.
+        """
+        snapshot = {}
+        for metric in self.metrics():
+            samples = []
+            for key, value in metric.samples().items():
+                labels = dict(key)
+                if isinstance(metric, Histogram):
+                    samples.append({
+                        "labels": labels,
+                        "count": value.count,
+                        "sum": value.sum,
+                        "p50": metric.percentile(0.5, **labels),
+                        "p90": metric.percentile(0.9, **labels),
+                        "p99": metric.percentile(0.99, **labels),
+                    })
+                else:
+                    samples.append({"labels": labels, "value": value})
+            snapshot[metric.name] = {"type": metric.kind, "description": metric.description, "samples": samples}
+        return snapshot
+
+
+# The process-wide registry.
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, description: str = "") -> Counter:
+    return REGISTRY.counter(name, description)
+
+
+def gauge(name: str, description: str = "") -> Gauge:
+    return REGISTRY.gauge(name, description)
+
+
+def histogram(name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, description, buckets=buckets)
+
+
+def _escape_label_value(value) -> str:
+    # Prometheus text format: backslash, double quote and line feed are escaped in label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape_label_value(value)}"' for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus(registry: MetricsRegistry = REGISTRY) -> str:
+    """
+    Renders every metric of the registry in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics, ready to be served on a /metrics endpoint.
+    """
+    lines = []
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for key, value in metric.samples().items():
+            labels = dict(key)
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], value.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {value.sum}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {value.count}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,17 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class LoanRiskProfile(BaseModel):
     entity_name: str
     war_risk: float
     reputation: float
+    # Combined risk of the two scores, precomputed by the Background Check Service (see src/shared/rates.py)
+    base_risk_factor: Optional[float] = None
 
 
+
+class FactMatch(BaseModel):
+    entity_name: str
+    fact: str
+    # BM25 relevance of the fact to the search query; higher is better
+    score: float
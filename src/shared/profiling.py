@@ -0,0 +1,194 @@
+import os
+import sys
+import hmac
+import json
+import time
+import asyncio
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# The admin routes are off by default; set PROFILING_ENABLED=true to serve them under PROFILING_PATH.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_PATH = os.getenv("PROFILING_PATH", "/debug/profile").rstrip("/")
+# Shared secret, sent as 'Authorization: Bearer <token>'. Without one, only clients on the same
+# host (loopback addresses) may use the routes.
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# Upper bound for the duration of a single profile or measurement.
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "60"))
+
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+# Accepted ranges of the sampling interval and of the number of allocation sites reported.
+INTERVAL_MS_RANGE = (1.0, 1000.0)
+TOP_RANGE = (1, 500)
+
+# Only one sampling profiler or allocation trace may run at a time per process.
+_profile_lock = asyncio.Lock()
+
+
+def sample_cpu(thread_id: int, seconds: float, interval: float) -> Counter:
+    """
+    Samples the stack of a thread at a fixed interval.
+
+    Args:
+        thread_id (int): The thread to sample, usually the one running the event loop.
+        seconds (float): How long to sample.
+        interval (float): Seconds between samples.
+
+    Returns:
+        Counter: Collapsed stacks ('outer;...;inner', one frame per 'file:function:line') to sample counts.
+    """
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        if frames:
+            stacks[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def dump_tasks() -> List[dict]:
+    """Describes every asyncio task of the running loop with its current stack."""
+    tasks = []
+    for task in asyncio.all_tasks():
+        stack = [
+            f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}" for frame in task.get_stack(limit=20)
+        ]
+        tasks.append({"name": task.get_name(), "coro": getattr(task.get_coro(), "__qualname__", str(task.get_coro())), "stack": stack})
+    return tasks
+
+
+async def measure_loop_lag(seconds: float, interval: float) -> Dict[str, float]:
+    """
+    Measures how late the event loop runs a timer scheduled every `interval` seconds.
+
+    Returns:
+        dict: The number of samples and the mean, p99 and max lag in milliseconds.
+    """
+    lags = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+    lags.sort()
+    return {
+        "samples": len(lags),
+        "mean_ms": sum(lags) / len(lags) * 1000 if lags else 0.0,
+        "p99_ms": lags[min(int(0.99 * len(lags)), len(lags) - 1)] * 1000 if lags else 0.0,
+        "max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+async def trace_allocations(seconds: float, top: int) -> List[dict]:
+    """
+    Reports the source lines that allocated the most memory over `seconds`.
+
+    tracemalloc is only running for the duration of the request, unless it was already started.
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(10)
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    return [
+        {"location": str(stat.traceback[0]), "size_diff_kb": stat.size_diff / 1024, "count_diff": stat.count_diff}
+        for stat in after.compare_to(before, "lineno")[:top]
+    ]
+
+
+def bounded(query: Dict[str, str], name: str, default: str, low: float, high: float, kind=float):
+    """
+    Reads a numeric query parameter.
+
+    Raises:
+        ValueError: If it is not a number of `kind` in [low, high].
+    """
+    value = kind(query.get(name, default))
+    if not low <= value <= high:  # Also rejects nan
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return value
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware serving runtime profiles of the process under PROFILING_PATH.
+
+    Routes (GET):
+      - `/cpu?seconds=5&interval_ms=5`: sampling CPU profile of the event loop thread, as collapsed stacks
+        (input for flamegraph.pl or speedscope)
+      - `/tasks`: asyncio task dump
+      - `/loop-lag?seconds=2&interval_ms=10`: event loop lag measurement
+      - `/memory?seconds=5&top=25`: allocation growth per source line
+
+    Install it only when PROFILING_ENABLED is set; requests outside PROFILING_PATH
+    are passed through with a single prefix check. Requests need PROFILING_TOKEN, or come
+    from the same host when no token is set; out-of-range parameters are refused with 400.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(PROFILING_PATH + "/"):
+            return await self.app(scope, receive, send)
+        if scope["method"] != "GET":
+            return await self._respond(send, 405, "Method not allowed\n")
+        if PROFILING_TOKEN:
+            authorization = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(authorization, f"Bearer {PROFILING_TOKEN}".encode()):
+                return await self._respond(send, 401, "Unauthorized\n")
+        elif (scope.get("client") or ("",))[0] not in LOOPBACK_HOSTS:
+            return await self._respond(send, 403, "Set PROFILING_TOKEN to profile from another host\n")
+
+        route = scope["path"][len(PROFILING_PATH):]
+        query = {key: values[0] for key, values in parse_qs(scope["query_string"].decode()).items()}
+        try:
+            seconds = bounded(query, "seconds", "5", 0.001, PROFILING_MAX_SECONDS)
+            if route == "/tasks":
+                return await self._respond(send, 200, json.dumps(dump_tasks(), indent=2), "application/json")
+            if route == "/loop-lag":
+                lag = await measure_loop_lag(seconds, bounded(query, "interval_ms", "10", *INTERVAL_MS_RANGE) / 1000)
+                return await self._respond(send, 200, json.dumps(lag), "application/json")
+            if route in ("/cpu", "/memory"):
+                interval = bounded(query, "interval_ms", "5", *INTERVAL_MS_RANGE) / 1000
+                top = bounded(query, "top", "25", *TOP_RANGE, kind=int)
+                if _profile_lock.locked():
+                    return await self._respond(send, 409, "A profile is already running\n")
+                async with _profile_lock:
+                    if route == "/cpu":
+                        logger.info(f"Sampling CPU profile for {seconds}s")
+                        stacks = await asyncio.to_thread(sample_cpu, threading.get_ident(), seconds, interval)
+                        body = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+                        return await self._respond(send, 200, body)
+                    allocations = await trace_allocations(seconds, top)
+                    return await self._respond(send, 200, json.dumps(allocations, indent=2), "application/json")
+        except ValueError as error:
+            return await self._respond(send, 400, f"Invalid parameter: {error}\n")
+        return await self._respond(send, 404, "Not found\n")
+
+    async def _respond(self, send, status: int, body: str, content_type: str = "text/plain") -> None:
+        data = body.encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(data)).encode())],
+        })
+        await send({"type": "http.response.body", "body": data})
@@ -0,0 +1,98 @@
+import os
+import time
+import functools
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.shared import metrics
+
+# Interest rate model of the Metal Bank.
+# The rate only depends on (war_risk, reputation, nr_open_loans, nr_closed_loans): the first two
+# give the base risk factor, which the Background Check Service precomputes when its data loads.
+
+# How long a quote per entity stays valid; a change to the entity's loans invalidates it earlier (see loan_changes.py).
+LOAN_QUOTE_TTL_SECONDS = float(os.getenv("LOAN_QUOTE_TTL_SECONDS", "300"))
+LOAN_QUOTE_MAX_ENTRIES = int(os.getenv("LOAN_QUOTE_MAX_ENTRIES", "4096"))
+
+quote_lookups = metrics.counter("loan_quote_lookups_total", "Loan quote cache lookups by result (hit, miss).")
+quote_invalidations = metrics.counter("loan_quote_invalidations_total", "Loan quotes dropped because the entity's loans changed.")
+
+
+def base_risk_factor(war_risk: float, reputation: float) -> float:
+    """
+    Combines the risk scores into the base risk factor.
+
+    Higher war_risk increases risk; higher reputation decreases risk (1.0 - reputation).
+    Both scores are expected between 0 and 1.
+    """
+    return 0.75 * war_risk + 0.25 * (1.0 - reputation)
+
+
+def interest_rate_from_risk(risk_factor: float, nr_open_loans: int, nr_closed_loans: int) -> float:
+    """
+    Turns a base risk factor and the loan history into the interest rate in percent.
+
+    Returns:
+        float: The rate, rounded to two decimals and at least 1.
+    """
+    # Baseline 10% interest (0.1), multiplied by the risk factor (0.9), scaled to a percentage
+    interest_rate = (0.9 * risk_factor + 0.1) * 100
+    # Each open loan increases the rate by 5 percentage points (higher risk).
+    interest_rate += nr_open_loans * 5
+    # Each closed loan decreases the rate by 0.5 percentage points (lower risk).
+    interest_rate -= nr_closed_loans * 0.5
+    # Round the rate for cleaner output and ensure it doesn't fall below a minimum threshold.
+    return max(round(interest_rate, 2), 1)
+
+
+@functools.lru_cache(maxsize=LOAN_QUOTE_MAX_ENTRIES)
+def quote_interest_rate(war_risk: float, reputation: float, nr_open_loans: int, nr_closed_loans: int) -> float:
+    """Returns the interest rate for the four inputs, cached by those inputs."""
+    return interest_rate_from_risk(base_risk_factor(war_risk, reputation), nr_open_loans, nr_closed_loans)
+
+
+class QuoteCache:
+    """
+    Final quotes per entity, so repeated assessments skip the background check and the loan lookup.
+
+    Entries expire after `ttl_seconds`; `invalidate` drops an entity's quote when its loans change.
+    """
+
+    def __init__(self, ttl_seconds: float = LOAN_QUOTE_TTL_SECONDS, max_entries: int = LOAN_QUOTE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._quotes: Dict[str, Tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(entity_name: str) -> str:
+        return entity_name.strip().lower()
+
+    def get(self, entity_name: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._quotes.get(self._key(entity_name))
+        if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+            quote_lookups.inc(result="miss")
+            return None
+        quote_lookups.inc(result="hit")
+        return entry[0]
+
+    def put(self, entity_name: str, quote: dict) -> None:
+        with self._lock:
+            if len(self._quotes) >= self.max_entries:
+                self._quotes.pop(next(iter(self._quotes)))
+            self._quotes[self._key(entity_name)] = (quote, time.monotonic())
+
+    def invalidate(self, entity_name: str) -> None:
+        with self._lock:
+            if self._quotes.pop(self._key(entity_name), None) is not None:
+                quote_invalidations.inc()
+
+    def clear(self) -> None:
+        """Drops every quote, e.g. when loan changes may have been missed."""
+        with self._lock:
+            self._quotes.clear()
+
+
+# The process-wide quote cache.
+loan_quotes = QuoteCache()
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Deadlines, hedged requests and circuit breakers for calls to other services.
+# Every dependency (the two MCP servers and the A2A agent) gets:
+#   - a deadline: a call taking longer fails instead of hanging the conversation
+#   - for idempotent reads, a hedge: if the first attempt is slower than the dependency usually
+#     is (HEDGE_QUANTILE of its recent latencies) or fails before that, a second attempt is sent
+#     and the first answer wins
+#   - a circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures, calls fail fast for
+#     CIRCUIT_RESET_SECONDS (with a cached or degraded answer where the caller has one), then one
+#     probe call decides whether the dependency is back
+RESILIENCE_ENABLED = os.getenv("RESILIENCE_ENABLED", "true").lower() == "true"
+# Deadline per dependency, in seconds: <DEPENDENCY>_TIMEOUT_SECONDS, e.g. BACKGROUND_CHECK_TIMEOUT_SECONDS.
+DEFAULT_TIMEOUTS = {"background_check": 5.0, "loan_service": 5.0, "men_without_phases": 60.0}
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "true").lower() == "true"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+# Hedge delay until enough latencies were observed, and the lowest delay ever used.
+HEDGE_INITIAL_DELAY_MS = float(os.getenv("HEDGE_INITIAL_DELAY_MS", "250"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "20"))
+# Hedges sent per call at most, so a dependency that is slow for everyone does not get twice the load.
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.1"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Fault injection is opt-in, for testing the above: FAULT_INJECTION_ENABLED=true makes a service
+# delay FAULT_DELAY_RATE of its JSON-RPC requests by FAULT_DELAY_MS and fail FAULT_ERROR_RATE of them.
+FAULT_INJECTION_ENABLED = os.getenv("FAULT_INJECTION_ENABLED", "false").lower() == "true"
+FAULT_DELAY_MS = float(os.getenv("FAULT_DELAY_MS", "1000"))
+FAULT_DELAY_RATE = float(os.getenv("FAULT_DELAY_RATE", "0.05"))
+FAULT_ERROR_RATE = float(os.getenv("FAULT_ERROR_RATE", "0.0"))
+
+# Recent latencies per dependency the hedge delay is computed from.
+LATENCY_WINDOW = 500
+MIN_LATENCY_SAMPLES = 20
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+call_latency = metrics.histogram("dependency_call_seconds", "Latency of calls to other services, by dependency and outcome.")
+breaker_state = metrics.gauge("circuit_breaker_state", "Circuit breaker state by dependency: 0 closed, 1 half open, 2 open.")
+breaker_rejections = metrics.counter("circuit_breaker_rejections_total", "Calls failed fast by an open circuit, by dependency.")
+hedges_sent = metrics.counter("hedged_requests_total", "Second attempts sent for slow idempotent calls, by dependency and winner.")
+fallbacks = metrics.counter("dependency_fallbacks_total", "Cached or degraded answers given instead of a failed call, by dependency and kind.")
+faults_injected = metrics.counter("faults_injected_total", "Requests delayed or failed by fault injection, by service and kind.")
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a dependency did not answer within its deadline."""
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while a dependency keeps failing.
+
+    Closed: calls pass; `failure_threshold` consecutive failures open the circuit.
+    Open: calls are rejected for `reset_seconds`, then the circuit is half open.
+    Half open: one probe call passes; its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._state = CLOSED
+        breaker_state.set(0, dependency=name)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """Returns whether a call may go to the dependency now (in half open state, only the probe)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.probing = False
+        if self._state != CLOSED:
+            logger.info(f"Circuit of {self.name} closed")
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probing = False
+        if self._state == HALF_OPEN or (self._state == CLOSED and self.failures >= self.failure_threshold):
+            logger.warning(f"Circuit of {self.name} opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        breaker_state.set(_STATE_VALUES[state], dependency=self.name)
+
+
+class Dependency:
+    """
+    Guards the calls to one service with a deadline, optional hedging and a circuit breaker.
+
+    Use `get_dependency(name)` to share one instance (and its breaker) per service.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout_seconds: float,
+        hedging: bool = HEDGING_ENABLED,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.hedging = hedging
+        self.breaker = breaker or CircuitBreaker(name)
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.hedge_tokens = 1.0
+
+    def available(self) -> bool:
+        """Returns False while the circuit is open, so callers can skip the dependency altogether."""
+        return self.breaker.state != OPEN
+
+    def hedge_delay(self) -> float:
+        """Seconds after which a hedge is sent: HEDGE_QUANTILE of the recent successful latencies."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return HEDGE_INITIAL_DELAY_MS / 1000
+        ordered = sorted(self.latencies)
+        return max(ordered[min(int(HEDGE_QUANTILE * len(ordered)), len(ordered) - 1)], HEDGE_MIN_DELAY_MS / 1000)
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        idempotent: bool = False,
+        fallback: Optional[Callable[[Exception], T]] = None,
+        is_success: Optional[Callable[[T], bool]] = None,
+    ) -> T:
+        """
+        Calls the dependency.
+
+        Args:
+            func (Callable): Makes one attempt; called twice if the call is hedged.
+            idempotent (bool): Whether a second attempt is harmless, which allows hedging.
+            fallback (Callable | None): Returns the answer to give if the call fails, times
+                                        out or is rejected by the open circuit (e.g. a cached one).
+            is_success (Callable | None): Tells whether a result counts as a success for the breaker.
+                                          Other results, such as an error answer of the service, are
+                                          returned but count neither as a success nor as a failure.
+
+        Returns:
+            The result of the call, or of the fallback.
+
+        Raises:
+            CircuitOpenError: If the circuit is open and there is no fallback.
+            DeadlineExceededError: If the dependency did not answer in time and there is no fallback.
+        """
+        if not RESILIENCE_ENABLED:
+            return await func()
+        if not self.breaker.allow():
+            breaker_rejections.inc(dependency=self.name)
+            return self._fail(CircuitOpenError(f"{self.name} is unavailable (circuit open)"), fallback)
+
+        start = time.perf_counter()
+        try:
+            attempt = self._hedged(func, is_success) if idempotent and self.hedging else func()
+            result = await asyncio.wait_for(attempt, self.timeout_seconds)
+        except asyncio.CancelledError:
+            self.breaker.probing = False
+            raise
+        except Exception as error:
+            elapsed = time.perf_counter() - start
+            if isinstance(error, asyncio.TimeoutError):
+                error = DeadlineExceededError(f"{self.name} did not answer within {self.timeout_seconds}s")
+                call_latency.observe(elapsed, dependency=self.name, outcome="timeout")
+            else:
+                call_latency.observe(elapsed, dependency=self.name, outcome="error")
+            self.breaker.record_failure()
+            logger.warning(f"Call to {self.name} failed after {elapsed:.3f}s: {error}")
+            return self._fail(error, fallback)
+
+        elapsed = time.perf_counter() - start
+        if is_success is not None and not is_success(result):
+            call_latency.observe(elapsed, dependency=self.name, outcome="error_result")
+            self.breaker.probing = False
+            return result
+        call_latency.observe(elapsed, dependency=self.name, outcome="ok")
+        self.latencies.append(elapsed)
+        self.breaker.record_success()
+        return result
+
+    def _fail(self, error: Exception, fallback: Optional[Callable[[Exception], T]]) -> T:
+        if fallback is None:
+            raise error
+        return fallback(error)
+
+    async def _hedged(self, func: Callable[[], Awaitable[T]], is_success: Optional[Callable[[T], bool]] = None) -> T:
+        def succeeded(task: asyncio.Future) -> bool:
+            return task.exception() is None and (is_success is None or is_success(task.result()))
+
+        first = asyncio.ensure_future(func())
+        attempts = {first: "first"}
+        try:
+            await asyncio.wait(attempts, timeout=self.hedge_delay())
+            self.hedge_tokens = min(self.hedge_tokens + HEDGE_BUDGET, 10.0)
+            if first.done() and succeeded(first):
+                return first.result()
+            # Slower than usual, or failed right away: one more attempt (the retry of a failed read)
+            if self.hedge_tokens >= 1:
+                self.hedge_tokens -= 1
+                attempts[asyncio.ensure_future(func())] = "hedge"
+            pending = {task for task in attempts if not task.done()}
+            finished = [first] if first.done() else []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # An error answer only wins if no attempt succeeds
+                    if succeeded(task):
+                        if len(attempts) > 1:
+                            hedges_sent.inc(dependency=self.name, winner=attempts[task])
+                        return task.result()
+                    finished.append(task)
+            if len(attempts) > 1:
+                hedges_sent.inc(dependency=self.name, winner="none")
+            for task in finished:
+                if task.exception() is None:
+                    return task.result()
+            raise finished[-1].exception()
+        finally:
+            # The slower attempt is abandoned
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+
+_dependencies: Dict[str, Dependency] = {}
+
+
+def dependency_timeout(name: str) -> float:
+    """Returns the deadline of a dependency: <NAME>_TIMEOUT_SECONDS, or its default."""
+    return float(os.getenv(f"{name.upper()}_TIMEOUT_SECONDS", DEFAULT_TIMEOUTS.get(name, 10.0)))
+
+
+def get_dependency(name: str) -> Dependency:
+    """Returns the guard of a dependency, shared by all callers in the process."""
+    dependency = _dependencies.get(name)
+    if dependency is None:
+        dependency = _dependencies[name] = Dependency(name, dependency_timeout(name))
+    return dependency
+
+
+class FaultInjectionMiddleware:
+    """
+    ASGI middleware that delays or fails a share of the JSON-RPC POST requests of a service.
+
+    Used to check deadlines, hedging and circuit breakers of the callers against a
+    slow or failing dependency. Failed requests get a 503 with a JSON-RPC error.
+    """
+
+    def __init__(
+        self,
+        app,
+        service_name: str,
+        delay_ms: float = FAULT_DELAY_MS,
+        delay_rate: float = FAULT_DELAY_RATE,
+        error_rate: float = FAULT_ERROR_RATE,
+    ):
+        self.app = app
+        self.service_name = service_name
+        self.delay_ms = delay_ms
+        self.delay_rate = delay_rate
+        self.error_rate = error_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        if random.random() < self.error_rate:
+            faults_injected.inc(service=self.service_name, kind="error")
+            body = json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32000, "message": "Injected fault"}}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        if random.random() < self.delay_rate:
+            faults_injected.inc(service=self.service_name, kind="delay")
+            await asyncio.sleep(self.delay_ms / 1000)
+        await self.app(scope, receive, send)
@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# The cache is opt-in: set RESPONSE_CACHE_ENABLED=true to install it on the agents.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Number of most recent conversation turns that, with the instruction, make up the cache key.
+# A request with more turns than that, or with tool calls, also depends on the earlier conversation,
+# so its response is only served again within the same session; shorter ones are shared by all users.
+RESPONSE_CACHE_TURNS = int(os.getenv("RESPONSE_CACHE_TURNS", "2"))
+# Optional disk tier shared between processes and restarts (empty to disable).
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB", "")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+# Cosine similarity above which a near-identical turn is served from the cache (0 disables similarity matching).
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0"))
+# Turns matching this pattern must reach the model because they lead to tool calls.
+RESPONSE_CACHE_BYPASS_PATTERN = os.getenv(
+    "RESPONSE_CACHE_BYPASS_PATTERN",
+    r"\d|\b(loan|loans|borrow|cancel|repay|house|lord|lady|ser|city of|i am|clandestine|secret|all systems must fail)\b",
+)
+
+# Temporary (never persisted) state keys used to hand the lookup over to the after-model callback.
+_KEY_STATE = "temp:response_cache_key"
+_START_STATE = "temp:response_cache_start"
+
+cache_lookups = metrics.counter("response_cache_lookups_total", "Model response cache lookups by result (hit tier, miss, bypass).")
+cache_latency_saved = metrics.counter("response_cache_latency_saved_seconds_total", "Model latency avoided by cache hits.")
+
+
+def normalize(text: str) -> str:
+    """Lowercases the text, drops punctuation and collapses whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def hashing_embedding(text: str, dimensions: int = 256) -> List[float]:
+    """
+    Deterministic local embedding: hashed word unigrams and bigrams, L2 normalized.
+
+    Good enough to match rephrasings of short greetings and FAQ questions without a model call.
+    """
+    words = normalize(text).split()
+    vector = [0.0] * dimensions
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        vector[int.from_bytes(digest, "little") % dimensions] += 1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class CacheEntry:
+    text: str
+    latency: float
+    created: float
+    embedding: Optional[List[float]] = None
+
+
+class ResponseCache:
+    """
+    Two-tier cache of text-only model responses.
+
+    Keys are (instruction hash, scope, normalized recent turns), where the scope is empty for
+    responses shared by all users and names the session otherwise. The memory tier is an LRU of
+    `max_entries`; the optional disk tier is a SQLite file. If an `embedder` is given,
+    a miss falls back to the most similar cached turn for the same instruction and scope,
+    provided its cosine similarity reaches `similarity_threshold`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        db_path: str = RESPONSE_CACHE_DB,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        embedder: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        # The disk connection is shared by the threads of the agents
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scoped_response_cache "
+                "(instruction_hash TEXT, scope TEXT, turns TEXT, text TEXT, latency REAL, created REAL, "
+                "PRIMARY KEY (instruction_hash, scope, turns))"
+            )
+            self._db.commit()
+
+    def lookup(self, instruction_hash: str, turns: str, scope: str = "") -> tuple[Optional[CacheEntry], str]:
+        """
+        Looks up a cached response.
+
+        Args:
+            instruction_hash (str): Hash of the system instruction (and agent).
+            turns (str): The normalized recent turns.
+            scope (str): The session the response belongs to, empty if shared by all users.
+
+        Returns:
+            tuple: The entry (or None) and the tier that served it: "memory", "disk", "similar" or "miss".
+        """
+        key = (instruction_hash, scope, turns)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry.created <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry, "memory"
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT text, latency, created FROM scoped_response_cache WHERE instruction_hash = ? AND scope = ? AND turns = ?",
+                    key,
+                ).fetchone()
+            if row and now - row[2] <= self.ttl_seconds:
+                embedding = self.embedder(turns) if self.embedder is not None else None
+                entry = CacheEntry(text=row[0], latency=row[1], created=row[2], embedding=embedding)
+                self._remember(key, entry)
+                return entry, "disk"
+
+        if self.embedder is not None and self.similarity_threshold > 0:
+            embedding = self.embedder(turns)
+            best, best_score = None, self.similarity_threshold
+            with self._lock:
+                for (other_hash, other_scope, _), entry in self._entries.items():
+                    if other_hash != instruction_hash or other_scope != scope or entry.embedding is None or now - entry.created > self.ttl_seconds:
+                        continue
+                    score = cosine(embedding, entry.embedding)
+                    if score >= best_score:
+                        best, best_score = entry, score
+            if best is not None:
+                return best, "similar"
+        return None, "miss"
+
+    def store(self, instruction_hash: str, turns: str, text: str, latency: float, scope: str = "") -> None:
+        """Stores a text-only model response in every tier."""
+        entry = CacheEntry(
+            text=text,
+            latency=latency,
+            created=time.time(),
+            embedding=self.embedder(turns) if self.embedder is not None else None,
+        )
+        self._remember((instruction_hash, scope, turns), entry)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO scoped_response_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (instruction_hash, scope, turns, text, latency, entry.created),
+                )
+                self._db.commit()
+
+    def _remember(self, key: tuple, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache: Optional[ResponseCache] = None
+_bypass_pattern = re.compile(RESPONSE_CACHE_BYPASS_PATTERN, re.IGNORECASE)
+
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache, created on first use."""
+    global _cache
+    if _cache is None:
+        embedder = hashing_embedding if RESPONSE_CACHE_SIMILARITY_THRESHOLD > 0 else None
+        _cache = ResponseCache(embedder=embedder)
+    return _cache
+
+
+def _content_text(content: types.Content) -> str:
+    return "".join(part.text or "" for part in content.parts or [])
+
+
+def _cache_key(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[tuple[str, str, str]]:
+    # Only fresh user turns with plain text are cacheable; tool results always go to the model.
+    if not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or any(part.function_response or part.function_call for part in last.parts or []):
+        return None
+    message = _content_text(last)
+    if not message or _bypass_pattern.search(message):
+        return None
+
+    instruction = llm_request.config.system_instruction if llm_request.config else ""
+    if not isinstance(instruction, str):
+        instruction = _content_text(instruction) if instruction else ""
+    instruction_hash = hashlib.sha256(f"{callback_context.agent_name}\n{instruction}".encode()).hexdigest()
+    turns = "\n".join(
+        f"{content.role}: {normalize(_content_text(content))}" for content in llm_request.contents[-RESPONSE_CACHE_TURNS:]
+    )
+    # Only a request made of the keyed turns alone (and the instruction, with the state it embeds)
+    # may be answered for another user; anything else is kept to its session.
+    self_contained = len(llm_request.contents) <= RESPONSE_CACHE_TURNS and not any(
+        part.function_call or part.function_response for content in llm_request.contents for part in content.parts or []
+    )
+    scope = "" if self_contained else f"{callback_context.user_id}/{callback_context.session.id}"
+    return instruction_hash, turns, scope
+
+
+def before_model_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Serves the model response from the cache when possible.
+
+    Returns:
+        LlmResponse | None: The cached response, or None to call the model.
+    """
+    key = _cache_key(callback_context, llm_request)
+    callback_context.state[_KEY_STATE] = json.dumps(key) if key else None
+    if key is None:
+        cache_lookups.inc(result="bypass", agent=callback_context.agent_name)
+        return None
+
+    entry, tier = get_response_cache().lookup(*key)
+    cache_lookups.inc(result=tier, agent=callback_context.agent_name)
+    if entry is None:
+        callback_context.state[_START_STATE] = time.perf_counter()
+        return None
+    cache_latency_saved.inc(entry.latency, agent=callback_context.agent_name)
+    callback_context.state[_KEY_STATE] = None
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=entry.text)]))
+
+
+def after_model_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """
+    Stores complete, text-only model responses for cacheable turns.
+
+    Returns:
+        None: The response is never modified.
+    """
+    key = callback_context.state.get(_KEY_STATE)
+    if not key or llm_response.partial or llm_response.error_code or not llm_response.content:
+        return None
+    parts = llm_response.content.parts or []
+    if not parts or any(part.function_call for part in parts):
+        return None
+    text = _content_text(llm_response.content)
+    if text:
+        latency = time.perf_counter() - callback_context.state.get(_START_STATE, time.perf_counter())
+        instruction_hash, turns, scope = json.loads(key)
+        get_response_cache().store(instruction_hash, turns, text, latency, scope)
+    callback_context.state[_KEY_STATE] = None
+    return None
+
+
+def with_response_cache(callbacks: Optional[list], cache_callback) -> Optional[list]:
+    """
+    Appends a response cache callback to an agent's callbacks if the cache is enabled.
+
+    Args:
+        callbacks (list | None): The agent's existing callbacks.
+        cache_callback: `before_model_callback` or `after_model_callback` of this module.
+
+    Returns:
+        list | None: The callbacks to install on the agent.
+    """
+    callbacks = list(callbacks or [])
+    if RESPONSE_CACHE_ENABLED:
+        callbacks.append(cache_callback)
+    return callbacks or None
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from src.shared import metrics
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Where spans go: "none" (default), "console", "json" (TELEMETRY_JSON_FILE), "otlp" (any OTLP collector,
+# configured through the standard OTEL_EXPORTER_OTLP_* variables) or "gcp" (Cloud Trace).
+TELEMETRY_EXPORTER = os.getenv("TELEMETRY_EXPORTER", "none").lower()
+TELEMETRY_JSON_FILE = os.getenv("TELEMETRY_JSON_FILE", "traces.jsonl")
+# Serve the shared metrics registry in the Prometheus text format on GET /metrics.
+PROMETHEUS_METRICS_ENABLED = os.getenv("PROMETHEUS_METRICS_ENABLED", "false").lower() == "true"
+METRICS_PATH = "/metrics"
+
+span_duration = metrics.histogram("span_duration_seconds", "Duration of traced operations, by service and span name.")
+
+_service_name = "unknown"
+_tracer = None
+
+
+def _gcp_span_exporter():
+    """
+    Builds an OTLP exporter authenticated against Google Cloud.
+    https://cloud.google.com/trace/docs/migrate-to-otlp-endpoints
+    """
+    import google.auth
+    import google.auth.transport.requests
+    import grpc
+    from google.auth.transport.grpc import AuthMetadataPlugin
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+    # Authenticate using Application Default Credentials (ADC) and create an authentication plugin
+    # for gRPC channels to securely send telemetry data to the Google Cloud backend.
+    credentials, _ = google.auth.default()
+    request = google.auth.transport.requests.Request()
+    auth_metadata_plugin = AuthMetadataPlugin(credentials=credentials, request=request)
+    channel_creds = grpc.composite_channel_credentials(
+        grpc.ssl_channel_credentials(),
+        grpc.metadata_call_credentials(auth_metadata_plugin),
+    )
+    return OTLPSpanExporter(credentials=channel_creds)
+
+
+def _json_file_span_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonFileSpanExporter(SpanExporter):
+        """Appends every span as one JSON line to a local file."""
+
+        def export(self, spans) -> SpanExportResult:
+            with open(path, "a") as f:
+                for span in spans:
+                    f.write(json.dumps(json.loads(span.to_json())) + "\n")
+            return SpanExportResult.SUCCESS
+
+    return JsonFileSpanExporter()
+
+
+def _span_exporter(exporter: str):
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    if exporter == "json":
+        return _json_file_span_exporter(TELEMETRY_JSON_FILE)
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    if exporter == "gcp":
+        return _gcp_span_exporter()
+    raise ValueError(f"Unknown TELEMETRY_EXPORTER: {exporter}")
+
+
+def setup_telemetry(service_name: str, exporter: Optional[str] = None) -> None:
+    """
+    Configures tracing for a service.
+
+    Spans are exported according to TELEMETRY_EXPORTER, and outgoing httpx requests
+    (MCP and A2A clients) carry the W3C trace context so traces continue across services.
+    Without an exporter, or without the OpenTelemetry SDK installed, spans are only
+    recorded as `span_duration_seconds` metrics.
+
+    Args:
+        service_name (str): The name reported for this service.
+        exporter (str | None): Overrides TELEMETRY_EXPORTER.
+    """
+    global _service_name, _tracer
+    _service_name = service_name
+    exporter = (exporter or TELEMETRY_EXPORTER).lower()
+    if exporter == "none":
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import SERVICE_INSTANCE_ID, SERVICE_NAME, Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OpenTelemetry SDK is not installed; spans are only recorded as metrics")
+        return
+
+    tracer_provider = trace.get_tracer_provider()
+    if not isinstance(tracer_provider, TracerProvider):
+        # Create a resource identifier for this service instance, which helps in
+        # associating telemetry data with the correct service.
+        resource = Resource.create(attributes={SERVICE_NAME: service_name, SERVICE_INSTANCE_ID: f"worker-{os.getpid()}"})
+        tracer_provider = TracerProvider(resource=resource)
+        # Register the tracer provider globally.
+        trace.set_tracer_provider(tracer_provider)
+    # Frameworks such as the ADK may already have registered a provider; the exporter is added to it.
+    # The BatchSpanProcessor groups spans together before sending them to the exporter.
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter=_span_exporter(exporter)))
+    _tracer = trace.get_tracer(service_name)
+
+    try:
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+        HTTPXClientInstrumentor().instrument()
+    except ImportError:
+        logger.warning("opentelemetry-instrumentation-httpx is not installed; trace context is not propagated")
+    logger.info(f"Telemetry for {service_name} exported to {exporter}")
+
+
+@contextmanager
+def start_span(name: str, **attributes) -> Iterator[None]:
+    """
+    Traces a block of code as a span and records its duration in `span_duration_seconds`.
+
+    Args:
+        name (str): The span name, e.g. 'loan_service.create_loan'.
+        **attributes: Span attributes.
+    """
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield
+        else:
+            with _tracer.start_as_current_span(name, attributes={k: str(v) for k, v in attributes.items()}):
+                yield
+    finally:
+        span_duration.observe(time.perf_counter() - start, service=_service_name, span=name)
+
+
+class TelemetryMiddleware:
+    """
+    ASGI middleware giving every service the same observability surface.
+
+    It continues the caller's trace from the incoming W3C trace context headers (when
+    tracing is set up), records `http_server_duration_seconds` per route prefix and, if
+    PROMETHEUS_METRICS_ENABLED is set, serves the metrics registry on GET /metrics.
+    """
+
+    def __init__(self, app, service_name: str):
+        self.service_name = service_name
+        self.app = app
+        self.request_duration = metrics.histogram(
+            "http_server_duration_seconds", "Duration of HTTP requests served, by service, method and first path segment."
+        )
+        if _tracer is not None:
+            try:
+                from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+
+                self.app = OpenTelemetryMiddleware(app)
+            except ImportError:
+                logger.warning("opentelemetry-instrumentation-asgi is not installed; incoming trace context is ignored")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if PROMETHEUS_METRICS_ENABLED and scope["path"] == METRICS_PATH and scope["method"] == "GET":
+            return await self._serve_metrics(send)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Only the first path segment is used as a label, session and task ids would explode the cardinality.
+            route = "/" + scope["path"].strip("/").split("/", 1)[0]
+            self.request_duration.observe(
+                time.perf_counter() - start, service=self.service_name, method=scope["method"], route=route
+            )
+
+    async def _serve_metrics(self, send) -> None:
+        body = metrics.render_prometheus().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain; version=0.0.4"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
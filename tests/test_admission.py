@@ -0,0 +1,122 @@
+"""
+Admission control of the MCP services (src/shared/admission.py): token buckets, the concurrency
+limiter and the middleware answering 429 or 503.
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.shared import admission
+from src.shared.admission import AdmissionMiddleware, ConcurrencyLimiter, TokenBucket, parse_tool_limits
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def test_a_bucket_admits_its_burst_then_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(4)][-1] > 0  # Never more than the burst
+
+
+def test_a_refund_gives_the_token_back(clock):
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.try_acquire()
+    bucket.refund()
+    assert bucket.try_acquire() == 0.0
+
+
+def test_tool_limits_are_parsed():
+    assert parse_tool_limits("create_loan=5:10, repay_loan=2") == {"create_loan": (5.0, 10.0), "repay_loan": (2.0, 2.0)}
+    with pytest.raises(ValueError):
+        parse_tool_limits("create_loan=0")
+    with pytest.raises(ValueError):
+        parse_tool_limits("create_loan=5:0.5")
+
+
+def test_callers_only_count_as_queued_when_they_wait():
+    reported = []
+
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, timeout=0.05, on_waiting=reported.append)
+        assert await limiter.acquire() is None  # A free slot: never queued
+        assert reported == []
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        assert await limiter.acquire() == "queue_full"
+        limiter.release()
+        assert await waiter is None
+        assert await limiter.acquire() == "queue_timeout"
+
+    asyncio.run(run())
+    assert reported == [1, 0, 1, 0]
+
+
+def tool_call(name: str) -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": {}}}
+
+
+async def slow_app(scope, receive, send):
+    await receive()
+    await asyncio.sleep(0.1)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def post_all(middleware: AdmissionMiddleware, payloads: list, client_id: str = "client-1") -> list:
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware)) as client:
+            return await asyncio.gather(*(
+                client.post("http://service/mcp/", content=json.dumps(payload), headers={"x-client-id": client_id})
+                for payload in payloads
+            ))
+    return [response.status_code for response in asyncio.run(run())]
+
+
+def test_a_client_over_its_rate_gets_429(monkeypatch):
+    monkeypatch.setattr(admission, "RATE_LIMIT_CLIENT_RPS", 0.001)
+    monkeypatch.setattr(admission, "RATE_LIMIT_CLIENT_BURST", 2)
+    middleware = AdmissionMiddleware(slow_app, "test")
+    assert sorted(post_all(middleware, [{"jsonrpc": "2.0", "id": 1, "method": "ping"}] * 3)) == [200, 200, 429]
+    assert post_all(middleware, [{"jsonrpc": "2.0", "id": 1, "method": "ping"}], client_id="client-2") == [200]
+
+
+def test_a_tool_over_its_rate_gets_429(monkeypatch):
+    monkeypatch.setattr(admission, "RATE_LIMIT_TOOLS", "create_loan=0.001:1")
+    middleware = AdmissionMiddleware(slow_app, "test")
+    assert sorted(post_all(middleware, [tool_call("create_loan"), tool_call("create_loan"), tool_call("get_loans_by_name")])) == [200, 200, 429]
+
+
+def test_calls_beyond_the_queue_get_503_and_the_queue_gauge_drains(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(admission, "ADMISSION_MAX_QUEUE", 1)
+    middleware = AdmissionMiddleware(slow_app, "queue-test")
+    assert sorted(post_all(middleware, [tool_call("get_loans_by_name")] * 3)) == [200, 200, 503]
+    assert admission.queue_depth.value(service="queue-test") == 0
+    assert admission.in_flight.value(service="queue-test") == 0
+
+
+def test_an_uncontended_call_is_never_reported_as_queued(monkeypatch):
+    middleware = AdmissionMiddleware(slow_app, "idle-test")
+    assert post_all(middleware, [tool_call("get_loans_by_name")]) == [200]
+    assert (("service", "idle-test"),) not in admission.queue_depth.samples()
@@ -0,0 +1,146 @@
+"""
+Asynchronous task mode of the Men Without Phases agent (src/adk_menwithoutphases/async_tasks.py).
+
+The A2A app runs in-process with the fake model; a non-blocking `message/send` must come back
+with a `working` task long before the model answers, and the task must complete in the background.
+"""
+import os
+
+os.environ.setdefault("AGENT_MODEL", "fake-llm")
+os.environ.setdefault("SESSION_SERVICE_URI", "")
+
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryPushNotificationConfigStore, InMemoryTaskStore
+
+from src.adk_menwithoutphases import a2a_customexecutor, agent, async_tasks
+from src.shared import fake_llm
+
+MODEL_LATENCY_SECONDS = 0.5
+TERMINAL_STATES = {"completed", "failed", "rejected", "canceled"}
+
+
+@pytest.fixture(autouse=True)
+def async_task_mode(monkeypatch):
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_LATENCY_MS", MODEL_LATENCY_SECONDS * 1000)
+    monkeypatch.setattr(a2a_customexecutor, "ASYNC_TASKS_ENABLED", True)
+    # Workers are bound to the event loop of their first job: one pool per test
+    monkeypatch.setattr(async_tasks, "_worker_pool", async_tasks.WorkerPool(workers=2, max_queued=4))
+
+
+class CallbackApp:
+    """ASGI app recording the tasks POSTed to it as push notifications."""
+
+    def __init__(self):
+        self.tasks = []
+        self.finished = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        task = json.loads(body)
+        self.tasks.append(task)
+        if task["status"]["state"] in TERMINAL_STATES:
+            self.finished.set()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def build_app(callbacks: CallbackApp):
+    config_store = InMemoryPushNotificationConfigStore()
+    sender = async_tasks.LocalPushNotificationSender(httpx.AsyncClient(transport=httpx.ASGITransport(app=callbacks)), config_store)
+    handler = DefaultRequestHandler(
+        agent_executor=agent.agent_executor,
+        task_store=InMemoryTaskStore(),
+        push_config_store=config_store,
+        push_sender=sender,
+    )
+    return A2AStarletteApplication(agent_card=agent.agent_card, http_handler=handler).build()
+
+
+def send_message(blocking: bool, push_url: str = None) -> dict:
+    configuration = {"blocking": blocking}
+    if push_url:
+        configuration["pushNotificationConfig"] = {"url": push_url, "token": str(uuid.uuid4())}
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "role": "user",
+                "messageId": str(uuid.uuid4()),
+                "contextId": str(uuid.uuid4()),
+                "parts": [{"kind": "text", "text": "The target is my neighbour."}],
+            },
+            "configuration": configuration,
+        },
+    }
+
+
+async def post(client: httpx.AsyncClient, payload: dict) -> tuple:
+    start = time.perf_counter()
+    response = await client.post("http://agent/", json=payload)
+    response.raise_for_status()
+    return response.json()["result"], time.perf_counter() - start
+
+
+def test_blocking_send_waits_for_the_model():
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(CallbackApp())), timeout=30) as client:
+            return await post(client, send_message(blocking=True))
+
+    task, connection = asyncio.run(run())
+    assert task["status"]["state"] == "completed"
+    assert connection >= MODEL_LATENCY_SECONDS
+
+
+def test_non_blocking_send_returns_a_working_task_completed_by_polling():
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(CallbackApp())), timeout=30) as client:
+            task, connection = await post(client, send_message(blocking=False))
+            first_state = task["status"]["state"]
+            start = time.perf_counter()
+            while task["status"]["state"] not in TERMINAL_STATES and time.perf_counter() - start < 10:
+                await asyncio.sleep(0.05)
+                task, _ = await post(client, {"jsonrpc": "2.0", "id": "poll", "method": "tasks/get", "params": {"id": task["id"]}})
+            return first_state, connection, task
+
+    first_state, connection, task = asyncio.run(run())
+    assert first_state == "working"
+    assert connection < MODEL_LATENCY_SECONDS / 2
+    assert task["status"]["state"] == "completed"
+    assert "Dragons" in task["status"]["message"]["parts"][0]["text"]
+
+
+def test_non_blocking_send_pushes_the_completed_task():
+    async def run():
+        callbacks = CallbackApp()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(callbacks)), timeout=30) as client:
+            task, connection = await post(client, send_message(blocking=False, push_url="http://localhost/a2a/callback"))
+            await asyncio.wait_for(callbacks.finished.wait(), timeout=10)
+            return task, connection, callbacks.tasks
+
+    task, connection, pushed = asyncio.run(run())
+    assert task["status"]["state"] == "working"
+    assert connection < MODEL_LATENCY_SECONDS / 2
+    assert pushed[-1]["id"] == task["id"]
+    assert pushed[-1]["status"]["state"] == "completed"
+
+
+def test_push_notifications_to_other_hosts_are_refused():
+    assert async_tasks.is_allowed_push_url("http://localhost:8122/a2a/callback")
+    assert not async_tasks.is_allowed_push_url("http://example.com/a2a/callback")
+    assert not async_tasks.is_allowed_push_url("file:///etc/passwd")
@@ -0,0 +1,50 @@
+"""
+Change feed of the Loan Service (src/loan_service/changefeed.py and its loans://changes resource).
+"""
+import os
+
+os.environ.setdefault("LOANS_DB_ECHO", "false")
+
+import threading
+
+import pytest
+
+from src.loan_service import main
+from src.loan_service.changefeed import ChangeFeed
+
+
+def test_the_server_advertises_resource_subscriptions():
+    capabilities = main.mcp_server.create_initialization_options().capabilities
+    assert capabilities.resources.subscribe
+
+
+def test_only_the_change_feed_resource_is_served():
+    assert main.changes_query("loans://changes?since=3&limit=10") == {"since": "3", "limit": "10"}
+    with pytest.raises(ValueError):
+        main.changes_query("loans://balances")
+
+
+def test_changes_published_out_of_order_are_buffered_in_order():
+    feed = ChangeFeed(buffer_size=4)
+    feed.publish([{"seq": 1}, {"seq": 2}, {"seq": 5}])
+    feed.publish([{"seq": 3}])
+    feed.publish([{"seq": 6}, {"seq": 4}])
+    assert [change["seq"] for change in feed.buffer] == [3, 4, 5, 6]
+
+    feed.publish([{"seq": 0}])  # Older than everything kept
+    assert [change["seq"] for change in feed.buffer] == [3, 4, 5, 6]
+
+
+def test_concurrent_publishers_keep_the_buffer_sorted():
+    feed = ChangeFeed(buffer_size=10000)
+
+    def publish(start):
+        for seq in range(start, 4000, 4):
+            feed.publish([{"seq": seq}])
+
+    threads = [threading.Thread(target=publish, args=(start,)) for start in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [change["seq"] for change in feed.buffer] == list(range(4000))
@@ -0,0 +1,62 @@
+"""
+Request decompression of the compression middleware (src/shared/compression.py).
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.shared import compression
+from src.shared.compression import BodyTooLarge, CompressionMiddleware
+
+MAX_SIZE = 64 * 1024
+
+
+async def echo_size(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps({"size": len(body)}).encode()})
+
+
+def post(content: bytes, encoding: str) -> httpx.Response:
+    async def run():
+        app = CompressionMiddleware(echo_size, "test", max_request_size=MAX_SIZE)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+            return await client.post("http://service/", content=content, headers={"content-encoding": encoding})
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_a_compressed_body_reaches_the_app_decompressed(encoding):
+    body = b'{"message": "The target is my neighbour."}' * 100
+    response = post(compression.compress(body, encoding), encoding)
+    assert response.status_code == 200
+    assert response.json() == {"size": len(body)}
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+def test_a_decompression_bomb_is_refused(encoding):
+    bomb = compression.compress(b"\0" * (100 * MAX_SIZE), encoding)
+    assert len(bomb) < MAX_SIZE
+    assert post(bomb, encoding).status_code == 413
+
+
+def test_an_oversized_compressed_body_is_refused_while_reading():
+    assert post(b"\1" * (MAX_SIZE + 1), "gzip").status_code == 413
+
+
+def test_a_corrupt_body_is_refused():
+    assert post(b"not gzip", "gzip").status_code == 415
+
+
+def test_decompression_stops_at_the_limit():
+    with pytest.raises(BodyTooLarge):
+        compression.decompress(compression.compress(b"a" * 1001, "gzip"), "gzip", max_size=1000)
+    multi_member = compression.compress(b"a" * 500, "gzip") + compression.compress(b"b" * 500, "gzip")
+    assert compression.decompress(multi_member, "gzip", max_size=1000) == b"a" * 500 + b"b" * 500
@@ -0,0 +1,52 @@
+"""
+Deterministic entity name extraction (src/shared/entity_names.py).
+"""
+import pytest
+
+from src.shared import entity_names
+from src.shared.entity_names import EntityName, EntityNameExtractor, extract_entity_name
+
+
+@pytest.fixture
+def extractor() -> EntityNameExtractor:
+    return EntityNameExtractor(["stork", "iron bank"])
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I am House Stork and I need a loan", EntityName("Stork", known=True, rule="introduction")),
+    ("my name is Lord Petyr Baelish", EntityName("Baelish", known=False, rule="introduction")),
+    ("i am lord baelish", EntityName("Baelish", known=False, rule="introduction")),
+    ("on behalf of House Tully, I am here", EntityName("Tully", known=False, rule="introduction")),
+    ("What do you know about the Iron Bank?", EntityName("Iron Bank", known=True, rule="dictionary")),
+    ("Tell me about Stork's loans", EntityName("Stork", known=True, rule="dictionary")),
+    ("I need a loan for the city of Braavos", EntityName("Braavos", known=False, rule="title")),
+    ("I'm looking for a loan", None),
+    ("Hello, I need 500 dragons", None),
+    ("", None),
+])
+def test_names_are_extracted(extractor, text, expected):
+    assert extractor.extract(text) == expected
+
+
+def test_tool_arguments_are_reduced_to_the_bare_name(extractor):
+    assert extractor.canonical("House Stork") == "Stork"
+    assert extractor.canonical("house of tully") == "Tully"
+    assert extractor.canonical("Baelish's") == "Baelish"
+    assert extractor.canonical("Jon Snow") == "Jon Snow"  # Left as given when no rule places it
+
+
+def test_without_background_data_titles_and_introductions_still_work(tmp_path):
+    extractor = EntityNameExtractor(entity_names.load_entity_names(str(tmp_path / "missing.json")))
+    assert extractor.extract("Tell me about Stork") is None
+    assert extractor.extract("I am House Stork") == EntityName("Stork", known=False, rule="introduction")
+
+
+def test_extractions_are_counted_by_result(monkeypatch, extractor):
+    monkeypatch.setattr(entity_names, "_extractor", extractor)
+    before = {result: entity_names.extractions.value(result=result) for result in ("known", "unknown", "none")}
+
+    extract_entity_name("I am House Stork")
+    extract_entity_name("I am Lord Baelish")
+    extract_entity_name("Good day")
+
+    assert {result: entity_names.extractions.value(result=result) - before[result] for result in before} == {"known": 1, "unknown": 1, "none": 1}
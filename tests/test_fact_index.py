@@ -0,0 +1,104 @@
+"""
+Full-text search over the background facts (src/background_check_service/fact_index.py).
+"""
+import json
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from src.background_check_service.fact_index import FactIndex, data_version, index_file, load_or_build, tokenize
+
+STATS = {
+    "stork": {"facts": [
+        "House Stork is known for its honor and loyalty.",
+        "They have a strong military tradition.",
+        "They defend the North against invasions.",
+    ]},
+    "braavos": {"facts": [
+        "The Iron Bank of Braavos lends gold to kings.",
+        "Braavos has a strong navy and a strong military.",
+    ]},
+    "pentos": {"facts": []},
+    "volantis": {"facts": [f"Volantis trades {word} with the east." for word in ("silk", "spice", "slaves", "wine", "iron", "gold")]},
+}
+
+
+def brute_force(stats: dict, query: str, entity_name: str = None) -> dict:
+    # BM25 computed fact by fact, the way the index must rank them
+    facts = [(entity, fact) for entity in stats for fact in stats[entity]["facts"]]
+    documents = [tokenize(fact) for _, fact in facts]
+    average_length = sum(map(len, documents)) / len(documents)
+    frequencies = Counter(term for document in documents for term in set(document))
+    scores = {}
+    for fact_id, tokens in enumerate(documents):
+        if entity_name is not None and facts[fact_id][0] != entity_name:
+            continue
+        counts, score = Counter(tokens), 0.0
+        for term, query_count in Counter(tokenize(query)).items():
+            if counts[term]:
+                idf = math.log(1 + (len(documents) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+                score += query_count * idf * counts[term] * 2.2 / (counts[term] + 1.2 * (0.25 + 0.75 * len(tokens) / average_length))
+        if score:
+            scores[fact_id] = score
+    return scores
+
+
+@pytest.fixture(scope="module")
+def index() -> FactIndex:
+    return FactIndex.build(STATS, "test")
+
+
+@pytest.mark.parametrize("query, entity_name, top_k", [
+    ("strong military", None, 5),
+    ("strong military", "braavos", 5),
+    ("gold iron bank", None, 2),
+    ("volantis trades gold", None, 3),
+    ("the and of", None, 5),
+    ("dragons", None, 5),
+])
+def test_search_ranks_like_bm25(index, query, entity_name, top_k):
+    found = index.search(query, entity_name, top_k)
+    expected = brute_force(STATS, query, entity_name)
+    # Facts of equal score may come in any order, so the scores are compared
+    assert [score for _, score in found] == pytest.approx(sorted(expected.values(), reverse=True)[:top_k], rel=1e-5)
+    assert all(score == pytest.approx(expected[fact], rel=1e-5) for fact, score in found)
+
+
+def test_candidates_only_search_keeps_the_ranking():
+    # A rare term read first leaves few candidates, so the long list of the common term is
+    # only searched for them
+    words = random.Random(7).choices(["common"] * 20 + ["rare", "other", "filler"], k=3000)
+    stats = {f"entity-{index}": {"facts": [f"{word} fact number {index}" for word in words[index * 100:(index + 1) * 100]]} for index in range(30)}
+    index = FactIndex.build(stats, "test")
+    found = index.search("rare common common", top_k=3)
+    expected = brute_force(stats, "rare common common")
+    assert [score for _, score in found] == pytest.approx(sorted(expected.values(), reverse=True)[:3], rel=1e-5)
+
+
+def test_facts_are_located_in_their_entity(index):
+    fact, _ = index.search("navy")[0]
+    assert index.locate(fact) == ("braavos", 1)
+    assert index.search("navy", entity_name="Stork") == []
+    assert index.search("navy", entity_name="unknown") == []
+
+
+def test_the_index_is_saved_and_rebuilt_when_the_data_changes(tmp_path):
+    data_file = tmp_path / "background.json"
+    data_file.write_text(json.dumps(STATS))
+
+    built = load_or_build(str(data_file))
+    loaded = FactIndex.load(index_file(str(data_file)))
+    assert loaded.version == built.version == data_version(data_file.read_bytes())
+    assert loaded.search("strong military") == built.search("strong military")
+
+    data_file.write_text(json.dumps({**STATS, "pentos": {"facts": ["Pentos sells cheese."]}}))
+    assert load_or_build(str(data_file)).search("cheese")
+
+
+def test_a_damaged_index_is_not_loaded(tmp_path):
+    path = tmp_path / "background.factindex"
+    path.write_bytes(b"FACTIDX1" + (1000).to_bytes(8, "little") + b"{")
+    assert FactIndex.load(str(path)) is None
+    assert FactIndex.load(str(tmp_path / "missing.factindex")) is None
@@ -0,0 +1,83 @@
+"""
+Guarded MCP tools (src/adk_metalbank/agents/sub_agents/guarded_toolset.py) and the hedged calls
+of src/shared/resilience.py they rely on.
+"""
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool import MCPToolset, StreamableHTTPConnectionParams
+
+from src.adk_metalbank.agents.sub_agents import guarded_toolset
+from src.adk_metalbank.agents.sub_agents.guarded_toolset import GuardedMCPToolset, _is_success
+from src.shared.resilience import Dependency, get_dependency
+
+ERROR = {"isError": True, "content": [{"type": "text", "text": "failed"}]}
+OK = {"content": [{"type": "text", "text": "ok"}]}
+
+
+def test_an_error_result_does_not_win_over_a_slower_success():
+    answers = iter([(0.0, ERROR), (0.01, OK)])
+
+    async def attempt():
+        delay, result = next(answers)
+        await asyncio.sleep(delay)
+        return result
+
+    dependency = Dependency("error-first", timeout_seconds=1.0, hedging=True)
+    assert asyncio.run(dependency.call(attempt, idempotent=True, is_success=_is_success)) == OK
+
+
+def test_an_error_result_is_returned_when_no_attempt_succeeds():
+    async def attempt():
+        return ERROR
+
+    dependency = Dependency("error-only", timeout_seconds=1.0, hedging=True)
+    assert asyncio.run(dependency.call(attempt, idempotent=True, is_success=_is_success)) == ERROR
+
+
+class FakeTool(BaseTool):
+    def __init__(self, name: str):
+        super().__init__(name=name, description=name)
+
+
+def make_toolset(monkeypatch, tool_filter, listings: list) -> GuardedMCPToolset:
+    async def list_tools(self, readonly_context=None):
+        listing = listings.pop(0)
+        if isinstance(listing, Exception):
+            raise listing
+        # The server's list, filtered the way MCPToolset does it
+        return [FakeTool(name) for name in listing if self._is_tool_selected(FakeTool(name), readonly_context)]
+
+    monkeypatch.setattr(MCPToolset, "get_tools", list_tools)
+    return GuardedMCPToolset(
+        dependency="toolset-test",
+        connection_params=StreamableHTTPConnectionParams(url="http://localhost:1/mcp/"),
+        tool_filter=tool_filter,
+    )
+
+
+def names(tools: list) -> list:
+    return [tool.name for tool in tools]
+
+
+def test_the_tool_filter_is_applied_with_the_context_of_each_call(monkeypatch):
+    def only_for_the_loan_agent(tool, readonly_context):
+        return readonly_context is not None and readonly_context.agent_name == "loan_agent" or tool.name == "ping"
+
+    toolset = make_toolset(monkeypatch, only_for_the_loan_agent, [["ping", "create_loan"]])
+    loan_agent = SimpleNamespace(agent_name="loan_agent")
+    other_agent = SimpleNamespace(agent_name="other_agent")
+
+    assert names(asyncio.run(toolset.get_tools(other_agent))) == ["ping"]
+    assert names(asyncio.run(toolset.get_tools(loan_agent))) == ["ping", "create_loan"]
+
+
+def test_the_tool_list_is_refreshed_and_kept_while_listing_fails(monkeypatch):
+    toolset = make_toolset(monkeypatch, None, [["ping"], RuntimeError("unavailable"), ["ping", "create_loan"]])
+    monkeypatch.setattr(guarded_toolset, "MCP_TOOLS_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(get_dependency("toolset-test"), "hedging", False)  # No retry of the failed listing
+
+    assert names(asyncio.run(toolset.get_tools())) == ["ping"]
+    assert names(asyncio.run(toolset.get_tools())) == ["ping"]
+    assert names(asyncio.run(toolset.get_tools())) == ["ping", "create_loan"]
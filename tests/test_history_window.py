@@ -0,0 +1,68 @@
+"""
+The conversation history sent to the remote agent (src/adk_metalbank/agents/history.py).
+"""
+from types import SimpleNamespace
+
+from src.adk_metalbank.agents import history
+from src.adk_metalbank.agents.history import HistoryWindow, format_event, get_history_window, history_budget_chars
+
+
+def event(index: int, text: str = None, author: str = "user") -> SimpleNamespace:
+    content = SimpleNamespace(parts=[SimpleNamespace(text=text if text is not None else f"message {index}")])
+    return SimpleNamespace(id=f"event-{index}", author=author, content=content)
+
+
+def full_history(events: list, max_chars: int) -> str:
+    # What the window replaces: formatting the whole session on every hop
+    return "".join(line for line in map(format_event, events) if line)[-max_chars:]
+
+
+def test_the_budget_is_the_smaller_of_characters_and_tokens():
+    assert history_budget_chars(500, 0) == 500
+    assert history_budget_chars(500, 50) == 200
+    assert history_budget_chars(100, 50) == 100
+
+
+def test_events_without_text_are_left_out():
+    assert format_event(event(1, author="metal_bank")) == "\n[METAL_BANK]: message 1"
+    assert format_event(event(2, text="")) is None
+    assert format_event(SimpleNamespace(id="event-3", author="user", content=None)) is None
+
+
+def test_updates_give_the_tail_of_the_whole_history():
+    window = HistoryWindow(max_chars=60)
+    events = []
+    for index in range(30):
+        events.append(event(index, author="user" if index % 2 else "metal_bank"))
+        if index % 3 == 0:
+            events.append(event(1000 + index, text=""))
+        assert window.update(events) == full_history(events, 60)
+
+
+def test_a_long_first_update_stops_at_the_budget():
+    events = [event(index) for index in range(10000)]
+    assert HistoryWindow(max_chars=100).update(events) == full_history(events, 100)
+
+
+def test_a_rewound_session_starts_again_from_the_tail():
+    window = HistoryWindow(max_chars=200)
+    events = [event(index) for index in range(10)]
+    window.update(events)
+
+    shorter = events[:5]
+    assert window.update(shorter) == full_history(shorter, 200)
+    replaced = events[:4] + [event(99, text="a different answer")]
+    assert window.update(replaced) == full_history(replaced, 200)
+
+
+def test_windows_are_kept_per_session_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(history, "_windows", type(history._windows)())
+    monkeypatch.setattr(history, "MAX_TRACKED_SESSIONS", 2)
+
+    first = get_history_window("session-1", max_chars=100)
+    assert get_history_window("session-1", max_chars=100) is first
+    assert get_history_window("session-1", max_chars=50) is not first  # A new budget gets a new window
+
+    get_history_window("session-2", max_chars=100)
+    get_history_window("session-3", max_chars=100)
+    assert list(history._windows) == ["session-2", "session-3"]
@@ -0,0 +1,42 @@
+"""
+Name step of the loan assessment workflow (answer_entity_name in src/adk_metalbank/agents/entity_names.py).
+"""
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from src.adk_metalbank.agents import entity_names
+from src.adk_metalbank.agents.sub_agents.loan_assessment_agent import NAME_STATE_KEY
+
+
+def context(message: str, state: dict):
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=message)]), state=state)
+
+
+def answer(message: str, state: dict):
+    response = entity_names.answer_entity_name(context(message, state), LlmRequest())
+    return response.content.parts[0].text if response else None
+
+
+def test_a_named_entity_is_answered_without_the_model():
+    state = {}
+    assert answer("I am Lord Bailish and need a loan", state) == "Bailish"
+    assert state[entity_names.ENTITY_NAME_STATE_KEY] == "Bailish"
+
+
+def test_a_follow_up_keeps_the_known_name():
+    assert answer("What would 500 Dragons cost me?", {NAME_STATE_KEY: "Stork"}) == "Stork"
+    assert answer("What would 500 Dragons cost me?", {entity_names.ENTITY_NAME_STATE_KEY: "Pentoss"}) == "Pentoss"
+    assert answer("What would 500 Dragons cost me?", {NAME_STATE_KEY: "NONE", entity_names.ENTITY_NAME_STATE_KEY: "Pentoss"}) == "Pentoss"
+
+
+def test_the_model_is_only_asked_when_no_name_is_known():
+    assert answer("What would 500 Dragons cost me?", {}) is None
+    assert answer("What would 500 Dragons cost me?", {NAME_STATE_KEY: "NONE"}) is None
+
+
+def test_the_known_name_is_kept_when_extraction_is_off(monkeypatch):
+    monkeypatch.setattr(entity_names, "ENTITY_NAME_EXTRACTION_ENABLED", False)
+    assert answer("I am Lord Bailish", {NAME_STATE_KEY: "Stork"}) == "Stork"
+    assert answer("I am Lord Bailish", {}) is None
@@ -0,0 +1,49 @@
+"""
+Admin profiling routes (src/shared/profiling.py).
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from src.shared import profiling
+from src.shared.profiling import ProfilingMiddleware
+
+
+async def not_found(scope, receive, send):
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def get(path: str, client=("127.0.0.1", 50000), headers=None) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=ProfilingMiddleware(not_found), client=client)
+        async with httpx.AsyncClient(transport=transport) as http:
+            return await http.get(f"http://service{profiling.PROFILING_PATH}{path}", headers=headers)
+    return asyncio.run(run())
+
+
+def test_a_short_loop_lag_measurement_is_served():
+    response = get("/loop-lag?seconds=0.05&interval_ms=5")
+    assert response.status_code == 200
+    assert response.json()["samples"] > 0
+
+
+@pytest.mark.parametrize("query", [
+    "/cpu?seconds=61", "/cpu?seconds=0", "/cpu?seconds=nan", "/cpu?seconds=1&interval_ms=0",
+    "/loop-lag?seconds=1&interval_ms=5000", "/memory?seconds=1&top=100000", "/cpu?seconds=five",
+])
+def test_out_of_range_parameters_are_refused(query):
+    assert get(query).status_code == 400
+
+
+def test_without_a_token_only_local_clients_are_served():
+    assert get("/tasks", client=("10.0.0.7", 50000)).status_code == 403
+    assert get("/tasks").status_code == 200
+
+
+def test_with_a_token_every_client_needs_it(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "s3cret")
+    assert get("/tasks").status_code == 401
+    assert get("/tasks", client=("10.0.0.7", 50000), headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert get("/tasks", client=("10.0.0.7", 50000), headers={"Authorization": "Bearer s3cret"}).status_code == 200
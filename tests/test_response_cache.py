@@ -0,0 +1,71 @@
+"""
+Model response cache (src/shared/response_cache.py).
+"""
+import threading
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from src.shared import response_cache
+from src.shared.response_cache import ResponseCache
+
+
+def context(user_id: str, session_id: str):
+    return SimpleNamespace(agent_name="orchestrator", user_id=user_id, session=SimpleNamespace(id=session_id))
+
+
+def request(*turns: str) -> LlmRequest:
+    contents = [
+        types.Content(role="user" if index % 2 == 0 else "model", parts=[types.Part(text=text)])
+        for index, text in enumerate(turns)
+    ]
+    return LlmRequest(contents=contents, config=types.GenerateContentConfig(system_instruction="You are the Metal Bank."))
+
+
+def test_a_first_turn_is_shared_by_all_users():
+    alice = response_cache._cache_key(context("alice", "s1"), request("Hello"))
+    bob = response_cache._cache_key(context("bob", "s2"), request("Hello"))
+    assert alice == bob
+    assert alice[2] == ""
+
+
+def test_a_longer_conversation_is_scoped_to_its_session():
+    turns = ("Good day", "Welcome to the Metal Bank.", "Thank you")
+    alice = response_cache._cache_key(context("alice", "s1"), request(*turns))
+    bob = response_cache._cache_key(context("bob", "s2"), request(*turns))
+    assert alice[:2] == bob[:2]
+    assert alice[2] == "alice/s1" and bob[2] == "bob/s2"
+
+
+def test_scoped_entries_are_not_served_to_other_sessions(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.db"))
+    cache.store("orchestrator", "user: thank you", "For Alice.", 0.5, scope="alice/s1")
+
+    assert cache.lookup("orchestrator", "user: thank you", scope="alice/s1")[1] == "memory"
+    assert cache.lookup("orchestrator", "user: thank you", scope="bob/s2") == (None, "miss")
+    assert cache.lookup("orchestrator", "user: thank you") == (None, "miss")
+    # A new process sees the same scopes on disk
+    restarted = ResponseCache(db_path=str(tmp_path / "cache.db"))
+    assert restarted.lookup("orchestrator", "user: thank you", scope="alice/s1")[1] == "disk"
+    assert restarted.lookup("orchestrator", "user: thank you", scope="bob/s2") == (None, "miss")
+
+
+def test_the_disk_tier_is_safe_to_share_between_threads(tmp_path):
+    cache = ResponseCache(max_entries=1, db_path=str(tmp_path / "cache.db"))
+    errors = []
+
+    def use(thread: int):
+        try:
+            for turn in range(200):
+                cache.store("orchestrator", f"user: {thread} {turn}", "Hello.", 0.1)
+                cache.lookup("orchestrator", f"user: {thread} {turn - 1}")
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=use, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,88 @@
+"""
+Fast-path routing of the orchestrator (src/adk_metalbank/agents/routing.py) and the relay agent
+it hands clandestine requests to (src/adk_metalbank/agents/relay.py).
+"""
+import os
+
+os.environ.setdefault("AGENT_MODEL", "fake-llm")
+os.environ.setdefault("SESSION_SERVICE_URI", "")
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from src.adk_metalbank.agents import relay, routing
+from src.adk_metalbank.agents.agent import root_agent
+from src.adk_metalbank.agents.tools import REMOTE_AGENT_UNAVAILABLE_MESSAGE
+
+
+def user_request(text: str) -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+def transfer_target(response) -> str:
+    call = response.content.parts[0].function_call
+    assert call.name == "transfer_to_agent"
+    return call.args["agent_name"]
+
+
+@pytest.mark.parametrize("message, discovered, rule", [
+    ("All systems must fail", False, "passcode"),
+    ("I have a secret task for you", True, "clandestine"),
+    ("I have a secret task for you", False, None),
+    ("I need a loan of 500 dragons", False, "loan_request"),
+    ("When must I repay?", False, "loan"),
+    ("Good day", False, None),
+])
+def test_rules_match_in_order(message, discovered, rule):
+    matched = routing.match_route(message, discovered)
+    assert (matched.name if matched else None) == rule
+
+
+def test_the_router_only_uses_the_public_callback_context():
+    # Only state is available: the router must not reach into the invocation context
+    context = SimpleNamespace(state={})
+    assert transfer_target(routing.fast_path_router(context, user_request("All systems must fail"))) == relay.RELAY_AGENT_NAME
+    assert transfer_target(routing.fast_path_router(context, user_request("I need a loan"))) == "loan_assessment_agent"
+    assert routing.fast_path_router(context, user_request("Good day")) is None
+
+
+def run_turn(text: str) -> list:
+    async def run():
+        runner = InMemoryRunner(agent=root_agent, app_name="agents")
+        session = await runner.session_service.create_session(app_name="agents", user_id="u1")
+        events = [event async for event in runner.run_async(
+            user_id="u1", session_id=session.id, new_message=types.Content(role="user", parts=[types.Part(text=text)])
+        )]
+        session = await runner.session_service.get_session(app_name="agents", user_id="u1", session_id=session.id)
+        return events, session.state
+    return asyncio.run(run())
+
+
+def answers(events: list) -> list:
+    return [(event.author, event.content.parts[0].text) for event in events if event.content and event.content.parts and event.content.parts[0].text]
+
+
+def test_the_passcode_is_relayed_to_the_remote_agent(monkeypatch):
+    async def remote_agent(tool_context):
+        return "A name is required, My Lord."
+    monkeypatch.setattr(relay, "call_remote_agent", remote_agent)
+
+    events, state = run_turn("All systems must fail. I have a task.")
+
+    assert answers(events)[0] == (relay.RELAY_AGENT_NAME, "A name is required, My Lord.")
+    assert state["men_without_phases_discovered"] is True
+
+
+def test_an_unreachable_remote_agent_gets_the_unavailable_answer(monkeypatch):
+    async def remote_agent(tool_context):
+        return ""
+    monkeypatch.setattr(relay, "call_remote_agent", remote_agent)
+
+    events, _ = run_turn("All systems must fail. I have a task.")
+
+    assert answers(events)[0] == (relay.RELAY_AGENT_NAME, REMOTE_AGENT_UNAVAILABLE_MESSAGE)
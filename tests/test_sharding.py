@@ -0,0 +1,89 @@
+"""
+Sharded loan storage (src/loan_service/sharding.py): routing, id allocation and the ledger backfill.
+"""
+import os
+
+os.environ.setdefault("LOANS_DB_ECHO", "false")
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.loan_service import ledger
+from src.loan_service.main import Loan, setup_shard
+from src.loan_service.sharding import ShardRouter, shard_file, shard_for
+
+
+def test_entities_keep_their_shard_when_shards_are_added():
+    names = [f"entity-{index}" for index in range(1000)]
+    before = {name: shard_for(name, 4) for name in names}
+    after = {name: shard_for(name, 8) for name in names}
+    moved = [name for name in names if before[name] != after[name]]
+    assert all(after[name] >= 4 for name in moved)
+    assert 0.3 < len(moved) / len(names) < 0.7
+    assert shard_for("House Stork", 8) == shard_for("house stork", 8)
+
+
+def seed_legacy_loans(db_file: str, nr_shards: int, per_shard: int) -> None:
+    # Loans written before the ledger existed: every shard numbered its rows from 1
+    for shard in range(nr_shards):
+        engine = create_engine(f"sqlite:///{shard_file(db_file, shard)}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as db_session:
+            for index in range(per_shard):
+                db_session.add(Loan(name=f"legacy-{shard}-{index}", amount=100, interest_rate_percent=5, repaid_amount=0, loan_open=True))
+            db_session.commit()
+        engine.dispose()
+
+
+def test_the_backfill_allocates_event_ids_over_all_shards(tmp_path):
+    db_file = str(tmp_path / "loans.db")
+    seed_legacy_loans(db_file, nr_shards=3, per_shard=5)
+
+    router = ShardRouter(db_file, nr_shards=3, on_create=setup_shard)
+    ids = []
+    for shard in range(3):
+        with router.session(shard) as db_session:
+            ids += [event.id for event in db_session.exec(select(ledger.LoanEvent))]
+
+    assert len(ids) == 15
+    assert len(set(ids)) == 15
+    # New events continue after the backfilled ones
+    with router.session_for("stork") as db_session:
+        assert ledger.append_event(db_session, 99, "stork", ledger.EVENT_CREATE, 10.0).id > max(ids)
+
+
+def test_a_second_process_on_the_same_shards_is_refused(tmp_path):
+    db_file = str(tmp_path / "loans.db")
+    running = ShardRouter(db_file, nr_shards=2)
+    running.claim()
+
+    # flock locks belong to the open file, so a second router stands in for a second process
+    with pytest.raises(RuntimeError):
+        ShardRouter(db_file, nr_shards=2).claim()
+
+
+def test_a_single_shard_needs_no_claim(tmp_path):
+    db_file = str(tmp_path / "loans.db")
+    ShardRouter(db_file, nr_shards=1).claim()
+    ShardRouter(db_file, nr_shards=1).claim()
+    assert not os.path.exists(f"{db_file}.lock")
+
+
+def test_the_backfill_writes_off_what_cancelled_loans_still_owed(tmp_path):
+    db_file = str(tmp_path / "loans.db")
+    engine = create_engine(f"sqlite:///{shard_file(db_file, 0)}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db_session:
+        db_session.add(Loan(name="stork", amount=100, interest_rate_percent=5, repaid_amount=100, loan_open=False))
+        db_session.add(Loan(name="stork", amount=200, interest_rate_percent=5, repaid_amount=50, loan_open=False))
+        db_session.add(Loan(name="stork", amount=300, interest_rate_percent=5, repaid_amount=0, loan_open=True))
+        db_session.commit()
+    engine.dispose()
+
+    router = ShardRouter(db_file, nr_shards=1, on_create=setup_shard)
+    with router.session_for("stork") as db_session:
+        balance = ledger.get_balance(db_session, "stork")
+        kinds = [event.kind for event in ledger.get_events(db_session, "stork")]
+
+    assert (balance.nr_open_loans, balance.nr_closed_loans, balance.open_amount) == (1, 1, 300)
+    assert kinds.count(ledger.EVENT_CANCEL) == 1
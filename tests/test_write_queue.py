@@ -0,0 +1,101 @@
+"""
+Group commit of loan writes (src/loan_service/write_queue.py).
+
+The writes append ledger events, so the queue runs against real SQLite shards in a temporary
+directory, with the same ShardRouter as the Loan Service.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+from sqlmodel import select
+
+from src.loan_service import ledger
+from src.loan_service.sharding import ShardRouter, shard_file
+from src.loan_service.write_queue import WriteQueue
+
+
+@pytest.fixture
+def router(tmp_path):
+    return ShardRouter(str(tmp_path / "loans.db"), nr_shards=1)
+
+
+def create(name: str, amount: float):
+    def op(db_session):
+        return ledger.append_event(db_session, loan_id=1, name=name, kind=ledger.EVENT_CREATE, amount=amount).id
+    return op
+
+
+def failing(db_session):
+    ledger.append_event(db_session, loan_id=1, name="bolton", kind=ledger.EVENT_CREATE, amount=1.0)
+    raise ValueError("rejected")
+
+
+def committed_events(router: ShardRouter, shard: int = 0) -> list:
+    # Read with a separate connection, which only sees committed rows
+    with sqlite3.connect(shard_file(router.db_file, shard)) as connection:
+        return connection.execute("SELECT name, amount FROM loanevent ORDER BY id").fetchall()
+
+
+async def submit_all(queue: WriteQueue, ops: list) -> list:
+    return await asyncio.gather(*(queue.submit(op) for op in ops), return_exceptions=True)
+
+
+def test_concurrent_writes_share_one_commit(router, monkeypatch):
+    commits = []
+    queue = WriteQueue(router.session)
+    monkeypatch.setattr(queue, "_commit", lambda shard, ops: commits.append(len(ops)) or WriteQueue._commit(queue, shard, ops))
+
+    results = asyncio.run(submit_all(queue, [create("stork", 100.0), create("tully", 200.0), create("frey", 300.0)]))
+
+    assert commits == [3]
+    assert len(set(results)) == 3
+    assert committed_events(router) == [("stork", 100.0), ("tully", 200.0), ("frey", 300.0)]
+
+
+def test_a_failing_write_only_fails_its_caller(router):
+    results = asyncio.run(submit_all(WriteQueue(router.session), [create("stork", 100.0), failing, create("tully", 200.0)]))
+
+    assert isinstance(results[1], ValueError)
+    assert not isinstance(results[0], Exception) and not isinstance(results[2], Exception)
+    assert committed_events(router) == [("stork", 100.0), ("tully", 200.0)]
+    with router.session() as db_session:
+        assert ledger.get_balance(db_session, "bolton").nr_open_loans == 0
+        assert ledger.get_balance(db_session, "tully").open_amount == 200.0
+
+
+def test_the_fallback_batch_commits_once(router):
+    # Savepoints must nest in the batch's transaction: a write released from its savepoint
+    # is not visible to other connections before the batch commits.
+    seen = []
+
+    def observe(db_session):
+        seen.append(committed_events(router))
+        return create("tully", 200.0)(db_session)
+
+    asyncio.run(submit_all(WriteQueue(router.session), [create("stork", 100.0), failing, observe]))
+
+    assert seen[-1] == []
+    assert committed_events(router) == [("stork", 100.0), ("tully", 200.0)]
+
+
+def test_a_failed_commit_persists_no_write_of_the_batch(router, monkeypatch):
+    def session_factory(shard):
+        db_session = router.session(shard)
+        monkeypatch.setattr(db_session, "commit", lambda: (_ for _ in ()).throw(sqlite3.OperationalError("disk I/O error")))
+        return db_session
+
+    results = asyncio.run(submit_all(WriteQueue(session_factory), [create("stork", 100.0), failing]))
+
+    assert all(isinstance(result, Exception) for result in results)
+    assert committed_events(router) == []
+
+
+def test_disabled_queue_commits_each_write(router):
+    queue = WriteQueue(router.session, enabled=False)
+
+    results = asyncio.run(submit_all(queue, [create("stork", 100.0), failing]))
+
+    assert isinstance(results[1], ValueError)
+    with router.session() as db_session:
+        assert [event.name for event in db_session.exec(select(ledger.LoanEvent))] == ["stork"]